@@ -0,0 +1,15 @@
+"""Ponto de entrada ASGI: a página teste2.py com cache longo nos ativos estáticos.
+
+O Streamlit serve static/ sem Cache-Control; aqui o middleware de
+solarsim.ativos marca os arquivos com hash no nome como imutáveis por um
+ano. Uso (qualquer um dos dois):
+
+    streamlit run app.py
+    uvicorn app:app --port 8501
+"""
+import streamlit as st
+from starlette.middleware import Middleware
+
+from solarsim.ativos import CabecalhosCacheAtivos
+
+app = st.App("teste2.py", middleware=[Middleware(CabecalhosCacheAtivos)])
@@ -0,0 +1,177 @@
+"""Gerador de carga da API (solarsim.api): latência p50/p99 e requisições/s.
+
+Sobe a API numa porta livre (ou usa --url de uma já no ar) e abre
+--conexoes conexões keep-alive por processo cliente, cada uma com uma
+requisição por vez (carga em laço fechado), durante --duracao segundos
+depois de um aquecimento. Em cada cenário:
+
+    simular   POST /simular com consumo/tarifa/conexão variados
+    lote      POST /simular/lote com --lote propostas
+    misto     9 simulações avulsas para cada lote, nas mesmas conexões
+
+O cliente também gasta CPU: com muitas conexões, use --processos-cliente
+para que ele não seja o gargalo (a saída mostra a CPU do cliente). Uso:
+
+    python benchmarks/carga_api.py [--cenarios simular,lote,misto] [--conexoes 32]
+                                   [--duracao 10] [--lote 1000] [--processos-api N]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONEXOES = ("Monofásica", "Bifásica", "Trifásica")
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _simulacao(rng):
+    item = {"consumo": rng.randint(80, 2000), "tarifa": round(rng.uniform(0.6, 1.3), 4),
+            "conexao": rng.choice(CONEXOES)}
+    if rng.random() < 0.25:
+        item["orcamento"] = round(rng.uniform(4_000, 80_000), 2)
+    return item
+
+
+def _requisicao(caminho, corpo, host):
+    return (f"POST {caminho} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(corpo)}\r\n\r\n").encode("latin-1") + corpo
+
+
+def _montar_requisicoes(cenario, tamanho_lote, host, semente):
+    """Lista de (rota, bytes da requisição) percorrida em ciclo pelas conexões."""
+    rng = random.Random(semente)
+    avulsas = [("/simular", _requisicao("/simular", json.dumps(_simulacao(rng)).encode(), host))
+               for _ in range(64)]
+    lotes = [("/simular/lote", _requisicao(
+        "/simular/lote", json.dumps({"propostas": [_simulacao(rng) for _ in range(tamanho_lote)]}).encode(), host))
+        for _ in range(4)]
+    if cenario == "simular":
+        return avulsas
+    if cenario == "lote":
+        return lotes
+    return [r for i, lote in enumerate(lotes * 2) for r in avulsas[9 * i:9 * i + 9] + [lote]]
+
+
+async def _conexao(host, porta, requisicoes, deslocamento, fim_aquecimento, fim, medidas):
+    leitor, escritor = await asyncio.open_connection(host, porta, limit=1 << 26)
+    i = deslocamento
+    try:
+        while (agora := time.perf_counter()) < fim:
+            rota, dados = requisicoes[i % len(requisicoes)]
+            i += 1
+            inicio = agora
+            escritor.write(dados)
+            status = int((await leitor.readline()).split()[1])
+            tamanho = 0
+            while (linha := await leitor.readline()) not in (b"\r\n", b""):
+                nome, _, valor = linha.partition(b":")
+                if nome.lower() == b"content-length":
+                    tamanho = int(valor)
+            await leitor.readexactly(tamanho)
+            if inicio >= fim_aquecimento:
+                medidas.append((rota, status, time.perf_counter() - inicio))
+    finally:
+        escritor.close()
+
+
+def _cliente(argumentos):
+    """Um processo cliente: (medidas, segundos de CPU do cliente)."""
+    host, porta, requisicoes, conexoes, aquecimento, duracao, indice = argumentos
+
+    async def rodar():
+        medidas = []
+        fim_aquecimento = time.perf_counter() + aquecimento
+        await asyncio.gather(*(
+            _conexao(host, porta, requisicoes, indice * conexoes + c, fim_aquecimento,
+                     fim_aquecimento + duracao, medidas)
+            for c in range(conexoes)
+        ))
+        return medidas
+
+    cpu = time.process_time()
+    medidas = asyncio.run(rodar())
+    return medidas, time.process_time() - cpu
+
+
+def _percentil(valores, q):
+    return statistics.quantiles(valores, n=100, method="inclusive")[q - 1] if len(valores) > 1 else valores[0]
+
+
+def medir(host, porta, cenario, args):
+    requisicoes = _montar_requisicoes(cenario, args.lote, f"{host}:{porta}", semente=0)
+    tarefas = [(host, porta, requisicoes, args.conexoes, args.aquecimento, args.duracao, i)
+               for i in range(args.processos_cliente)]
+    if args.processos_cliente == 1:
+        resultados = [_cliente(tarefas[0])]
+    else:
+        with multiprocessing.Pool(args.processos_cliente) as pool:
+            resultados = pool.map(_cliente, tarefas)
+    medidas = [m for parcial, _ in resultados for m in parcial]
+    cpu_cliente = sum(cpu for _, cpu in resultados)
+
+    print(f"\n{cenario}: {args.processos_cliente}×{args.conexoes} conexões, {args.duracao:.0f} s "
+          f"(CPU do cliente {cpu_cliente / (args.duracao + args.aquecimento) * 100:.0f}%)")
+    print(f"  {'rota':<16}{'req':>9}{'req/s':>10}{'p50 (ms)':>11}{'p99 (ms)':>11}{'máx (ms)':>11}{'erros':>7}")
+    for rota in sorted({m[0] for m in medidas}):
+        tempos = [t * 1000 for r, _, t in medidas if r == rota]
+        erros = sum(1 for r, status, _ in medidas if r == rota and status != 200)
+        print(f"  {rota:<16}{len(tempos):>9,}{len(tempos) / args.duracao:>10,.0f}{_percentil(tempos, 50):>11.2f}"
+              f"{_percentil(tempos, 99):>11.2f}{max(tempos):>11.2f}{erros:>7}")
+    if args.lote and any(m[0] == "/simular/lote" for m in medidas):
+        lotes = sum(1 for m in medidas if m[0] == "/simular/lote")
+        print(f"  {lotes * args.lote / args.duracao:,.0f} propostas/s nos lotes")
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("--url", help="host:porta de uma API já no ar (padrão: sobe uma)")
+    argumentos.add_argument("--cenarios", default="simular,lote,misto")
+    argumentos.add_argument("--conexoes", type=int, default=32, help="conexões por processo cliente")
+    argumentos.add_argument("--processos-cliente", type=int, default=1)
+    argumentos.add_argument("--duracao", type=float, default=10.0)
+    argumentos.add_argument("--aquecimento", type=float, default=2.0)
+    argumentos.add_argument("--lote", type=int, default=1000, help="propostas por requisição de lote")
+    argumentos.add_argument("--processos-api", type=int, help="--processos da API que o script sobe")
+    args = argumentos.parse_args()
+
+    servidor = None
+    if args.url:
+        host, _, porta = args.url.removeprefix("http://").partition(":")
+        porta = int(porta)
+    else:
+        host, porta = "127.0.0.1", _porta_livre()
+        comando = [sys.executable, "-m", "solarsim.api", "--porta", str(porta)]
+        if args.processos_api:
+            comando += ["--processos", str(args.processos_api)]
+        servidor = subprocess.Popen(comando, cwd=RAIZ, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(300):
+            try:
+                urllib.request.urlopen(f"http://{host}:{porta}/saude", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.1)
+        for cenario in args.cenarios.split(","):
+            medir(host, porta, cenario, args)
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
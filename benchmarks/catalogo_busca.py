@@ -0,0 +1,109 @@
+"""Benchmark: busca de combinações no catálogo de equipamentos.
+
+Gera catálogos sintéticos (módulos e inversores) em CSV num diretório
+temporário, mede a carga e o tempo de cada busca para potências e áreas
+variadas e confere o resultado contra uma busca exaustiva (todos os pares). Uso:
+
+    python benchmarks/catalogo_busca.py [n_modulos] [n_inversores] [buscas]
+"""
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solarsim import catalogo  # noqa: E402
+
+
+def gerar_catalogos(pasta, n_modulos, n_inversores, semente=0):
+    """Grava modulos.csv e inversores.csv com folhas de dados plausíveis."""
+    rng = np.random.default_rng(semente)
+    potencia = rng.choice(np.arange(400, 721, 5), n_modulos)
+    celulas = np.where(potencia < 500, 108, np.where(potencia < 600, 132, 144))
+    voc = celulas * rng.uniform(0.36, 0.40, n_modulos)
+    vmp = voc * rng.uniform(0.82, 0.86, n_modulos)
+    caminho_modulos = os.path.join(pasta, "modulos.csv")
+    with open(caminho_modulos, "w", encoding="utf-8") as arquivo:
+        arquivo.write("MODELO;FABRICANTE;POTENCIA_WP;VOC;VMP;ISC;COEF_VOC;AREA_M2;PRECO\n")
+        for i in range(n_modulos):
+            arquivo.write(
+                f"MOD-{i:05d};Fab{i % 40};{potencia[i]};{voc[i]:.2f};{vmp[i]:.2f};"
+                f"{potencia[i] / vmp[i] * 1.06:.2f};{rng.uniform(-0.30, -0.24):.3f};"
+                f"{potencia[i] / rng.uniform(205, 230):.2f};{potencia[i] * rng.uniform(0.55, 0.95):.2f}\n"
+            )
+
+    ca = rng.choice([1.5, 2, 3, 3.6, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50, 60, 75], n_inversores)
+    caminho_inversores = os.path.join(pasta, "inversores.csv")
+    with open(caminho_inversores, "w", encoding="utf-8") as arquivo:
+        arquivo.write("MODELO;FABRICANTE;POTENCIA_CA_KW;POTENCIA_CC_MAX_KW;TENSAO_CC_MAX;MPPT_MIN;MPPT_MAX;"
+                      "CORRENTE_MAX_MPPT;N_MPPT;PRECO\n")
+        for i in range(n_inversores):
+            tensao = 600 if ca[i] <= 6 else 1100
+            arquivo.write(
+                f"INV-{i:05d};Fab{i % 25};{ca[i]};{ca[i] * rng.uniform(1.3, 1.6):.2f};{tensao};"
+                f"{rng.choice([60, 80, 120, 160])};{tensao - 50};{rng.choice([13, 16, 20, 26, 32])};"
+                f"{max(1, min(6, int(ca[i] // 4) + rng.integers(1, 3)))};"
+                f"{600 + ca[i] * rng.uniform(350, 550):.2f}\n"
+            )
+    return caminho_modulos, caminho_inversores
+
+
+def busca_exaustiva(cat, potencia_kwp, area_m2):
+    """Custo da combinação mais barata testando todos os pares (referência)."""
+    mod, inv = cat.modulos, cat.inversores
+    voc_frio, vmp_frio, vmp_calor = (v[:, None] for v in mod.tensoes())
+    n = np.maximum(np.ceil(potencia_kwp * 1000 / mod.potencia_wp - 1e-9), 1)[:, None]
+    kwp = n * mod.potencia_wp[:, None] / 1000
+    razao = kwp / inv.potencia_ca_kw
+    maximo = np.floor(np.minimum(inv.tensao_cc_max / voc_frio, inv.mppt_max / vmp_frio))
+    minimo = np.ceil(inv.mppt_min / vmp_calor)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strings = np.ceil(n / maximo)
+    valido = ((n * mod.area_m2[:, None] <= area_m2)
+              & (razao >= catalogo.RAZAO_CC_CA_MIN) & (razao <= catalogo.RAZAO_CC_CA_MAX)
+              & (maximo >= 1) & (maximo >= minimo) & (strings * minimo <= n)
+              & (kwp <= inv.potencia_cc_max_kw)
+              & (strings <= inv.n_mppt * np.floor(inv.corrente_max_mppt / mod.isc[:, None])))
+    custos = np.where(valido, n * mod.preco[:, None] + inv.preco, np.inf)
+    return float(custos.min())
+
+
+def main():
+    n_modulos = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    n_inversores = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+    buscas = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = gerar_catalogos(pasta, n_modulos, n_inversores)
+        inicio = time.perf_counter()
+        cat = catalogo.carregar_catalogo(*caminhos)
+        carga = (time.perf_counter() - inicio) * 1000
+
+    alvos = rng.uniform(1.5, 60, buscas)
+    areas = alvos * rng.uniform(4.5, 8, buscas)
+    tempos = []
+    for alvo, area in zip(alvos, areas):
+        inicio = time.perf_counter()
+        cat.buscar_combinacoes(alvo, area)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    for alvo, area in zip(alvos[:20], areas[:20]):
+        resultado = cat.buscar_combinacoes(alvo, area)
+        rapido = resultado[0]["custo_equipamentos"] if resultado else math.inf
+        referencia = busca_exaustiva(cat, alvo, area)
+        assert math.isclose(rapido, referencia, abs_tol=0.01) or rapido == referencia, (alvo, area, rapido, referencia)
+
+    tempos.sort()
+    print(f"catálogo: {n_modulos} módulos, {n_inversores} inversores (carga {carga:.0f} ms)")
+    print(f"busca: mediana {statistics.median(tempos):.2f} ms, "
+          f"p99 {tempos[int(0.99 * (len(tempos) - 1))]:.2f} ms, máximo {tempos[-1]:.2f} ms")
+    print("resultado igual ao da busca exaustiva em 20 buscas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark: leitura do EPW em texto x carga do cache binário com mmap.
+
+Gera um EPW sintético de 8760 h num diretório temporário e compara a
+leitura a frio do texto com a carga do .npy já convertido. Uso:
+
+    python benchmarks/clima_mmap.py [repeticoes]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solarsim import clima  # noqa: E402
+from solarsim.horario import calendario  # noqa: E402
+
+
+def gerar_epw_sintetico(caminho):
+    """Grava um EPW com cabeçalho mínimo e 8760 linhas de dados plausíveis."""
+    cal = calendario()
+    with open(caminho, "w", encoding="latin-1") as arquivo:
+        arquivo.write("LOCATION,Rio das Ostras,RJ,BRA,Sintetico,000000,-22.53,-41.95,-3.0,10.0\n")
+        for i in range(7):
+            arquivo.write(f"CABECALHO_{i}\n")
+        for h in range(len(cal["hora"])):
+            mes, hora = cal["mes"][h] + 1, cal["hora"][h]
+            ghi = max(0.0, 900.0 * (1 - abs(hora + 0.5 - 12) / 6.5))
+            campos = [2025, mes, 1, hora + 1, 0, "?", 24.0 + ghi / 200, 18.0, 80, 101325,
+                      0, 0, 380, ghi, ghi * 0.7, ghi * 0.3] + [0] * 5 + [3.5] + [0] * 13
+            arquivo.write(",".join(str(c) for c in campos) + "\n")
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as pasta:
+        epw = os.path.join(pasta, "sintetico.epw")
+        cache = os.path.join(pasta, "cache")
+        gerar_epw_sintetico(epw)
+
+        texto = cronometrar(lambda: clima.ler_arquivo_clima(epw), repeticoes)
+        conversao = cronometrar(lambda: clima.converter_para_binario(epw, cache), 3)
+
+        def carga_mmap():
+            clima._carregar_clima.cache_clear()
+            dados = clima.carregar_clima(epw, cache)
+            return float(dados["ghi"].sum())
+
+        mmap = cronometrar(carga_mmap, repeticoes)
+        memo = cronometrar(lambda: clima.carregar_clima(epw, cache), repeticoes)
+
+    print(f"{'leitura a frio (texto)':<34}{texto:>10.3f} ms")
+    print(f"{'conversão única para .npy':<34}{conversao:>10.3f} ms")
+    print(f"{'carga mmap + soma do GHI':<34}{mmap:>10.3f} ms")
+    print(f"{'carga repetida (mesmo processo)':<34}{memo:>10.3f} ms")
+    print(f"aceleração texto -> mmap: {texto / mmap:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Benchmark: tempo de servidor por interação na página (teste2.py).
+
+Sobe um servidor Streamlit de verdade (headless, porta livre) e conversa com
+ele pelo websocket, como o navegador: cada interação é um BackMsg
+rerun_script com o estado do widget alterado e, se o widget está num
+st.fragment, o fragment_id dele (o AppTest sempre reroda o script inteiro,
+por isso não serve aqui). Mede o tempo até o script_finished e a CPU gasta
+pelo processo do servidor (via /proc, só no Linux). Uso:
+
+    python benchmarks/interacoes_pagina.py [script] [repeticoes] [opções do streamlit...]
+
+Rodar com o teste2.py de antes dos fragmentos (git show <commit>:teste2.py)
+dá a comparação antes/depois; a pasta do repositório entra no PYTHONPATH e o
+servidor roda nela, com a .streamlit/config.toml do projeto (para medir sem
+ela, passe por exemplo --runner.postScriptGC=true).
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Campos de Element com widgets usados nas interações
+_TIPOS_WIDGET = ("button", "download_button", "number_input", "radio", "selectbox", "slider")
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_processo(pid):
+    """Segundos de CPU (usuário + sistema) do processo, ou None fora do Linux."""
+    try:
+        with open(f"/proc/{pid}/stat") as arquivo:
+            campos = arquivo.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Sessao:
+    """Uma aba do navegador: guarda os widgets vistos e dispara reruns."""
+
+    def __init__(self, ws, pid):
+        self.ws = ws
+        self.pid = pid
+        self.widgets = {}  # chave do usuário (ou rótulo, sem chave) -> (id, fragment_id)
+
+    def _registrar(self, msg):
+        delta = msg.delta
+        if not delta.HasField("new_element"):
+            return
+        tipo = delta.new_element.WhichOneof("type")
+        if tipo not in _TIPOS_WIDGET:
+            return
+        widget = getattr(delta.new_element, tipo)
+        chave = widget.id.rsplit("-", 1)[-1]
+        self.widgets[widget.label if chave == "None" else chave] = (widget.id, delta.fragment_id)
+
+    def rerun(self, estados=(), fragmento=None):
+        """Envia um rerun e espera o fim; devolve (segundos, segundos de CPU do servidor)."""
+        back = BackMsg()
+        cliente = back.rerun_script
+        cliente.SetInParent()
+        for id_widget, campo, valor in estados:
+            estado = cliente.widget_states.widgets.add()
+            estado.id = id_widget
+            if campo == "double_array_value":
+                estado.double_array_value.data.extend(valor)
+            else:
+                setattr(estado, campo, valor)
+        if fragmento:
+            cliente.fragment_id = fragmento
+        cpu = _cpu_processo(self.pid)
+        inicio = time.perf_counter()
+        self.ws.send(back.SerializeToString())
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(self.ws.recv())
+            tipo = msg.WhichOneof("type")
+            if tipo == "delta":
+                self._registrar(msg)
+            elif tipo == "script_finished" and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        decorrido = time.perf_counter() - inicio
+        cpu_final = _cpu_processo(self.pid)
+        return decorrido, (cpu_final - cpu if cpu is not None else float("nan"))
+
+    def interagir(self, chave, campo, valor):
+        """Altera um widget pela chave; reroda só o fragmento dele, se houver."""
+        id_widget, fragmento = self.widgets[chave]
+        return self.rerun([(id_widget, campo, valor)], fragmento or None)
+
+
+def medir(nome, interacao, repeticoes):
+    tempos, cpus = zip(*(interacao(i) for i in range(repeticoes)))
+    # CPU pela média: /proc conta em ticks de 10 ms, grossos demais para a mediana
+    print(f"{nome:<34} {statistics.median(tempos) * 1000:8.1f} ms {statistics.fmean(cpus) * 1000:8.1f} ms")
+
+
+def main():
+    script = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else os.path.join(RAIZ, "teste2.py")
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    porta = _porta_livre()
+    ambiente = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")])))
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless=true",
+         f"--server.port={porta}", "--server.address=127.0.0.1", "--server.fileWatcherType=none", *sys.argv[3:],
+         "--browser.gatherUsageStats=false"],
+        env=ambiente, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(300):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.1)
+        with connect(f"ws://127.0.0.1:{porta}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+            sessao = Sessao(ws, servidor.pid)
+            sessao.rerun()
+            sessao.interagir("simular", "trigger_value", True)
+
+            print(f"{os.path.basename(script)}: mediana de {repeticoes} repetições (mediana do tempo, média da CPU do servidor)")
+            medir("carregar a página (rerun completo)", lambda i: sessao.rerun(), repeticoes)
+            medir("editar a tarifa",
+                  lambda i: sessao.interagir("tarifa_input_0", "double_value", 0.85 + (i % 5) / 100), repeticoes)
+            medir("trocar o tipo de orçamento",
+                  lambda i: sessao.interagir("escolha_orc", "string_value", (
+                      "Usar Orçamento Médio do SolarSim", "Inserir meu Orçamento Personalizado")[i % 2]),
+                  repeticoes)
+            medir("mover slider de sensibilidade",
+                  lambda i: sessao.interagir("sens_tarifa", "double_array_value", [0.60, 1.20 + (i % 5) / 20]),
+                  repeticoes)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
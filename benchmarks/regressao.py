@@ -0,0 +1,218 @@
+"""Benchmarks com linha de base: dimensionamento, relatório, gráfico e página.
+
+Mede tempo por chamada (timeit: autorange e 5 repetições, guarda a melhor e
+a mediana) e pico de memória de uma chamada (tracemalloc) de cada caso:
+
+* calcular_sistema_solar / calcular_sistema_por_orcamento, escalares e em
+  lote (solarsim.lote, 10 mil leads);
+* formatar_payback, formatar_reais e gerar_resumo_txt, e a moeda em lote
+  (solarsim.relatorios.formatar_reais_lote, 10 mil valores);
+* o DataFrame do gráfico comparativo (montar_dados_grafico);
+* o empacotamento de módulos numa água de 10 × 6 m com uma obstrução
+  (solarsim.telhado.empacotar_agua);
+* um rerun completo da página (AppTest de teste2.py) em cada modo de
+  simulação, já com o resultado simulado e o cache aquecido.
+
+O resultado é comparado com benchmarks/linha_de_base.json: um caso regride
+quando a melhor medida passa da base por mais que a tolerância. A saída é
+1 quando algum caso regride, para uso em CI. Uso:
+
+    python benchmarks/regressao.py [--gravar] [--tolerancia 0.25] [--saida resultado.json] [filtro...]
+
+`--gravar` troca a linha de base pelas medidas atuais; `filtro` restringe
+aos casos cujo nome contém algum dos textos. A base só vale na máquina em
+que foi gravada (o JSON guarda Python, plataforma e processador).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from solarsim import lote  # noqa: E402
+from solarsim.calculos import (  # noqa: E402
+    CUSTO_WP_CAPITAIS,
+    HSP_CAPITAIS,
+    calcular_sistema_por_orcamento,
+    calcular_sistema_solar,
+    formatar_payback,
+    formatar_reais,
+    gerar_resumo_txt,
+    simular,
+)
+from solarsim.grafico import montar_dados_grafico  # noqa: E402
+from solarsim.relatorios import formatar_reais_lote  # noqa: E402
+from solarsim.telhado import empacotar_agua, retangulo  # noqa: E402
+
+LINHA_DE_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linha_de_base.json")
+
+# Folgas para não acusar ruído: relativa (por caso) e absolutas
+TOLERANCIA_TEMPO = 0.25
+TOLERANCIA_MEMORIA = 0.10
+FOLGA_TEMPO_US = 2.0
+FOLGA_MEMORIA_KIB = 16.0
+
+MODO_CONTA = "Com base na minha conta de luz (Já moro no local)"
+MODO_CONSTRUINDO = "Com base em uma estimativa (Estou construindo)"
+LEADS_LOTE = 10_000
+
+
+def _casos():
+    """Nome -> função sem argumentos; as entradas são montadas uma vez, fora da medição."""
+    cidade = sorted(HSP_CAPITAIS)[0]
+    hsp, custo_wp = HSP_CAPITAIS[cidade], CUSTO_WP_CAPITAIS[cidade]
+    rng = np.random.default_rng(0)
+    consumo = rng.uniform(150, 1500, LEADS_LOTE)
+    tarifa = rng.uniform(0.6, 1.3, LEADS_LOTE)
+    orcamento = rng.uniform(5_000, 60_000, LEADS_LOTE)
+    R = simular(350, 0.92, cidade, "Bifásica (Taxa Mínima 50 kWh)")
+    dados = R["dados"]
+
+    casos = {
+        "calcular_sistema_solar": lambda: calcular_sistema_solar(350, 0.92, hsp, custo_wp),
+        "calcular_sistema_por_orcamento": lambda: calcular_sistema_por_orcamento(18_000, custo_wp, 350, 0.92, hsp),
+        f"calcular_sistema_solar_lote[{LEADS_LOTE}]":
+            lambda: lote.calcular_sistema_solar_lote(consumo, tarifa, hsp, custo_wp),
+        f"calcular_sistema_por_orcamento_lote[{LEADS_LOTE}]":
+            lambda: lote.calcular_sistema_por_orcamento_lote(orcamento, custo_wp, consumo, tarifa, hsp),
+        "formatar_payback": lambda: formatar_payback(18_000, 420.5),
+        "formatar_reais": lambda: formatar_reais(1_234_567.891),
+        "gerar_resumo_txt": lambda: gerar_resumo_txt(R, dados),
+        f"formatar_reais_lote[{LEADS_LOTE}]": lambda: formatar_reais_lote(orcamento),
+        "montar_dados_grafico": lambda: montar_dados_grafico(R["consumo"], dados["geracao_mensal"]),
+        "empacotar_agua[10x6]": lambda: empacotar_agua(retangulo(10, 6), [retangulo(0.8, 0.8, 4, 2.5)]),
+    }
+    for nome, modo in (("conta", MODO_CONTA), ("construindo", MODO_CONSTRUINDO)):
+        casos[f"apptest_rerun[{nome}]"] = _rerun_pagina(modo)
+    return casos
+
+
+def _rerun_pagina(modo):
+    """Rerun completo de teste2.py no modo dado, depois de simular (AppTest montado sob demanda)."""
+    estado = {}
+
+    def rerun():
+        if "app" not in estado:
+            from streamlit.testing.v1 import AppTest
+
+            app = AppTest.from_file(os.path.join(RAIZ, "teste2.py"), default_timeout=60).run()
+            app.radio(key="modo_simulacao").set_value(modo).run()
+            app.button(key="simular").click().run()
+            if app.exception:
+                raise RuntimeError(f"teste2.py falhou: {app.exception}")
+            estado["app"] = app
+        estado["app"].run()
+
+    return rerun
+
+
+def medir(funcao):
+    """Melhor e mediana do tempo por chamada (µs) e pico de memória de uma chamada (KiB)."""
+    funcao()  # aquece caches, imports e o AppTest
+    temporizador = timeit.Timer(funcao)
+    numero, _ = temporizador.autorange()
+    amostras = [t / numero * 1e6 for t in temporizador.repeat(repeat=5, number=numero)]
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "tempo_us": round(min(amostras), 3),
+        "mediana_us": round(statistics.median(amostras), 3),
+        "memoria_kib": round(pico / 1024, 1),
+    }
+
+
+def maquina():
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "numpy": np.__version__,
+    }
+
+
+def comparar(atual, base, tolerancia_tempo, tolerancia_memoria):
+    """Lista de (caso, descrição) dos casos que passaram da base além das folgas."""
+    regressoes = []
+    for nome, medida in atual.items():
+        anterior = base.get(nome)
+        if anterior is None:
+            continue
+        limite_tempo = anterior["tempo_us"] * (1 + tolerancia_tempo) + FOLGA_TEMPO_US
+        if medida["tempo_us"] > limite_tempo:
+            regressoes.append((nome, f"tempo {medida['tempo_us']:.1f} µs > {limite_tempo:.1f} µs "
+                                     f"(base {anterior['tempo_us']:.1f})"))
+        limite_memoria = anterior["memoria_kib"] * (1 + tolerancia_memoria) + FOLGA_MEMORIA_KIB
+        if medida["memoria_kib"] > limite_memoria:
+            regressoes.append((nome, f"memória {medida['memoria_kib']:.1f} KiB > {limite_memoria:.1f} KiB "
+                                     f"(base {anterior['memoria_kib']:.1f})"))
+    return regressoes
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argumentos.add_argument("filtros", nargs="*")
+    argumentos.add_argument("--gravar", action="store_true", help="grava as medidas como nova linha de base")
+    argumentos.add_argument("--tolerancia", type=float, default=TOLERANCIA_TEMPO)
+    argumentos.add_argument("--tolerancia-memoria", type=float, default=TOLERANCIA_MEMORIA)
+    argumentos.add_argument("--base", default=LINHA_DE_BASE)
+    argumentos.add_argument("--saida", help="grava também as medidas atuais neste JSON")
+    args = argumentos.parse_args()
+
+    base = {}
+    if os.path.exists(args.base):
+        with open(args.base, encoding="utf-8") as arquivo:
+            conteudo = json.load(arquivo)
+        base = conteudo["casos"]
+        if conteudo.get("maquina") != maquina() and not args.gravar:
+            print("aviso: linha de base gravada em outra máquina/ambiente; compare com cuidado")
+
+    atual = {}
+    print(f"{'caso':<46}{'melhor (µs)':>14}{'mediana (µs)':>14}{'memória (KiB)':>15}{'base (µs)':>12}")
+    for nome, funcao in _casos().items():
+        if args.filtros and not any(f in nome for f in args.filtros):
+            continue
+        medida = atual[nome] = medir(funcao)
+        referencia = f"{base[nome]['tempo_us']:.1f}" if nome in base else "-"
+        print(f"{nome:<46}{medida['tempo_us']:>14.1f}{medida['mediana_us']:>14.1f}"
+              f"{medida['memoria_kib']:>15.1f}{referencia:>12}")
+
+    resultado = {"maquina": maquina(), "casos": atual}
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    if args.gravar:
+        # Casos fora do filtro continuam com a medida anterior
+        resultado["casos"] = {**base, **atual}
+        with open(args.base, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+            arquivo.write("\n")
+        print(f"linha de base gravada em {os.path.relpath(args.base, RAIZ)}")
+        return 0
+
+    regressoes = comparar(atual, base, args.tolerancia, args.tolerancia_memoria)
+    for nome, descricao in regressoes:
+        print(f"REGRESSÃO {nome}: {descricao}")
+    if not base:
+        print("sem linha de base: rode com --gravar para criar uma")
+    elif not regressoes:
+        print("nenhuma regressão em relação à linha de base")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
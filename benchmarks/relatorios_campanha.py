@@ -0,0 +1,96 @@
+"""Benchmark: documentos de uma campanha inteira num ZIP (solarsim.relatorios).
+
+Gera um CSV sintético de contas, roda processar_arquivo com saída .zip (um
+processo, para medir só a renderização) e compara com o caminho de antes:
+simular + gerar_resumo_txt por proposta, gravando cada TXT no ZIP. Mostra
+propostas/s, o pico de memória Python (tracemalloc, numa segunda execução,
+porque ele deixa as alocações bem mais lentas) e o tamanho do ZIP, e
+confere que cada TXT do lote é igual ao gerar_resumo_txt da mesma conta. Uso:
+
+    python benchmarks/relatorios_campanha.py [propostas] [bloco]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solarsim.calculos import gerar_resumo_txt, simular  # noqa: E402
+from solarsim.processar_lote import CIDADE_PADRAO, processar_arquivo  # noqa: E402
+
+CONEXOES = ("Monofásica", "Bifásica", "Trifásica")
+
+
+def gerar_contas(caminho, n, semente=0):
+    """CSV com consumo inteiro, TE/TUSD, conexão e orçamento em ~1/4 das linhas."""
+    rng = np.random.default_rng(semente)
+    consumo = rng.integers(80, 2000, n)
+    te = np.round(rng.uniform(0.25, 0.45, n), 4)
+    tusd = np.round(rng.uniform(0.35, 0.70, n), 4)
+    conexao = rng.integers(0, 3, n)
+    orcamento = np.where(rng.random(n) < 0.25, np.round(rng.uniform(4_000, 80_000, n), 2), np.nan)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write("consumo_kwh,tarifa_te,tarifa_tusd,tipo_conexao,orcamento\n")
+        for i in range(n):
+            arquivo.write(f"{consumo[i]},{te[i]},{tusd[i]},{CONEXOES[conexao[i]]},"
+                          f"{'' if np.isnan(orcamento[i]) else orcamento[i]}\n")
+    return consumo, te + tusd, conexao, orcamento
+
+
+def _medir(funcao):
+    """(segundos, pico de memória em MiB) de funcao(), em execuções separadas."""
+    inicio = time.perf_counter()
+    funcao()
+    decorrido = time.perf_counter() - inicio
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return decorrido, pico / 2**20
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    bloco = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    with tempfile.TemporaryDirectory() as pasta:
+        contas = os.path.join(pasta, "contas.csv")
+        consumo, tarifa, conexao, orcamento = gerar_contas(contas, n)
+        so_txt = os.path.join(pasta, "so_txt.zip")
+        campanha = os.path.join(pasta, "campanha.zip")
+        por_proposta = os.path.join(pasta, "por_proposta.zip")
+
+        def uma_a_uma():
+            with zipfile.ZipFile(por_proposta, "w", zipfile.ZIP_DEFLATED) as destino:
+                for i in range(n):
+                    R = simular(int(consumo[i]), float(tarifa[i]), CIDADE_PADRAO, CONEXOES[conexao[i]],
+                                None if np.isnan(orcamento[i]) else float(orcamento[i]))
+                    destino.writestr(f"txt/proposta_{i + 1:07d}.txt", gerar_resumo_txt(R, R["dados"]))
+
+        print(f"{n:,} propostas, blocos de {bloco:,}")
+        medidas = {
+            "simular + gerar_resumo_txt (só TXT)": (_medir(uma_a_uma), por_proposta),
+            "relatorios, só TXT": (_medir(lambda: processar_arquivo(
+                contas, so_txt, bloco, processos=1, progresso=None, formatos=("txt",))), so_txt),
+        }
+        with zipfile.ZipFile(so_txt) as zip_lote, zipfile.ZipFile(por_proposta) as zip_escalar:
+            diferentes = [nome for nome in zip_escalar.namelist() if zip_lote.read(nome) != zip_escalar.read(nome)]
+        print(f"TXT iguais ao gerar_resumo_txt: {n - len(diferentes):,}/{n:,}")
+        if diferentes:
+            print(f"  primeiro diferente: {diferentes[0]}")
+
+        medidas["relatorios, TXT + HTML + CSV"] = (_medir(lambda: processar_arquivo(
+            contas, campanha, bloco, processos=1, progresso=None)), campanha)
+        for nome, ((segundos, pico_mib), caminho) in medidas.items():
+            print(f"{nome:<38} {n / segundos:>10,.0f} propostas/s  pico {pico_mib:7.1f} MiB  "
+                  f"ZIP {os.path.getsize(caminho) / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Benchmark: empacotamento de módulos em telhados (solarsim.telhado).
+
+Gera telhados sintéticos de 1 a 4 águas (retângulos, trapézios e
+triângulos de telhado de quatro águas, águas em L), parte deles com
+obstruções, e mede telhados/s de capacidade_lote (só a contagem, em um e
+em vários processos) e de empacotar_telhado com o arranjo. Depois confere
+cada arranjo sem usar a grade: todo módulo dentro da água e a pelo menos
+o recuo das bordas, longe das obstruções pela folga, e sem sobreposição.
+Nas águas retangulares sem obstrução, compara com a conta fechada
+(fileiras × colunas na melhor orientação única). Uso:
+
+    python benchmarks/telhado_empacotamento.py [telhados] [processos]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solarsim.telhado import (  # noqa: E402
+    COMPRIMENTO_MODULO_M,
+    ESPACAMENTO_M,
+    FOLGA_OBSTRUCAO_M,
+    LARGURA_MODULO_M,
+    RECUO_M,
+    capacidade_lote,
+    empacotar_telhado,
+    retangulo,
+)
+
+
+def gerar_telhados(n, semente=0):
+    """Lista de telhados (listas de águas) com formas e tamanhos variados."""
+    rng = np.random.default_rng(semente)
+    telhados = []
+    for _ in range(n):
+        aguas = []
+        for _ in range(rng.integers(1, 5)):
+            largura, comprimento = rng.uniform(3, 14), rng.uniform(2.5, 8)
+            forma = rng.integers(0, 4)
+            if forma == 0:
+                vertices = retangulo(largura, comprimento)
+            elif forma == 1:  # trapézio: água lateral de telhado de quatro águas
+                recuo_topo = rng.uniform(0.5, largura / 3)
+                vertices = [(0, 0), (largura, 0), (largura - recuo_topo, comprimento), (recuo_topo, comprimento)]
+            elif forma == 2:  # triângulo: água de cabeceira
+                vertices = [(0, 0), (largura, 0), (largura / 2, min(comprimento, largura / 2))]
+            else:  # L
+                corte_x, corte_y = largura * rng.uniform(0.4, 0.7), comprimento * rng.uniform(0.4, 0.7)
+                vertices = [(0, 0), (largura, 0), (largura, corte_y), (corte_x, corte_y),
+                            (corte_x, comprimento), (0, comprimento)]
+            obstrucoes = []
+            if rng.random() < 0.4:
+                lado = rng.uniform(0.3, 1.2)
+                obstrucoes.append(retangulo(lado, lado, rng.uniform(0, largura / 2), rng.uniform(0, comprimento / 2)))
+            aguas.append({"vertices": [tuple(map(float, v)) for v in vertices], "obstrucoes": obstrucoes})
+        telhados.append(aguas)
+    return telhados
+
+
+def _dentro(pontos, vertices):
+    """Ponto dentro do polígono (par-ímpar), vetorizado."""
+    v = np.asarray(vertices)
+    a, b = v, np.roll(v, -1, axis=0)
+    x, y = pontos[:, 0:1], pontos[:, 1:2]
+    cruza = (a[:, 1] > y) != (b[:, 1] > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cruzamento = a[:, 0] + (y - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    return ((cruza & (x < x_cruzamento)).sum(axis=1) % 2) == 1
+
+
+def _distancia_bordas(pontos, vertices):
+    """Menor distância de cada ponto às arestas do polígono."""
+    v = np.asarray(vertices)
+    a, b = v, np.roll(v, -1, axis=0)
+    d = b - a
+    p = pontos[:, None, :]
+    t = np.clip(((p - a) * d).sum(axis=2) / (d * d).sum(axis=1), 0, 1)
+    return np.hypot(*np.moveaxis(p - (a + t[..., None] * d), 2, 0)).min(axis=1)
+
+
+def _pontos_borda(modulos, por_lado=12):
+    """Pontos no contorno de cada módulo: (n, 4 * por_lado, 2)."""
+    s = np.linspace(0, 1, por_lado, endpoint=False)
+    x, y, w, h = (modulos[:, i:i + 1] for i in range(4))
+    lados = [(x + s * w, y), (x + w, y + s * h), (x + w - s * w, y + h), (x, y + h - s * h)]
+    return np.stack([np.concatenate([lx + 0 * s for lx, _ in lados], axis=1),
+                     np.concatenate([ly + 0 * s for _, ly in lados], axis=1)], axis=2)
+
+
+def conferir_agua(agua, resultado, tolerancia=1e-6):
+    """Lista de problemas do arranjo de uma água (vazia se estiver tudo certo)."""
+    modulos = resultado["modulos"]
+    if len(modulos) != resultado["paineis"]:
+        return ["contagem diferente do arranjo"]
+    if not len(modulos):
+        return []
+    problemas = []
+    pontos = _pontos_borda(modulos).reshape(-1, 2)
+    if not _dentro(pontos, agua["vertices"]).all():
+        problemas.append("módulo fora da água")
+    if _distancia_bordas(pontos, agua["vertices"]).min() < RECUO_M - tolerancia:
+        problemas.append("módulo dentro do recuo")
+    for obstrucao in agua["obstrucoes"]:
+        if _dentro(pontos, obstrucao).any() or _distancia_bordas(pontos, obstrucao).min() < FOLGA_OBSTRUCAO_M - tolerancia:
+            problemas.append("módulo na folga de uma obstrução")
+    x, y, w, h = modulos.T
+    sobrepostos = ((x[:, None] < x + w - tolerancia) & (x + w - tolerancia > x[:, None])
+                   & (x[:, None] + w[:, None] - tolerancia > x) & (y[:, None] < y + h - tolerancia)
+                   & (y[:, None] + h[:, None] - tolerancia > y))
+    np.fill_diagonal(sobrepostos, False)
+    if sobrepostos.any():
+        problemas.append("módulos sobrepostos")
+    return problemas
+
+
+def conta_fechada(largura, comprimento):
+    """Máximo em fileiras de uma orientação só numa água retangular."""
+    util_x, util_y = largura - 2 * RECUO_M + ESPACAMENTO_M, comprimento - 2 * RECUO_M + ESPACAMENTO_M
+    melhor = 0
+    for w, h in ((LARGURA_MODULO_M, COMPRIMENTO_MODULO_M), (COMPRIMENTO_MODULO_M, LARGURA_MODULO_M)):
+        melhor = max(melhor, math.floor(util_x / (w + ESPACAMENTO_M)) * math.floor(util_y / (h + ESPACAMENTO_M)))
+    return melhor
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    processos = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    telhados = gerar_telhados(n)
+    aguas = sum(len(t) for t in telhados)
+    print(f"{n:,} telhados, {aguas:,} águas ({aguas / n:.1f} por telhado)")
+
+    medidas = {}
+    inicio = time.perf_counter()
+    capacidades = capacidade_lote(telhados)
+    medidas["capacidade_lote, 1 processo"] = time.perf_counter() - inicio
+    if processos > 1:
+        inicio = time.perf_counter()
+        paralelo = capacidade_lote(telhados, processos=processos)
+        medidas[f"capacidade_lote, {processos} processos"] = time.perf_counter() - inicio
+        assert (paralelo == capacidades).all()
+    inicio = time.perf_counter()
+    resultados = [empacotar_telhado(t) for t in telhados]
+    medidas["empacotar_telhado (com arranjo)"] = time.perf_counter() - inicio
+    for nome, segundos in medidas.items():
+        print(f"{nome:<36} {n / segundos:>8,.0f} telhados/s  {aguas / segundos:>8,.0f} águas/s")
+
+    assert [r["paineis"] for r in resultados] == capacidades.tolist()
+    com_problema = 0
+    retangulares = iguais = perdidos = 0
+    for telhado, resultado in zip(telhados, resultados):
+        for agua, parcial in zip(telhado, resultado["aguas"]):
+            problemas = conferir_agua(agua, parcial)
+            if problemas:
+                com_problema += 1
+                if com_problema <= 5:
+                    print(f"  problema: {', '.join(problemas)} em {agua['vertices']}")
+            v = np.asarray(agua["vertices"])
+            if len(v) == 4 and not agua["obstrucoes"] and len(set(v[:, 0])) == 2 and len(set(v[:, 1])) == 2:
+                retangulares += 1
+                esperado = conta_fechada(*(v.max(axis=0) - v.min(axis=0)))
+                iguais += parcial["paineis"] >= esperado
+                perdidos += max(0, esperado - parcial["paineis"])
+    print(f"águas válidas: {aguas - com_problema:,}/{aguas:,}")
+    print(f"retangulares sem obstrução: {iguais:,}/{retangulares:,} alcançam a conta fechada "
+          f"({perdidos} módulos a menos pela grade)")
+    print(f"média: {capacidades.mean():.1f} módulos por telhado")
+
+
+if __name__ == "__main__":
+    main()
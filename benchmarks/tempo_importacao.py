@@ -0,0 +1,49 @@
+"""Benchmark do tempo de importação do núcleo do SolarSim.
+
+Cada medição roda num interpretador novo, para não aproveitar módulos já
+carregados. Uso:
+
+    python benchmarks/tempo_importacao.py [repeticoes]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = [
+    "solarsim",
+    "solarsim.calculos",
+    "solarsim.lote",
+    "solarsim.grafico",
+]
+
+CODIGO_MEDICAO = (
+    "import time; t0 = time.perf_counter(); import {modulo}; "
+    "print((time.perf_counter() - t0) * 1000)"
+)
+
+
+def medir_importacao(modulo, repeticoes):
+    """Devolve os tempos (ms) de importação do módulo em interpretadores novos."""
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", CODIGO_MEDICAO.format(modulo=modulo)],
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+        )
+        tempos.append(float(saida.stdout.strip()))
+    return tempos
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"{'módulo':<22}{'mín (ms)':>10}{'mediana (ms)':>14}")
+    for modulo in MODULOS:
+        tempos = medir_importacao(modulo, repeticoes)
+        print(f"{modulo:<22}{min(tempos):>10.2f}{statistics.median(tempos):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
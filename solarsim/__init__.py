@@ -0,0 +1,14 @@
+"""SolarSim: núcleo de simulação solar, independente da página Streamlit.
+
+Importar este pacote é barato: nada de st.*, locale, pandas ou altair.
+As versões em lote (NumPy) ficam em solarsim.lote e o gráfico em
+solarsim.grafico, importados só por quem precisa deles.
+"""
+from solarsim.calculos import (
+    calcular_sistema_por_orcamento,
+    calcular_sistema_solar,
+    estimar_consumo_casa_nova,
+    formatar_payback,
+    formatar_reais,
+    gerar_resumo_txt,
+)
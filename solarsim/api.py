@@ -0,0 +1,354 @@
+"""API HTTP/JSON local do SolarSim (asyncio, sem dependências extras).
+
+Expõe o fluxo do botão "Simular" para integrações (CRMs de instaladores):
+
+    GET  /saude             {"status": "ok"}
+    GET  /metrics           métricas no formato do Prometheus (solarsim.metricas)
+    POST /simular           uma simulação
+    POST /simular/lote      {"propostas": [simulação, ...]}
+
+Cada simulação é um objeto com consumo (kWh/mês) e tarifa (R$/kWh) e,
+opcionais, cidade, conexao (texto livre ou nº de fases) e orcamento (R$;
+sem ele, o sistema é dimensionado pelo consumo). Nos dois endpoints, um
+opcional null vale o mesmo que ausente. /simular devolve o resultado de
+calculos.simular mais nova_fatura; /simular/lote devolve uma linha por
+simulação com as colunas de processar_lote.simular_bloco, na mesma ordem.
+
+A simulação avulsa leva dezenas de µs e roda no próprio laço de eventos;
+mandá-la para outro processo custaria mais que ela. O lote inteiro (ler o
+JSON, simular em NumPy e gerar a resposta) roda num pool de processos, e
+o laço de eventos só move bytes: ele nunca fica parado num lote grande. No
+máximo 2 lotes por processo ficam em voo, como em processar_arquivo; os
+demais esperam sem ocupar o pool. O servidor fala HTTP/1.1 com keep-alive
+e Content-Length (sem chunked). Uso:
+
+    python -m solarsim.api [--porta 8765] [--processos N]
+
+Carga de teste: benchmarks/carga_api.py.
+"""
+import argparse
+import asyncio
+import http
+import json
+import math
+import os
+import signal
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from solarsim.calculos import HSP_CAPITAIS, calcular_nova_fatura, simular
+from solarsim.lote import minimo_kwh_por_conexao_lote
+from solarsim.metricas import REGISTRO
+
+CIDADE_PADRAO = "Rio das Ostras (RJ)"
+CONEXAO_PADRAO = "Bifásica"
+PORTA_PADRAO = 8765
+MAX_CORPO = 32 << 20  # bytes por requisição
+MAX_PROPOSTAS_LOTE = 100_000
+# Maiores valores aceitos: acima deles o dimensionamento estoura float/int64
+MAXIMO_CONSUMO = 1_000_000  # kWh/mês
+MAXIMO_TARIFA = 100  # R$/kWh
+MAXIMO_ORCAMENTO = 1_000_000_000  # R$
+
+# Texto de calculos.simular para cada taxa mínima de minimo_kwh_por_conexao_lote
+_CONEXAO_POR_MINIMO = {30: "Monofásica", 50: "Bifásica", 100: "Trifásica"}
+
+
+class ErroRequisicao(ValueError):
+    """Entrada inválida: vira uma resposta 4xx com {"erro": mensagem}."""
+
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+    def __reduce__(self):  # volta do pool de processos com o status
+        return type(self), (str(self), self.status)
+
+
+def _numero(item, campo, obrigatorio=True, minimo=None, inclusivo=True, maximo=None):
+    valor = item.get(campo)
+    if valor is None and not obrigatorio:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor):
+        raise ErroRequisicao(f"Campo {campo!r}: informe um número.")
+    if minimo is not None and (valor < minimo or (valor == minimo and not inclusivo)):
+        raise ErroRequisicao(f"Campo {campo!r}: deve ser {'>=' if inclusivo else '>'} {minimo}.")
+    if maximo is not None and valor > maximo:
+        raise ErroRequisicao(f"Campo {campo!r}: deve ser <= {maximo}.")
+    return valor
+
+
+def _cidade(item):
+    """Cidade de uma simulação avulsa: texto, com a padrão quando ausente ou null."""
+    cidade = item.get("cidade")
+    if cidade is None:
+        return CIDADE_PADRAO
+    if not isinstance(cidade, str):
+        raise ErroRequisicao("Campo 'cidade': informe um texto.")
+    if cidade not in HSP_CAPITAIS:
+        raise ErroRequisicao(f"Cidade sem HSP ou custo do Wp cadastrado: {cidade}")
+    return cidade
+
+
+def _conexao(item):
+    """Conexão de uma simulação avulsa pela mesma regra do lote (texto livre ou nº de fases)."""
+    conexao = item.get("conexao")
+    if conexao is None:
+        return CONEXAO_PADRAO
+    return _CONEXAO_POR_MINIMO[int(minimo_kwh_por_conexao_lote([conexao])[0])]
+
+
+def simular_json(item):
+    """Resultado de calculos.simular (mais nova_fatura) para um objeto da API."""
+    if not isinstance(item, dict):
+        raise ErroRequisicao("O corpo deve ser um objeto JSON.")
+    consumo = _numero(item, "consumo", minimo=0, inclusivo=False, maximo=MAXIMO_CONSUMO)
+    tarifa = _numero(item, "tarifa", minimo=0, maximo=MAXIMO_TARIFA)
+    orcamento = _numero(item, "orcamento", obrigatorio=False, minimo=0, inclusivo=False,
+                        maximo=MAXIMO_ORCAMENTO)
+    R = simular(consumo, tarifa, _cidade(item), _conexao(item), orcamento)
+    R["nova_fatura"] = calcular_nova_fatura(R["saldo_kwh"], R["minimo_kwh"], tarifa)
+    return R
+
+
+def _coluna_numerica(tabela, campo, obrigatorio=True, minimo=0, inclusivo=True, maximo=None):
+    """Coluna float da tabela do lote; ErroRequisicao apontando a primeira linha inválida."""
+    import pandas as pd
+
+    if campo not in tabela.columns:
+        if obrigatorio:
+            raise ErroRequisicao(f"Campo {campo!r} ausente nas propostas.")
+        return None
+    bruta = tabela[campo]
+    valores = pd.to_numeric(bruta.where(bruta.map(type) != bool), errors="coerce").astype("float64")
+    invalidos = valores.isna() & (bruta.notna() | obrigatorio)
+    invalidos |= (valores < minimo) if inclusivo else (valores <= minimo)
+    if maximo is not None:
+        invalidos |= valores > maximo
+    if invalidos.any():
+        linha = int(invalidos.to_numpy().argmax())
+        faixa = f"{'>=' if inclusivo else '>'} {minimo}" + (f" e <= {maximo}" if maximo is not None else "")
+        raise ErroRequisicao(f"Proposta {linha}: campo {campo!r} deve ser um número {faixa}.")
+    return valores.to_numpy()
+
+
+def _coluna_cidade(tabela):
+    """Coluna cidade do lote (None se ausente); como em _cidade, null fica com a padrão."""
+    if "cidade" not in tabela.columns:
+        return None
+    cidade = tabela["cidade"]
+    invalidos = cidade.notna() & (cidade.map(type) != str)
+    if invalidos.any():
+        linha = int(invalidos.to_numpy().argmax())
+        raise ErroRequisicao(f"Proposta {linha}: campo 'cidade' deve ser um texto.")
+    return cidade.fillna(CIDADE_PADRAO)
+
+
+def _coluna_conexao(tabela):
+    """Coluna tipo_conexao do lote como texto.
+
+    Com alguma proposta sem conexao, o pandas guarda os nº de fases como
+    float: 3 viraria "3.0". Números inteiros voltam ao texto do inteiro.
+    """
+    import pandas as pd
+
+    if "conexao" not in tabela.columns:
+        return CONEXAO_PADRAO
+    conexao = tabela["conexao"]
+    fases = pd.to_numeric(conexao.where(conexao.map(type) != bool), errors="coerce")
+    inteiras = fases % 1 == 0
+    texto = conexao.fillna(CONEXAO_PADRAO).astype(str)
+    return texto.mask(inteiras, fases.where(inteiras).astype("Int64").astype(str))
+
+
+def simular_lote_json(corpo):
+    """Corpo de /simular/lote -> corpo da resposta (bytes); roda nos processos do pool."""
+    import pandas as pd
+
+    from solarsim.processar_lote import simular_bloco
+
+    try:
+        pedido = json.loads(corpo)
+    except ValueError:
+        raise ErroRequisicao("Corpo não é um JSON válido.")
+    propostas = pedido.get("propostas") if isinstance(pedido, dict) else None
+    if not isinstance(propostas, list) or not all(isinstance(p, dict) for p in propostas):
+        raise ErroRequisicao('Envie {"propostas": [objeto, ...]}.')
+    if len(propostas) > MAX_PROPOSTAS_LOTE:
+        raise ErroRequisicao(f"No máximo {MAX_PROPOSTAS_LOTE:,} propostas por lote.", status=413)
+    if not propostas:
+        return b'{"propostas":[]}'
+
+    tabela = pd.DataFrame.from_records(propostas)
+    bloco = pd.DataFrame({
+        "consumo_kwh": _coluna_numerica(tabela, "consumo", inclusivo=False, maximo=MAXIMO_CONSUMO),
+        "tarifa_total": _coluna_numerica(tabela, "tarifa", maximo=MAXIMO_TARIFA),
+        "tipo_conexao": _coluna_conexao(tabela),
+    })
+    cidade = _coluna_cidade(tabela)
+    if cidade is not None:
+        bloco["cidade"] = cidade
+    orcamento = _coluna_numerica(tabela, "orcamento", obrigatorio=False, inclusivo=False,
+                                 maximo=MAXIMO_ORCAMENTO)
+    if orcamento is not None:
+        bloco["orcamento"] = orcamento
+    try:
+        resultado = simular_bloco(bloco, CIDADE_PADRAO)
+    except ValueError as erro:
+        raise ErroRequisicao(str(erro))
+    linhas = resultado.to_json(orient="records", force_ascii=False, double_precision=10)
+    return b'{"propostas":' + linhas.encode("utf-8") + b"}"
+
+
+def _corpo_json(objeto):
+    return json.dumps(objeto, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ServicoSimulacao:
+    """Servidor asyncio da API; o pool de processos é criado em iniciar()."""
+
+    def __init__(self, processos=None, max_corpo=MAX_CORPO):
+        self.processos = processos or os.cpu_count() or 1
+        self.max_corpo = max_corpo
+        self._pool = None
+        self._vagas_lote = None
+        self._rotas = {
+            ("GET", "/saude"): self._saude,
+            ("GET", "/metrics"): self._metricas,
+            ("POST", "/simular"): self._simular,
+            ("POST", "/simular/lote"): self._simular_lote,
+        }
+
+    async def iniciar(self, endereco="127.0.0.1", porta=PORTA_PADRAO):
+        """Abre o pool e o socket; devolve o asyncio.Server."""
+        self._pool = ProcessPoolExecutor(max_workers=self.processos)
+        self._vagas_lote = asyncio.Semaphore(2 * self.processos)
+        return await asyncio.start_server(self._atender, endereco, porta)
+
+    def fechar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _saude(self, corpo):
+        return 200, b'{"status":"ok"}', "application/json"
+
+    async def _metricas(self, corpo):
+        return 200, REGISTRO.formato_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+
+    async def _simular(self, corpo):
+        try:
+            item = json.loads(corpo)
+        except ValueError:
+            raise ErroRequisicao("Corpo não é um JSON válido.")
+        return 200, _corpo_json(simular_json(item)), "application/json"
+
+    async def _simular_lote(self, corpo):
+        async with self._vagas_lote:
+            resposta = await asyncio.get_running_loop().run_in_executor(self._pool, simular_lote_json, corpo)
+        return 200, resposta, "application/json"
+
+    async def _responder(self, metodo, caminho, corpo):
+        caminho = caminho.split("?", 1)[0]
+        rota = self._rotas.get((metodo, caminho))
+        if rota is None:
+            if any(c == caminho for _, c in self._rotas):
+                return 405, _corpo_json({"erro": f"Método {metodo} não aceito em {caminho}."}), "application/json"
+            return 404, _corpo_json({"erro": f"Rota desconhecida: {caminho}"}), "application/json"
+        REGISTRO.contar(f"api {caminho}")
+        try:
+            with REGISTRO.cronometrar(f"api {caminho}"):
+                return await rota(corpo)
+        except ErroRequisicao as erro:
+            REGISTRO.contar(f"api {caminho} erro {erro.status}")
+            return erro.status, _corpo_json({"erro": str(erro)}), "application/json"
+        except Exception:
+            REGISTRO.contar(f"api {caminho} erro 500")
+            traceback.print_exc()
+            return 500, _corpo_json({"erro": "Erro interno ao simular."}), "application/json"
+
+    async def _atender(self, leitor, escritor):
+        """Uma conexão: requisições em sequência enquanto houver keep-alive."""
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, caminho, versao = linha.decode("latin-1").split()
+                except ValueError:
+                    break
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = linha.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                manter = cabecalhos.get("connection", "").lower() != "close" if versao == "HTTP/1.1" \
+                    else cabecalhos.get("connection", "").lower() == "keep-alive"
+                tamanho = cabecalhos.get("content-length", "0") or "0"
+                tamanho = int(tamanho) if tamanho.isascii() and tamanho.isdigit() else None
+                if "transfer-encoding" in cabecalhos:
+                    status, corpo, tipo = 411, _corpo_json({"erro": "Envie o corpo com Content-Length."}), \
+                        "application/json"
+                    manter = False
+                elif tamanho is None:
+                    status, corpo, tipo = 400, _corpo_json({"erro": "Content-Length inválido."}), "application/json"
+                    manter = False
+                elif tamanho > self.max_corpo:
+                    status, corpo, tipo = 413, _corpo_json({"erro": f"Corpo maior que {self.max_corpo} bytes."}), \
+                        "application/json"
+                    manter = False
+                else:
+                    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+                    status, corpo, tipo = await self._responder(metodo, caminho, corpo)
+
+                escritor.write(
+                    f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: {tipo}; charset=utf-8\r\n"
+                    f"Content-Length: {len(corpo)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode("latin-1") + corpo
+                )
+                await escritor.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # cliente sumiu no meio da requisição, ou cabeçalhos malformados
+        finally:
+            escritor.close()
+
+
+async def servir(endereco="127.0.0.1", porta=PORTA_PADRAO, processos=None):
+    """Atende até ser cancelado (Ctrl+C ou SIGTERM, que também encerram o pool)."""
+    servico = ServicoSimulacao(processos)
+    servidor = await servico.iniciar(endereco, porta)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:  # Windows
+        pass
+    print(f"SolarSim API em http://{endereco}:{porta} ({servico.processos} processos para lotes)",
+          file=sys.stderr, flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servico.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m solarsim.api",
+                                     description="API HTTP/JSON local de simulação do SolarSim.")
+    parser.add_argument("--endereco", default="127.0.0.1", help="endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help=f"porta (padrão: {PORTA_PADRAO})")
+    parser.add_argument("--processos", type=int, default=None, help="processos para lotes (padrão: nº de núcleos)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.endereco, args.porta, args.processos))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
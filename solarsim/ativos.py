@@ -0,0 +1,158 @@
+"""Ativos estáticos da página (imagens de ajuda), servidos pelo próprio app.
+
+Na construção (`python -m solarsim.ativos`), cada imagem de FONTES é
+redimensionada para no máximo `largura` px, recomprimida em WebP e JPEG
+(progressivo, sem EXIF) e gravada em static/ com o hash do conteúdo no
+nome (ajuda_consumo.3f2a9c01d4.webp). static/manifesto.json liga o nome
+lógico aos arquivos; a página pede `url_ativo("ajuda_consumo")` e recebe
+app/static/<arquivo>, servido pelo Streamlit com server.enableStaticServing.
+Sem o manifesto (ativos não construídos), url_ativo devolve a URL reserva.
+
+Como o nome muda junto com o conteúdo, o navegador pode guardar cada
+arquivo para sempre: CabecalhosCacheAtivos (middleware ASGI, usado em
+app.py) acrescenta Cache-Control immutable de um ano aos arquivos com
+hash e no-cache ao resto de app/static. Pillow é opcional: sem ele, as
+imagens são copiadas como estão, só com o hash no nome.
+"""
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_STATIC = os.path.join(RAIZ, "static")
+MANIFESTO = os.path.join(PASTA_STATIC, "manifesto.json")
+PREFIXO_URL = "app/static/"
+
+# Nome lógico -> (imagem original, largura máxima em px); a da tarifa é uma faixa
+# larga da conta, com texto miúdo, e fica mais larga para continuar legível
+FONTES = {
+    "ajuda_consumo": ("Imagem do WhatsApp de 2025-11-09 à(s) 17.36.05_52053dd3.JPG", 720),
+    "ajuda_tarifa": ("Imagem do WhatsApp de 2025-11-09 à(s) 17.36.05_00537b91.JPG", 1080),
+}
+QUALIDADE_JPEG = 80
+QUALIDADE_WEBP = 78
+
+CACHE_IMUTAVEL = b"public, max-age=31536000, immutable"
+_COM_HASH = re.compile(r"\.[0-9a-f]{10}\.[a-z0-9]+$")
+
+
+def _nome_com_hash(nome, extensao, conteudo):
+    return f"{nome}.{hashlib.sha256(conteudo).hexdigest()[:10]}.{extensao}"
+
+
+def _variantes(caminho, largura):
+    """{extensão: bytes} da imagem otimizada, e (largura, altura)."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        with open(caminho, "rb") as arquivo:
+            conteudo = arquivo.read()
+        extensao = os.path.splitext(caminho)[1].lstrip(".").lower().replace("jpeg", "jpg")
+        print(f"aviso: Pillow ausente; {os.path.basename(caminho)} copiada sem otimizar "
+              "(pip install pillow)", file=sys.stderr)
+        return {extensao: conteudo}, None
+
+    with Image.open(caminho) as original:
+        imagem = ImageOps.exif_transpose(original).convert("RGB")
+    if imagem.width > largura:
+        imagem = imagem.resize((largura, round(imagem.height * largura / imagem.width)), Image.LANCZOS)
+    variantes = {}
+    saida = io.BytesIO()
+    imagem.save(saida, "JPEG", quality=QUALIDADE_JPEG, optimize=True, progressive=True)
+    variantes["jpg"] = saida.getvalue()
+    try:
+        saida = io.BytesIO()
+        imagem.save(saida, "WEBP", quality=QUALIDADE_WEBP, method=6)
+        variantes["webp"] = saida.getvalue()
+    except (KeyError, OSError):  # Pillow compilado sem libwebp
+        pass
+    return variantes, imagem.size
+
+
+def construir(pasta=PASTA_STATIC, fontes=FONTES):
+    """Gera as variantes e o manifesto em `pasta`; apaga as versões antigas. Devolve o manifesto."""
+    os.makedirs(pasta, exist_ok=True)
+    manifesto = {}
+    for nome, (arquivo, largura) in fontes.items():
+        variantes, tamanho = _variantes(os.path.join(RAIZ, arquivo), largura)
+        entrada = manifesto[nome] = {}
+        for extensao, conteudo in variantes.items():
+            destino = _nome_com_hash(nome, extensao, conteudo)
+            if not os.path.exists(os.path.join(pasta, destino)):
+                with open(os.path.join(pasta, destino), "wb") as saida:
+                    saida.write(conteudo)
+            entrada[extensao] = destino
+        if tamanho:
+            entrada["largura"], entrada["altura"] = tamanho
+
+    em_uso = {arquivo for entrada in manifesto.values() for arquivo in entrada.values() if isinstance(arquivo, str)}
+    for arquivo in os.listdir(pasta):
+        nome = arquivo.split(".", 1)[0]
+        if nome in fontes and _COM_HASH.search(arquivo) and arquivo not in em_uso:
+            os.remove(os.path.join(pasta, arquivo))
+
+    temporario = os.path.join(pasta, "manifesto.json.tmp")
+    with open(temporario, "w", encoding="utf-8") as saida:
+        json.dump(manifesto, saida, ensure_ascii=False, indent=2, sort_keys=True)
+        saida.write("\n")
+    os.replace(temporario, os.path.join(pasta, "manifesto.json"))
+    return manifesto
+
+
+@functools.lru_cache(maxsize=1)
+def carregar_manifesto(caminho=MANIFESTO):
+    """Manifesto dos ativos construídos ({} se ainda não foram construídos)."""
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return {}
+
+
+def url_ativo(nome, reserva=None, formatos=("webp", "jpg")):
+    """URL relativa (app/static/...) do ativo no primeiro formato disponível, ou `reserva`."""
+    entrada = carregar_manifesto().get(nome, {})
+    for formato in formatos:
+        if formato in entrada:
+            return PREFIXO_URL + entrada[formato]
+    return reserva
+
+
+class CabecalhosCacheAtivos:
+    """Middleware ASGI: Cache-Control de um ano nos arquivos de app/static com hash no nome."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        caminho = scope.get("path", "")
+        if scope["type"] != "http" or "/app/static/" not in caminho:
+            await self.app(scope, receive, send)
+            return
+        valor = CACHE_IMUTAVEL if _COM_HASH.search(caminho) else b"no-cache"
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start" and mensagem["status"] in (200, 304):
+                cabecalhos = [(k, v) for k, v in mensagem.get("headers", []) if k.lower() != b"cache-control"]
+                mensagem = {**mensagem, "headers": cabecalhos + [(b"cache-control", valor)]}
+            await send(mensagem)
+
+        await self.app(scope, receive, enviar)
+
+
+def main():
+    manifesto = construir()
+    for nome, entrada in manifesto.items():
+        arquivos = ", ".join(f"{entrada[f]} ({os.path.getsize(os.path.join(PASTA_STATIC, entrada[f])) / 1024:.1f} KiB)"
+                             for f in ("webp", "jpg") if f in entrada)
+        original = os.path.getsize(os.path.join(RAIZ, FONTES[nome][0])) / 1024
+        print(f"{nome}: {arquivos}; original {original:.1f} KiB")
+    print(f"manifesto: {os.path.relpath(MANIFESTO, RAIZ)}")
+
+
+if __name__ == "__main__":
+    main()
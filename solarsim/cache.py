@@ -0,0 +1,179 @@
+"""Cache de resultados compartilhado entre sessões.
+
+Guarda os resultados das simulações por chave canônica das entradas, com
+despejo LRU (limite de itens) e TTL. Opcionalmente usa um segundo nível em
+SQLite, para que os resultados sobrevivam a reinícios do servidor; nesse
+caso os valores precisam ser serializáveis em JSON. O SQLite também é
+limitado: cada gravação apaga as linhas vencidas e, a cada PODA_A_CADA
+gravações, as mais antigas além de max_linhas_sqlite.
+"""
+import collections
+import json
+import sqlite3
+import threading
+import time
+
+from solarsim.calculos import minimo_kwh_por_conexao
+
+_AUSENTE = object()
+
+# Contar as linhas do SQLite custa uma varredura: o limite é conferido a cada tantas gravações
+PODA_A_CADA = 64
+
+
+def chave_simulacao(tipo, consumo, tarifa, cidade, conexao=None, orcamento=None, casa=None):
+    """Chave canônica das entradas de uma simulação.
+
+    A tarifa é a soma já feita do tarifas_list; somas de float como
+    0.4 + 0.45 viram a mesma chave de 0.85. A conexão entra pela taxa mínima
+    em kWh e o modo de orçamento pela presença (e valor) do orçamento. A
+    casa nova (quantidades de estimar_consumo_casa_nova) só entra quando
+    informada: o perfil horário dela muda o autoconsumo do fluxo de caixa.
+    """
+    minimo = minimo_kwh_por_conexao(conexao) if conexao is not None else None
+    modo = "orcamento" if orcamento is not None else "consumo"
+    partes = [
+        tipo,
+        round(float(consumo), 3),
+        round(float(tarifa), 4),
+        cidade,
+        minimo,
+        modo,
+        round(float(orcamento), 2) if orcamento is not None else None,
+    ]
+    if casa is not None:
+        partes.append([int(quantidade) for quantidade in casa])
+    return json.dumps(partes, ensure_ascii=False, separators=(",", ":"))
+
+
+class CacheResultados:
+    """Cache LRU + TTL em memória, com nível opcional em SQLite.
+
+    É seguro para uso concorrente (várias sessões do Streamlit rodam em
+    threads do mesmo processo). Os valores devolvidos são compartilhados:
+    quem os recebe não deve alterá-los.
+    """
+
+    def __init__(self, max_itens=1024, ttl_segundos=3600, caminho_sqlite=None, max_linhas_sqlite=100_000):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self.max_linhas_sqlite = max_linhas_sqlite
+        self._gravacoes = 0
+        self._itens = collections.OrderedDict()
+        self._trava = threading.Lock()
+        self._contadores = collections.Counter()
+        self._banco = None
+        if caminho_sqlite:
+            self._banco = sqlite3.connect(caminho_sqlite, check_same_thread=False)
+            self._banco.execute(
+                "CREATE TABLE IF NOT EXISTS resultados (chave TEXT PRIMARY KEY, valor TEXT NOT NULL, criado REAL NOT NULL)"
+            )
+            self._banco.execute("CREATE INDEX IF NOT EXISTS resultados_criado ON resultados (criado)")
+            self._podar_banco(time.time(), limite=True)
+            self._banco.commit()
+
+    def _expirado(self, criado, agora):
+        return self.ttl_segundos is not None and agora - criado > self.ttl_segundos
+
+    def _guardar_memoria(self, chave, valor, criado):
+        self._itens[chave] = (valor, criado)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+            self._contadores["despejos"] += 1
+
+    def _podar_banco(self, agora, limite):
+        """Apaga do SQLite as linhas vencidas e, com `limite`, as mais antigas além do máximo."""
+        if self.ttl_segundos is not None:
+            apagadas = self._banco.execute(
+                "DELETE FROM resultados WHERE criado < ?", (agora - self.ttl_segundos,)
+            ).rowcount
+            self._contadores["expirados"] += apagadas
+        if limite and self.max_linhas_sqlite is not None:
+            apagadas = self._banco.execute(
+                "DELETE FROM resultados WHERE chave IN "
+                "(SELECT chave FROM resultados ORDER BY criado DESC LIMIT -1 OFFSET ?)",
+                (self.max_linhas_sqlite,)
+            ).rowcount
+            self._contadores["despejos_disco"] += apagadas
+
+    def obter(self, chave, padrao=None):
+        """Devolve o valor da chave ou `padrao` (conta acerto/falha)."""
+        agora = time.time()
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None:
+                valor, criado = item
+                if not self._expirado(criado, agora):
+                    self._itens.move_to_end(chave)
+                    self._contadores["acertos_memoria"] += 1
+                    return valor
+                del self._itens[chave]
+                self._contadores["expirados"] += 1
+
+            if self._banco is not None:
+                linha = self._banco.execute(
+                    "SELECT valor, criado FROM resultados WHERE chave = ?", (chave,)
+                ).fetchone()
+                if linha is not None:
+                    if not self._expirado(linha[1], agora):
+                        valor = json.loads(linha[0])
+                        self._guardar_memoria(chave, valor, linha[1])
+                        self._contadores["acertos_disco"] += 1
+                        return valor
+                    self._banco.execute("DELETE FROM resultados WHERE chave = ?", (chave,))
+                    self._banco.commit()
+                    self._contadores["expirados"] += 1
+
+            self._contadores["falhas"] += 1
+            return padrao
+
+    def guardar(self, chave, valor):
+        """Guarda o valor nos dois níveis do cache."""
+        agora = time.time()
+        with self._trava:
+            self._guardar_memoria(chave, valor, agora)
+            if self._banco is not None:
+                self._banco.execute(
+                    "INSERT OR REPLACE INTO resultados (chave, valor, criado) VALUES (?, ?, ?)",
+                    (chave, json.dumps(valor, ensure_ascii=False), agora)
+                )
+                self._gravacoes += 1
+                self._podar_banco(agora, limite=self._gravacoes % PODA_A_CADA == 0)
+                self._banco.commit()
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Devolve o valor em cache ou calcula com `calcular()` e guarda."""
+        valor = self.obter(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        """Esvazia os dois níveis (os contadores são mantidos)."""
+        with self._trava:
+            self._itens.clear()
+            if self._banco is not None:
+                self._banco.execute("DELETE FROM resultados")
+                self._banco.commit()
+
+    def estatisticas(self):
+        """Contadores de acertos/falhas e ocupação, para dimensionar o cache."""
+        with self._trava:
+            acertos = self._contadores["acertos_memoria"] + self._contadores["acertos_disco"]
+            consultas = acertos + self._contadores["falhas"]
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "ttl_segundos": self.ttl_segundos,
+                "max_linhas_sqlite": self.max_linhas_sqlite,
+                "acertos_memoria": self._contadores["acertos_memoria"],
+                "acertos_disco": self._contadores["acertos_disco"],
+                "falhas": self._contadores["falhas"],
+                "despejos": self._contadores["despejos"],
+                "despejos_disco": self._contadores["despejos_disco"],
+                "expirados": self._contadores["expirados"],
+                "taxa_acerto": acertos / consultas if consultas else 0.0,
+            }
+
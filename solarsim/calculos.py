@@ -0,0 +1,222 @@
+"""Núcleo de cálculo do SolarSim, sem dependências de interface.
+
+Pode ser importado por workers, scripts e testes sem montar a página do
+Streamlit: não chama st.*, não altera o locale e não importa pandas/altair.
+"""
+import locale
+import math
+
+from solarsim.modelos import MODELO_RESUMO_TXT
+
+# --- CONSTANTES DE SIMULAÇÃO GLOBAIS ---
+TAXA_DESEMPENHO = 0.80
+POTENCIA_PAINEL_WP = 550
+AREA_PAINEL_M2 = 2.6
+FATOR_EMISSAO_CO2_KWH = 0.075
+
+# --- VARIAÇÃO SAZONAL (usada no gráfico de resultados) ---
+MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+FATOR_SAZONAL = [1.118, 1.223, 1.052, 1.014, 0.912, 0.890, 0.881, 1.014, 0.960, 0.984, 0.918, 1.042]
+
+
+def formatar_reais(valor: float) -> str:
+    """Formata um float para o padrão R$ X.XXX,XX com fallback."""
+    try:
+        return locale.currency(valor, grouping=True)
+    except:
+        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+# --- BASES DE DADOS (Foco em Rio das Ostras) ---
+HSP_CAPITAIS = {"Rio das Ostras (RJ)": 4.98}
+CUSTO_WP_CAPITAIS = {"Rio das Ostras (RJ)": 2.49}
+LATITUDE_CAPITAIS = {"Rio das Ostras (RJ)": -22.53}
+
+# --- CONSUMO DE UMA CASA NOVA (kWh/mês por item) ---
+CONSUMO_MENSAL_ITEM = {"pessoas": 60, "chuveiros": 70, "ar_cond": 100, "freezer": 40, "home_office": 60}
+
+
+# --- FUNÇÕES DE CÁLCULO (COM ESTRATIFICAÇÃO E INVERSOR) ---
+
+def calcular_sistema_solar(consumo_kwh, tarifa, hsp, custo_wp_regional):
+    """Calculadora por Consumo (kWh -> R$)"""
+    consumo_diario_kwh = consumo_kwh / 30
+    potencia_necessaria_kwp = consumo_diario_kwh / (hsp * TAXA_DESEMPENHO)
+    potencia_necessaria_wp = potencia_necessaria_kwp * 1000
+
+    numero_paineis = max(1, math.ceil(potencia_necessaria_wp / POTENCIA_PAINEL_WP))
+    potencia_final_sistema_wp = numero_paineis * POTENCIA_PAINEL_WP
+    potencia_kwp_final = potencia_final_sistema_wp / 1000
+    area_total_m2 = numero_paineis * AREA_PAINEL_M2
+    inversor_kw_rec = potencia_kwp_final / 1.25
+
+    geracao_diaria_kwh = potencia_kwp_final * hsp * TAXA_DESEMPENHO
+    geracao_mensal_kwh = geracao_diaria_kwh * 30
+    custo_total_estimado = potencia_final_sistema_wp * custo_wp_regional
+    economia_mensal_reais = min(geracao_mensal_kwh, consumo_kwh) * tarifa
+    geracao_anual_kwh = geracao_mensal_kwh * 12
+    co2_evitado_anual_kg = geracao_anual_kwh * FATOR_EMISSAO_CO2_KWH
+
+    custos_detalhados = {
+        "Painéis Fotovoltaicos": custo_total_estimado * 0.40,
+        "Inversor(es)": custo_total_estimado * 0.20,
+        "Estruturas, Cabos e Proteções": custo_total_estimado * 0.15,
+        "Mão de Obra e Projeto": custo_total_estimado * 0.25
+    }
+
+    return {
+        "potencia_kwp": round(potencia_kwp_final, 2),
+        "inversor_kw_recomendado": round(inversor_kw_rec, 2),
+        "numero_paineis": numero_paineis,
+        "area_m2": round(area_total_m2, 2),
+        "custo_total_estimado_site": custo_total_estimado,
+        "economia_mensal_reais": economia_mensal_reais,
+        "co2_evitado_kg": round(co2_evitado_anual_kg, 2),
+        "geracao_mensal": round(geracao_mensal_kwh, 2),
+        "custos_detalhados": custos_detalhados
+    }
+
+
+def calcular_sistema_por_orcamento(orcamento, custo_wp_regional, consumo_kwh, tarifa, hsp):
+    """Calculadora por Orçamento (R$ -> kWh)"""
+
+    potencia_final_sistema_wp = orcamento / custo_wp_regional
+    potencia_kwp_final = potencia_final_sistema_wp / 1000
+    inversor_kw_rec = potencia_kwp_final / 1.25
+    numero_paineis = max(1, math.ceil(potencia_final_sistema_wp / POTENCIA_PAINEL_WP))
+    area_total_m2 = numero_paineis * AREA_PAINEL_M2
+
+    geracao_diaria_kwh = potencia_kwp_final * hsp * TAXA_DESEMPENHO
+    geracao_mensal_kwh = geracao_diaria_kwh * 30
+    economia_mensal_reais = min(geracao_mensal_kwh, consumo_kwh) * tarifa
+    geracao_anual_kwh = geracao_mensal_kwh * 12
+    co2_evitado_anual_kg = geracao_anual_kwh * FATOR_EMISSAO_CO2_KWH
+
+    custos_detalhados = {
+        "Painéis Fotovoltaicos": orcamento * 0.40,
+        "Inversor(es)": orcamento * 0.20,
+        "Estruturas, Cabos e Proteções": orcamento * 0.15,
+        "Mão de Obra e Projeto": orcamento * 0.25
+    }
+
+    return {
+        "potencia_kwp": round(potencia_kwp_final, 2),
+        "inversor_kw_recomendado": round(inversor_kw_rec, 2),
+        "numero_paineis": numero_paineis,
+        "area_m2": round(area_total_m2, 2),
+        "custo_total_estimado_site": orcamento,
+        "economia_mensal_reais": economia_mensal_reais,
+        "co2_evitado_kg": round(co2_evitado_anual_kg, 2),
+        "geracao_mensal": round(geracao_mensal_kwh, 2),
+        "custos_detalhados": custos_detalhados
+    }
+
+
+def estimar_consumo_casa_nova(pessoas, chuveiros, ar_cond, freezer, home_office):
+    """Estima o consumo para uma casa nova (simulação).
+
+    O perfil horário (8760 h) da mesma casa está em solarsim.carga.
+    """
+    quantidades = {"pessoas": pessoas, "chuveiros": chuveiros, "ar_cond": ar_cond,
+                   "freezer": freezer, "home_office": home_office}
+    return sum(quantidades[item] * kwh for item, kwh in CONSUMO_MENSAL_ITEM.items())
+
+
+def minimo_kwh_por_conexao(conexao):
+    """Taxa mínima (custo de disponibilidade) em kWh para o tipo de conexão."""
+    if "Monofásica" in conexao:
+        return 30
+    elif "Trifásica" in conexao:
+        return 100
+    else:
+        return 50
+
+
+def calcular_nova_fatura(saldo_kwh, minimo_kwh, tarifa):
+    """Nova fatura mensal: consumo restante da rede, nunca abaixo da taxa mínima."""
+    if saldo_kwh < 0:
+        return max(abs(saldo_kwh), minimo_kwh) * tarifa
+    return minimo_kwh * tarifa
+
+
+def formatar_payback(custo, economia_mensal):
+    """Calcula e formata o payback em anos e meses."""
+    if economia_mensal > 0:
+        payback_anos = custo / (economia_mensal * 12)
+    else:
+        return "Não aplicável"
+    anos = int(payback_anos)
+    meses = round((payback_anos - anos) * 12)
+    if meses == 12:
+        anos += 1
+        meses = 0
+    return f"~ {anos} anos e {meses} meses" if anos else f"~ {meses} meses"
+
+
+def formatar_prazo_meses(meses):
+    """Formata um prazo em meses (ex.: payback do fluxo de caixa) em anos e meses."""
+    if meses is None or not math.isfinite(meses):  # não se paga no horizonte
+        return "Não aplicável"
+    anos, meses = divmod(int(round(meses)), 12)
+    return f"~ {anos} anos e {meses} meses" if anos else f"~ {meses} meses"
+
+
+def simular(consumo, tarifa, cidade, conexao, orcamento=None):
+    """Fluxo do botão "Simular": dimensiona o sistema e monta o resultado (R).
+
+    Sem orçamento, dimensiona pelo consumo; com orçamento, pelo valor dado.
+    """
+    hsp = HSP_CAPITAIS[cidade]
+    custo_wp = CUSTO_WP_CAPITAIS[cidade]
+    minimo_kwh = minimo_kwh_por_conexao(conexao)
+
+    if orcamento is not None:
+        custo_final = orcamento
+        dados = calcular_sistema_por_orcamento(custo_final, custo_wp, consumo, tarifa, hsp)
+    else:
+        dados = calcular_sistema_solar(consumo, tarifa, hsp, custo_wp)
+        custo_final = dados["custo_total_estimado_site"]
+
+    return {
+        "cidade": cidade,
+        "hsp": hsp,
+        "consumo": consumo,
+        "tarifa": tarifa,
+        "custo_final": custo_final,
+        "orcamento": orcamento,
+        "dados": dados,
+        "payback": formatar_payback(custo_final, dados["economia_mensal_reais"]),
+        "minimo_kwh": minimo_kwh,
+        "saldo_kwh": dados["geracao_mensal"] - consumo
+    }
+
+
+def campos_resumo(R, dados):
+    """Valores do resumo (MODELO_RESUMO_TXT) já formatados como texto."""
+    credito = R['saldo_kwh'] >= 0
+    nova_fatura = calcular_nova_fatura(R['saldo_kwh'], R['minimo_kwh'], R['tarifa'])
+    return {
+        "cidade": R['cidade'],
+        "consumo": R['consumo'],
+        "tarifa": formatar_reais(R['tarifa']),
+        "minimo_kwh": R['minimo_kwh'],
+        "custo_final": formatar_reais(R['custo_final']),
+        "payback": R['payback'],
+        "economia_mensal": formatar_reais(dados['economia_mensal_reais']),
+        "potencia_kwp": dados['potencia_kwp'],
+        "inversor_kw": dados['inversor_kw_recomendado'],
+        "numero_paineis": dados['numero_paineis'],
+        "area_m2": dados['area_m2'],
+        "geracao_mensal": f"{dados['geracao_mensal']:.0f}",
+        "rotulo_saldo": "Créditos Gerados" if credito else "Consumo restante da Rede",
+        "saldo_kwh": f"{R['saldo_kwh'] if credito else abs(R['saldo_kwh']):.0f}",
+        "rotulo_fatura": "Nova Fatura (Taxa Mínima)" if credito else "Nova Fatura Estimada",
+        "nova_fatura": formatar_reais(nova_fatura),
+        "co2_kg": f"{dados['co2_evitado_kg']:.0f}",
+        "arvores": f"{dados['co2_evitado_kg'] / 150:.0f}",
+    }
+
+
+def gerar_resumo_txt(R, dados):
+    """Gera um arquivo de texto simples com o resumo da simulação."""
+    return MODELO_RESUMO_TXT.renderizar(campos_resumo(R, dados))
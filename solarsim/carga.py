@@ -0,0 +1,165 @@
+"""Perfil horário (8760 h) de consumo de uma casa nova.
+
+Mesmas entradas de estimar_consumo_casa_nova (pessoas, chuveiros, ar_cond,
+freezer, home_office). Cada item tem um perfil unitário: uma curva diária
+(dia útil e fim de semana) e um peso sazonal, escalados para que cada mês
+some CONSUMO_MENSAL_ITEM × peso do mês. Como os pesos têm média 1, a média
+mensal do perfil de uma casa é exatamente estimar_consumo_casa_nova.
+
+O perfil de uma casa é a soma vetorizada dos perfis unitários, ponderada
+pelas quantidades. Casas iguais (mesmo arquétipo) compartilham o mesmo
+array, calculado uma vez por processo.
+
+Cruzado com a geração horária, o perfil dá a fração da geração consumida
+na mesma hora (autoconsumo_simultaneo_lote): o fluxo de caixa de quem ainda
+não tem conta de luz usa essa fração no lugar de AUTOCONSUMO_SIMULTANEO.
+"""
+import functools
+
+import numpy as np
+
+from solarsim.calculos import CONSUMO_MENSAL_ITEM, LATITUDE_CAPITAIS
+from solarsim.horario import (
+    HORAS_ANO,
+    aplicar_nebulosidade,
+    calendario,
+    gerar_geracao_horaria,
+    perfil_geracao_horaria,
+)
+
+ITENS_CARGA = tuple(CONSUMO_MENSAL_ITEM)
+
+# Curva diária relativa de cada item (0 h a 23 h): (dia útil, fim de semana)
+PERFIL_DIARIO = {
+    # Geladeira, iluminação, TV, cozinha: pico no início da noite
+    "pessoas": (
+        [0.5, 0.4, 0.4, 0.4, 0.4, 0.6, 1.2, 1.4, 0.9, 0.7, 0.7, 0.9,
+         1.1, 0.9, 0.7, 0.7, 0.8, 1.1, 1.8, 2.2, 2.1, 1.8, 1.3, 0.8],
+        [0.6, 0.5, 0.4, 0.4, 0.4, 0.4, 0.6, 0.9, 1.2, 1.2, 1.1, 1.3,
+         1.5, 1.2, 1.0, 0.9, 1.0, 1.2, 1.7, 2.0, 2.0, 1.7, 1.3, 0.9],
+    ),
+    # Banhos de manhã cedo e no fim da tarde
+    "chuveiros": (
+        [0.0, 0.0, 0.0, 0.0, 0.1, 1.0, 3.0, 2.0, 0.5, 0.1, 0.1, 0.2,
+         0.3, 0.1, 0.1, 0.1, 0.3, 1.0, 3.0, 3.5, 2.0, 1.0, 0.5, 0.1],
+        [0.0, 0.0, 0.0, 0.0, 0.0, 0.1, 0.5, 1.2, 1.8, 1.2, 0.6, 0.4,
+         0.4, 0.2, 0.2, 0.3, 0.6, 1.5, 2.5, 2.5, 1.8, 1.2, 0.6, 0.2],
+    ),
+    # Quartos à noite; no fim de semana também à tarde
+    "ar_cond": (
+        [1.6, 1.6, 1.5, 1.4, 1.3, 1.0, 0.3, 0.0, 0.0, 0.0, 0.0, 0.0,
+         0.0, 0.0, 0.0, 0.0, 0.0, 0.1, 0.3, 0.6, 0.9, 1.3, 1.6, 1.7],
+        [1.6, 1.6, 1.5, 1.4, 1.3, 1.1, 0.8, 0.4, 0.2, 0.2, 0.4, 0.7,
+         1.0, 1.2, 1.2, 1.0, 0.7, 0.5, 0.5, 0.6, 0.9, 1.3, 1.6, 1.7],
+    ),
+    # Compressor o dia todo, um pouco mais com a casa quente
+    "freezer": (
+        [0.9, 0.9, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0, 1.0, 1.0, 1.1, 1.1,
+         1.1, 1.2, 1.2, 1.2, 1.1, 1.1, 1.0, 1.0, 1.0, 0.9, 0.9, 0.9],
+        [0.9, 0.9, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0, 1.0, 1.0, 1.1, 1.1,
+         1.1, 1.2, 1.2, 1.2, 1.1, 1.1, 1.0, 1.0, 1.0, 0.9, 0.9, 0.9],
+    ),
+    # Computador e monitor em horário comercial; quase nada no fim de semana
+    "home_office": (
+        [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.3, 1.5, 2.0, 2.0, 2.0,
+         1.2, 1.8, 2.0, 2.0, 2.0, 1.5, 0.4, 0.2, 0.2, 0.1, 0.1, 0.1],
+        [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.2, 0.2,
+         0.2, 0.2, 0.2, 0.2, 0.2, 0.2, 0.2, 0.2, 0.2, 0.1, 0.1, 0.1],
+    ),
+}
+
+# Peso de cada mês (Jan..Dez), normalizado para média 1; itens ausentes não variam
+SAZONALIDADE_ITEM = {
+    "ar_cond": [1.6, 1.6, 1.4, 1.0, 0.6, 0.4, 0.4, 0.5, 0.7, 1.0, 1.3, 1.5],
+    "chuveiros": [0.9, 0.9, 0.95, 1.0, 1.1, 1.15, 1.15, 1.1, 1.0, 0.95, 0.9, 0.9],
+    "freezer": [1.1, 1.1, 1.05, 1.0, 0.95, 0.9, 0.9, 0.95, 1.0, 1.0, 1.05, 1.1],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def perfil_unitario(item):
+    """Consumo horário (kWh, float32, 8760 h) de uma unidade do item."""
+    cal = calendario()
+    util, fim_de_semana = (np.asarray(curva, dtype=np.float64) for curva in PERFIL_DIARIO[item])
+    forma = np.where(cal["dia_semana"] >= 5, fim_de_semana[cal["hora"]], util[cal["hora"]])
+
+    pesos = np.asarray(SAZONALIDADE_ITEM.get(item, [1.0] * 12), dtype=np.float64)
+    alvo_mes = CONSUMO_MENSAL_ITEM[item] * pesos / pesos.mean()
+    soma_mes = np.add.reduceat(forma, cal["inicio_mes"])
+    perfil = (forma * (alvo_mes / soma_mes)[cal["mes"]]).astype(np.float32)
+    perfil.setflags(write=False)
+    return perfil
+
+
+@functools.lru_cache(maxsize=None)
+def _matriz_itens():
+    """Perfis unitários empilhados na ordem de ITENS_CARGA, (itens, 8760)."""
+    matriz = np.stack([perfil_unitario(item) for item in ITENS_CARGA])
+    matriz.setflags(write=False)
+    return matriz
+
+
+@functools.lru_cache(maxsize=4096)
+def perfil_carga(pessoas, chuveiros, ar_cond, freezer, home_office):
+    """Consumo horário (kWh, float32, 8760 h) de uma casa nova.
+
+    O array é compartilhado entre casas do mesmo arquétipo: é somente leitura.
+    """
+    quantidades = np.array([pessoas, chuveiros, ar_cond, freezer, home_office], dtype=np.float32)
+    perfil = quantidades @ _matriz_itens()
+    perfil.setflags(write=False)
+    return perfil
+
+
+def arquetipos_carga(pessoas, chuveiros, ar_cond, freezer, home_office):
+    """Agrupa várias casas por arquétipo.
+
+    Aceita arrays (ou escalares) com o mesmo formato e devolve
+    (perfis, indice): `perfis` tem um perfil (8760 h) por arquétipo distinto e
+    `indice` diz qual arquétipo é o de cada casa. Útil quando há milhares de
+    casas e poucos arquétipos: não é preciso materializar um perfil por casa.
+    """
+    quantidades = np.stack(np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.int64) for v in (pessoas, chuveiros, ar_cond, freezer, home_office))
+    ), axis=-1)
+    formato = quantidades.shape[:-1]
+    unicos, indice = np.unique(quantidades.reshape(-1, len(ITENS_CARGA)), axis=0, return_inverse=True)
+    perfis = np.empty((len(unicos), HORAS_ANO), dtype=np.float32)
+    for i, linha in enumerate(unicos.tolist()):
+        perfis[i] = perfil_carga(*linha)
+    return perfis, indice.reshape(formato)
+
+
+def perfis_carga_lote(pessoas, chuveiros, ar_cond, freezer, home_office):
+    """Consumo horário de várias casas, float32 com formato (n, 8760)."""
+    perfis, indice = arquetipos_carga(pessoas, chuveiros, ar_cond, freezer, home_office)
+    return perfis[indice]
+
+
+def autoconsumo_simultaneo_lote(pessoas, chuveiros, ar_cond, freezer, home_office, potencia_kwp, hsp, latitude):
+    """Fração da geração consumida na mesma hora por casas novas (array).
+
+    Cruza o perfil de carga de cada casa com a geração horária do sistema,
+    com dias claros e nublados como em solarsim.inversor:
+    Σ min(geração, consumo) ÷ Σ geração, hora a hora.
+    """
+    entradas = (pessoas, chuveiros, ar_cond, freezer, home_office, potencia_kwp, hsp, latitude)
+    formato = np.broadcast_shapes(*(np.shape(v) for v in entradas))
+    pessoas, chuveiros, ar_cond, freezer, home_office, potencia_kwp, hsp, latitude = (
+        np.broadcast_to(v, formato) for v in entradas
+    )
+    consumo = perfis_carga_lote(pessoas, chuveiros, ar_cond, freezer, home_office)
+    geracao = gerar_geracao_horaria(
+        potencia_kwp, aplicar_nebulosidade(perfil_geracao_horaria(hsp, latitude), latitude)
+    )
+    total = geracao.sum(axis=-1, dtype=np.float64)
+    simultaneo = np.minimum(geracao, consumo).sum(axis=-1, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, simultaneo / total, 0.0)
+
+
+def autoconsumo_da_simulacao(R):
+    """autoconsumo_simultaneo (float) de um resultado de simular() de casa nova (R["casa"])."""
+    return float(autoconsumo_simultaneo_lote(
+        *R["casa"], R["dados"]["potencia_kwp"], R["hsp"], LATITUDE_CAPITAIS[R["cidade"]]
+    ))
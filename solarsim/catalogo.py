@@ -0,0 +1,215 @@
+"""Catálogo de equipamentos: módulos e inversores, com busca de combinações.
+
+As folhas de dados ficam em tabelas colunares (um array NumPy por campo),
+carregadas de CSV (';' ou ',') uma única vez por processo:
+
+* módulos: MODELO, FABRICANTE, POTENCIA_WP, VOC, VMP, ISC, COEF_VOC (%/°C),
+  AREA_M2, PRECO;
+* inversores: MODELO, FABRICANTE, POTENCIA_CA_KW, POTENCIA_CC_MAX_KW,
+  TENSAO_CC_MAX, MPPT_MIN, MPPT_MAX, CORRENTE_MAX_MPPT, N_MPPT, PRECO.
+
+`Catalogo.buscar_combinacoes` encontra as combinações módulo + inversor
+mais baratas para uma potência alvo e uma área de telhado. Em vez de testar
+todos os pares, calcula de uma vez, para cada módulo, a faixa de inversores
+com razão CC/CA aceitável (busca binária na tabela ordenada por potência) e
+um limite inferior de custo (painéis + inversor mais barato da faixa, por
+uma tabela esparsa de mínimos). Os módulos são visitados do menor limite
+para o maior, e a busca para assim que nenhum módulo restante pode bater as
+melhores combinações já encontradas.
+"""
+import functools
+import heapq
+import math
+
+import numpy as np
+
+from solarsim.localizacao import ler_tabela
+
+# Faixa aceita de potência CC (painéis) ÷ potência CA (inversor)
+RAZAO_CC_CA_MIN = 0.95
+RAZAO_CC_CA_MAX = 1.35
+
+# Temperaturas de célula usadas na janela de tensão das strings (°C)
+TEMPERATURA_MINIMA = 5.0
+TEMPERATURA_MAXIMA = 70.0
+
+
+def _colunas(tabela, nomes, tipo=np.float64):
+    return [np.asarray(tabela[nome], dtype=tipo) for nome in nomes]
+
+
+class TabelaModulos:
+    """Folhas de dados de módulos, um array por campo."""
+
+    CAMPOS = ("POTENCIA_WP", "VOC", "VMP", "ISC", "COEF_VOC", "AREA_M2", "PRECO")
+
+    def __init__(self, modelo, fabricante, potencia_wp, voc, vmp, isc, coef_voc, area_m2, preco):
+        self.modelo = list(modelo)
+        self.fabricante = list(fabricante)
+        self.potencia_wp, self.voc, self.vmp, self.isc, self.coef_voc, self.area_m2, self.preco = (
+            np.asarray(v, dtype=np.float64) for v in (potencia_wp, voc, vmp, isc, coef_voc, area_m2, preco)
+        )
+        self._por_modelo = {nome: i for i, nome in enumerate(self.modelo)}
+
+    @classmethod
+    def de_csv(cls, caminho):
+        tabela = ler_tabela(caminho)
+        return cls(tabela["MODELO"], tabela["FABRICANTE"], *_colunas(tabela, cls.CAMPOS))
+
+    def __len__(self):
+        return len(self.modelo)
+
+    def indice(self, modelo):
+        """Posição do modelo na tabela; KeyError se não existir."""
+        return self._por_modelo[modelo]
+
+    def tensoes(self, temperatura_minima=TEMPERATURA_MINIMA, temperatura_maxima=TEMPERATURA_MAXIMA):
+        """Voc no frio, Vmp no frio e Vmp no calor de cada módulo.
+
+        Usa o coeficiente de Voc também para a Vmp (aproximação usual).
+        """
+        frio = 1 + self.coef_voc / 100 * (temperatura_minima - 25)
+        calor = 1 + self.coef_voc / 100 * (temperatura_maxima - 25)
+        return self.voc * frio, self.vmp * frio, self.vmp * calor
+
+
+class TabelaInversores:
+    """Folhas de dados de inversores, ordenadas por potência CA."""
+
+    CAMPOS = ("POTENCIA_CA_KW", "POTENCIA_CC_MAX_KW", "TENSAO_CC_MAX", "MPPT_MIN", "MPPT_MAX",
+              "CORRENTE_MAX_MPPT", "N_MPPT", "PRECO")
+
+    def __init__(self, modelo, fabricante, potencia_ca_kw, potencia_cc_max_kw, tensao_cc_max, mppt_min,
+                 mppt_max, corrente_max_mppt, n_mppt, preco):
+        ordem = np.argsort(np.asarray(potencia_ca_kw, dtype=np.float64), kind="stable")
+        self.modelo = [modelo[i] for i in ordem]
+        self.fabricante = [fabricante[i] for i in ordem]
+        self.potencia_ca_kw, self.potencia_cc_max_kw, self.tensao_cc_max, self.mppt_min, self.mppt_max, \
+            self.corrente_max_mppt, self.n_mppt, self.preco = (
+                np.asarray(v, dtype=np.float64)[ordem]
+                for v in (potencia_ca_kw, potencia_cc_max_kw, tensao_cc_max, mppt_min, mppt_max,
+                          corrente_max_mppt, n_mppt, preco)
+            )
+        # Tabela esparsa de mínimos: preço mínimo de qualquer faixa contígua em O(1)
+        self._minimos = [self.preco]
+        while 2 ** len(self._minimos) <= len(self.preco):
+            anterior, passo = self._minimos[-1], 2 ** (len(self._minimos) - 1)
+            self._minimos.append(np.minimum(anterior[:-passo], anterior[passo:]))
+
+    @classmethod
+    def de_csv(cls, caminho):
+        tabela = ler_tabela(caminho)
+        return cls(tabela["MODELO"], tabela["FABRICANTE"], *_colunas(tabela, cls.CAMPOS))
+
+    def __len__(self):
+        return len(self.modelo)
+
+    def faixa_potencia(self, minimo_kw, maximo_kw):
+        """Fatias (início, fim) dos inversores com potência CA entre os limites (aceita arrays)."""
+        inicio = np.searchsorted(self.potencia_ca_kw, minimo_kw, side="left")
+        fim = np.searchsorted(self.potencia_ca_kw, maximo_kw, side="right")
+        return inicio, fim
+
+    def preco_minimo_faixa(self, inicio, fim):
+        """Menor preço de cada faixa [início, fim) (inf nas faixas vazias); aceita arrays."""
+        inicio, fim = np.broadcast_arrays(np.asarray(inicio), np.asarray(fim))
+        tamanho = fim - inicio
+        minimo = np.full(inicio.shape, np.inf)
+        cheias = tamanho > 0
+        nivel = np.zeros(inicio.shape, dtype=np.int64)
+        nivel[cheias] = np.log2(tamanho[cheias]).astype(np.int64)
+        for k in np.unique(nivel[cheias]).tolist():
+            linhas = cheias & (nivel == k)
+            tabela = self._minimos[k]
+            minimo[linhas] = np.minimum(tabela[inicio[linhas]], tabela[fim[linhas] - 2 ** k])
+        return minimo
+
+
+class Catalogo:
+    """Módulos e inversores disponíveis, com a busca de combinações."""
+
+    def __init__(self, modulos, inversores):
+        self.modulos = modulos
+        self.inversores = inversores
+
+    def buscar_combinacoes(self, potencia_kwp, area_m2=math.inf, limite=5,
+                           razao_cc_ca=(RAZAO_CC_CA_MIN, RAZAO_CC_CA_MAX),
+                           temperatura_minima=TEMPERATURA_MINIMA, temperatura_maxima=TEMPERATURA_MAXIMA):
+        """As `limite` combinações mais baratas (módulos + inversor), da mais barata.
+
+        Cada módulo usa o menor número de painéis que alcança `potencia_kwp`
+        e cabe em `area_m2`. Um inversor é válido quando a razão CC/CA fica
+        na faixa, a potência CC não passa do máximo dele e os painéis podem
+        ser divididos em strings cuja tensão fica na janela do MPPT e abaixo
+        da tensão CC máxima, sem passar da corrente de cada MPPT.
+        """
+        mod, inv = self.modulos, self.inversores
+        n_paineis = np.maximum(np.ceil(potencia_kwp * 1000 / mod.potencia_wp - 1e-9), 1)
+        kwp = n_paineis * mod.potencia_wp / 1000
+        custo_modulos = n_paineis * mod.preco
+        # Limite inferior de cada módulo: seus painéis + o inversor mais barato da faixa de potência
+        inicios, fins = inv.faixa_potencia(kwp / razao_cc_ca[1], kwp / razao_cc_ca[0])
+        limite_inferior = custo_modulos + inv.preco_minimo_faixa(inicios, fins)
+        validos = np.flatnonzero((n_paineis * mod.area_m2 <= area_m2) & np.isfinite(limite_inferior))
+        validos = validos[np.argsort(limite_inferior[validos], kind="stable")]
+        voc_frio, vmp_frio, vmp_calor = mod.tensoes(temperatura_minima, temperatura_maxima)
+
+        melhores = []  # heap de (-custo, desempate, combinação): a pior no topo
+        pior = math.inf
+        for i in validos.tolist():
+            # Módulos em ordem de limite inferior: daqui em diante nenhum bate a pior das melhores
+            if limite_inferior[i] >= pior:
+                break
+            n = n_paineis[i]
+            inicio, fim = int(inicios[i]), int(fins[i])
+            faixa = slice(inicio, fim)
+            maximo_string = np.floor(np.minimum(inv.tensao_cc_max[faixa] / voc_frio[i],
+                                                inv.mppt_max[faixa] / vmp_frio[i]))
+            minimo_string = np.ceil(inv.mppt_min[faixa] / vmp_calor[i])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                n_strings = np.ceil(n / maximo_string)
+            strings_por_mppt = np.floor(inv.corrente_max_mppt[faixa] / mod.isc[i])
+            ok = ((maximo_string >= 1) & (maximo_string >= minimo_string)
+                  & (n_strings * minimo_string <= n)
+                  & (n_strings <= inv.n_mppt[faixa] * strings_por_mppt)
+                  & (kwp[i] <= inv.potencia_cc_max_kw[faixa]))
+            candidatos = np.flatnonzero(ok)
+            if not candidatos.size:
+                continue
+            totais = custo_modulos[i] + inv.preco[faixa][candidatos]
+            if candidatos.size > limite:
+                escolhidos = np.argpartition(totais, limite - 1)[:limite]
+                candidatos, totais = candidatos[escolhidos], totais[escolhidos]
+            for j, total in zip(candidatos.tolist(), totais.tolist()):
+                if total >= pior:
+                    continue
+                combinacao = self._descrever(i, inicio + j, int(n), int(n_strings[j]), total)
+                heapq.heappush(melhores, (-total, (i, inicio + j), combinacao))
+                if len(melhores) > limite:
+                    heapq.heappop(melhores)
+                pior = -melhores[0][0] if len(melhores) == limite else math.inf
+
+        return [combinacao for _, _, combinacao in sorted(melhores, key=lambda item: (-item[0], item[1]))]
+
+    def _descrever(self, i, j, n_paineis, n_strings, custo):
+        mod, inv = self.modulos, self.inversores
+        potencia_kwp = n_paineis * float(mod.potencia_wp[i]) / 1000
+        return {
+            "modulo": mod.modelo[i],
+            "fabricante_modulo": mod.fabricante[i],
+            "inversor": inv.modelo[j],
+            "fabricante_inversor": inv.fabricante[j],
+            "numero_paineis": n_paineis,
+            "strings": n_strings,
+            "potencia_kwp": round(potencia_kwp, 3),
+            "inversor_kw": float(inv.potencia_ca_kw[j]),
+            "razao_cc_ca": round(potencia_kwp / float(inv.potencia_ca_kw[j]), 3),
+            "area_m2": round(n_paineis * float(mod.area_m2[i]), 2),
+            "custo_equipamentos": round(custo, 2),
+        }
+
+
+@functools.lru_cache(maxsize=4)
+def carregar_catalogo(caminho_modulos, caminho_inversores):
+    """Catálogo dos dois arquivos, carregado e indexado uma vez por processo."""
+    return Catalogo(TabelaModulos.de_csv(caminho_modulos), TabelaInversores.de_csv(caminho_inversores))
@@ -0,0 +1,140 @@
+"""Leitura de arquivos climáticos (ano meteorológico típico) com cache binário.
+
+Os arquivos EPW e TMY (CSV do PVGIS) são convertidos uma única vez para um
+.npy colunar (float32, uma linha por variável × 8760 h) ao lado de um .json
+com os metadados. As leituras seguintes abrem o .npy com mmap: não há cópia,
+e os vários processos do Streamlit compartilham as mesmas páginas do cache
+do sistema operacional em vez de cada um guardar sua cópia.
+
+O diretório do cache é SOLARSIM_CLIMA_CACHE (padrão ~/.cache/solarsim/clima).
+"""
+import csv
+import functools
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from solarsim.horario import HORAS_ANO
+
+COLUNAS_CLIMA = ("ghi", "dni", "dhi", "temperatura", "vento")
+
+# Posição de cada variável numa linha de dados EPW
+_COLUNAS_EPW = {"temperatura": 6, "ghi": 13, "dni": 14, "dhi": 15, "vento": 21}
+
+# Nome de cada variável no CSV de TMY do PVGIS
+_COLUNAS_PVGIS = {"temperatura": "T2m", "ghi": "G(h)", "dni": "Gb(n)", "dhi": "Gd(h)", "vento": "WS10m"}
+
+
+def diretorio_cache():
+    """Diretório onde ficam os arquivos climáticos convertidos."""
+    padrao = os.path.join(os.path.expanduser("~"), ".cache", "solarsim", "clima")
+    return os.environ.get("SOLARSIM_CLIMA_CACHE", padrao)
+
+
+def ler_epw(caminho):
+    """Lê um arquivo EPW (texto) e devolve metadados e colunas em float32."""
+    with open(caminho, newline="", encoding="latin-1") as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = [next(leitor) for _ in range(8)]
+        linhas = list(leitor)
+
+    local = cabecalho[0]
+    if len(linhas) != HORAS_ANO:
+        raise ValueError(f"{caminho}: esperado {HORAS_ANO} horas, encontrado {len(linhas)}.")
+
+    colunas = {
+        nome: np.array([float(linha[i]) for linha in linhas], dtype=np.float32)
+        for nome, i in _COLUNAS_EPW.items()
+    }
+    metadados = {"local": local[1], "latitude": float(local[6]), "longitude": float(local[7])}
+    return metadados, colunas
+
+
+def ler_tmy_pvgis(caminho):
+    """Lê o CSV de TMY do PVGIS e devolve metadados e colunas em float32."""
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        linhas = arquivo.read().splitlines()
+
+    metadados = {"local": os.path.basename(caminho)}
+    for linha in linhas[:3]:
+        chave, _, valor = linha.partition(":")
+        if chave.strip() in ("Latitude (decimal degrees)", "Longitude (decimal degrees)"):
+            metadados[chave.split()[0].lower()] = float(valor)
+
+    inicio = next(i for i, linha in enumerate(linhas) if linha.startswith("time(UTC)"))
+    dados = [linha.split(",") for linha in linhas[inicio + 1:inicio + 1 + HORAS_ANO]]
+    nomes = linhas[inicio].split(",")
+    if len(dados) != HORAS_ANO:
+        raise ValueError(f"{caminho}: esperado {HORAS_ANO} horas, encontrado {len(dados)}.")
+
+    colunas = {}
+    for nome, coluna in _COLUNAS_PVGIS.items():
+        i = nomes.index(coluna)
+        colunas[nome] = np.array([float(linha[i]) for linha in dados], dtype=np.float32)
+    return metadados, colunas
+
+
+def ler_arquivo_clima(caminho):
+    """Lê o arquivo em texto (EPW ou TMY do PVGIS), sem usar o cache."""
+    if caminho.lower().endswith(".epw"):
+        return ler_epw(caminho)
+    return ler_tmy_pvgis(caminho)
+
+
+def _nome_cache(caminho):
+    """Nome do arquivo de cache: muda quando o arquivo de origem muda."""
+    info = os.stat(caminho)
+    assinatura = f"{os.path.abspath(caminho)}|{info.st_size}|{info.st_mtime_ns}"
+    base = os.path.splitext(os.path.basename(caminho))[0]
+    return f"{base}-{hashlib.sha1(assinatura.encode()).hexdigest()[:16]}"
+
+
+def converter_para_binario(caminho, destino=None):
+    """Converte o arquivo climático para o cache binário; devolve o caminho do .npy."""
+    destino = destino or diretorio_cache()
+    os.makedirs(destino, exist_ok=True)
+    nome = _nome_cache(caminho)
+    caminho_npy = os.path.join(destino, nome + ".npy")
+    caminho_json = os.path.join(destino, nome + ".json")
+
+    metadados, colunas = ler_arquivo_clima(caminho)
+    matriz = np.stack([colunas[nome_coluna] for nome_coluna in COLUNAS_CLIMA])
+    metadados = dict(metadados, colunas=list(COLUNAS_CLIMA), origem=os.path.abspath(caminho))
+
+    # Grava em arquivo temporário e renomeia: outro processo nunca vê um .npy pela metade
+    with tempfile.NamedTemporaryFile(dir=destino, suffix=".json", delete=False, mode="w") as tmp:
+        json.dump(metadados, tmp, ensure_ascii=False)
+    os.replace(tmp.name, caminho_json)
+    with tempfile.NamedTemporaryFile(dir=destino, suffix=".npy", delete=False) as tmp:
+        np.save(tmp, matriz)
+    os.replace(tmp.name, caminho_npy)
+    return caminho_npy
+
+
+def carregar_clima(caminho, destino=None):
+    """Carrega um arquivo climático, convertendo-o para o cache na primeira vez.
+
+    Devolve um dict com os metadados (local, latitude, longitude) e uma view
+    somente leitura (mmap) de 8760 h para cada variável de COLUNAS_CLIMA.
+    """
+    destino = destino or diretorio_cache()
+    return _carregar_clima(os.path.abspath(caminho), destino, os.stat(caminho).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=64)
+def _carregar_clima(caminho, destino, _mtime_ns):
+    nome = _nome_cache(caminho)
+    caminho_npy = os.path.join(destino, nome + ".npy")
+    if not os.path.exists(caminho_npy):
+        converter_para_binario(caminho, destino)
+
+    with open(os.path.join(destino, nome + ".json"), encoding="utf-8") as arquivo:
+        metadados = json.load(arquivo)
+    matriz = np.load(caminho_npy, mmap_mode="r")
+    clima = {chave: valor for chave, valor in metadados.items() if chave != "colunas"}
+    for i, nome_coluna in enumerate(metadados["colunas"]):
+        clima[nome_coluna] = matriz[i]
+    return clima
@@ -0,0 +1,118 @@
+"""Livro de créditos da compensação de energia (net metering).
+
+Acompanha, mês a mês, a energia injetada na rede e a consumida dela. A
+sobra vira crédito, que abate o consumo dos meses seguintes (os mais antigos
+primeiro) e expira após VALIDADE_CREDITOS_MESES. A taxa mínima da conexão é
+sempre faturada: só se compensa o consumo acima dela.
+
+A fila FIFO de créditos é representada pela soma acumulada dos créditos
+gerados e por um único ponteiro ("frente") por cliente: usar créditos ou
+deixá-los expirar só avança a frente. O laço é sobre os meses e cada passo
+trata todos os clientes de uma vez, com poucas operações de tamanho n.
+
+Com perfis horários (solarsim.horario / consumo por hora), a energia de
+cada mês é separada primeiro em autoconsumo, injeção e consumo da rede,
+hora a hora.
+"""
+import numpy as np
+
+from solarsim.horario import totais_mensais
+
+VALIDADE_CREDITOS_MESES = 60
+
+
+def simular_creditos(injetada, demanda_rede, minimo_kwh, tarifa=None):
+    """Livro de créditos mensal de vários clientes.
+
+    `injetada` e `demanda_rede` têm formato (n, meses): energia enviada à rede
+    e consumida da rede (já descontado o autoconsumo). `minimo_kwh` e
+    `tarifa` podem ser escalares, (n,) ou (n, meses).
+
+    Devolve arrays (n, meses): compensado, creditos_usados, creditos_gerados,
+    creditos_expirados, saldo_creditos (fim do mês), kwh_faturado e, com
+    tarifa, fatura.
+    """
+    injetada = np.atleast_2d(np.asarray(injetada, dtype=np.float64))
+    demanda_rede = np.atleast_2d(np.asarray(demanda_rede, dtype=np.float64))
+    n, meses = injetada.shape
+    minimo_kwh = np.asarray(minimo_kwh, dtype=np.float64)
+    if minimo_kwh.ndim == 1:
+        minimo_kwh = minimo_kwh[:, None]
+    minimo_kwh = np.broadcast_to(minimo_kwh, (n, meses))
+
+    # Só se compensa o que passa da taxa mínima; o resto da injeção vira crédito.
+    # Nada disso depende do banco, então sai tudo de uma vez, fora do laço.
+    compensavel = np.maximum(demanda_rede - minimo_kwh, 0.0)
+    do_mes = np.minimum(injetada, compensavel)
+    gerados = injetada - do_mes
+    necessidade = (compensavel - do_mes).T
+    # gerado_acumulado[k] = créditos gerados antes do mês k; os do mês k ocupam
+    # o trecho (gerado_acumulado[k], gerado_acumulado[k + 1]] da fila
+    gerado_acumulado = np.zeros((meses + 1, n))
+    np.cumsum(gerados.T, axis=0, out=gerado_acumulado[1:])
+
+    frente = np.zeros(n)  # tudo antes da frente já foi usado ou expirou
+    usados = np.empty((meses, n))
+    expirados = np.zeros((meses, n))
+    saldo = np.empty((meses, n))
+
+    for t in range(meses):
+        disponivel = gerado_acumulado[t] - frente
+        usados[t] = np.minimum(necessidade[t], disponivel)
+        frente += usados[t]
+        # No fim do mês t expiram as sobras dos créditos gerados em t - 60
+        if t >= VALIDADE_CREDITOS_MESES:
+            limite = gerado_acumulado[t - VALIDADE_CREDITOS_MESES + 1]
+            expirados[t] = np.maximum(limite - frente, 0.0)
+            frente += expirados[t]
+        saldo[t] = gerado_acumulado[t + 1] - frente
+
+    colunas = {
+        "compensado": do_mes + usados.T,
+        "creditos_usados": usados.T,
+        "creditos_gerados": gerados,
+        "creditos_expirados": expirados.T,
+        "saldo_creditos": saldo.T,
+    }
+    colunas["kwh_faturado"] = np.maximum(demanda_rede - colunas["compensado"], minimo_kwh)
+    if tarifa is not None:
+        tarifa = np.asarray(tarifa, dtype=np.float64)
+        if tarifa.ndim == 1:
+            tarifa = tarifa[:, None]
+        colunas["fatura"] = colunas["kwh_faturado"] * tarifa
+    return colunas
+
+
+def separar_energia_horaria(geracao_horaria, consumo_horario):
+    """Separa, hora a hora, autoconsumo, injeção e consumo da rede.
+
+    Recebe séries (..., 8760) em kWh e devolve totais mensais (..., 12) de
+    autoconsumo, injetada e demanda_rede.
+    """
+    geracao_horaria = np.asarray(geracao_horaria, dtype=np.float32)
+    consumo_horario = np.asarray(consumo_horario, dtype=np.float32)
+    autoconsumo = np.minimum(geracao_horaria, consumo_horario)
+    return {
+        "autoconsumo": totais_mensais(autoconsumo),
+        "injetada": totais_mensais(geracao_horaria - autoconsumo),
+        "demanda_rede": totais_mensais(consumo_horario - autoconsumo),
+    }
+
+
+def simular_creditos_horario(geracao_horaria, consumo_horario, minimo_kwh, tarifa=None,
+                             anos=25, degradacao_anual=0.0):
+    """Livro de créditos de `anos` anos a partir de perfis horários de um ano.
+
+    A separação hora a hora é feita uma vez, no 1º ano. Nos anos seguintes a
+    degradação reduz a injeção e o autoconsumo na mesma proporção da geração
+    (aproximação: ignora as poucas horas que mudariam de lado).
+    """
+    energia = separar_energia_horaria(geracao_horaria, consumo_horario)
+    fator = np.repeat((1 - degradacao_anual) ** np.arange(anos), 12)
+    consumo_mensal = energia["autoconsumo"] + energia["demanda_rede"]
+    autoconsumo = np.tile(energia["autoconsumo"], anos) * fator
+    injetada = np.tile(energia["injetada"], anos) * fator
+    demanda_rede = np.tile(consumo_mensal, anos) - autoconsumo
+    ledger = simular_creditos(np.atleast_2d(injetada), np.atleast_2d(demanda_rede), minimo_kwh, tarifa)
+    ledger["autoconsumo"] = np.atleast_2d(autoconsumo)
+    return ledger
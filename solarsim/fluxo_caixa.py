@@ -0,0 +1,156 @@
+"""Fluxo de caixa mensal de 25 anos: payback, VPL e TIR.
+
+Diferente de formatar_payback (custo ÷ economia do 1º ano), o fluxo
+considera mês a mês:
+
+* degradação anual dos painéis e sazonalidade (FATOR_SAZONAL);
+* reajuste anual da tarifa;
+* a transição do "Fio B" da Lei 14.300 sobre a energia compensada;
+* a taxa mínima (custo de disponibilidade) da conexão;
+* o banco de créditos, com validade de 60 meses.
+
+Tudo é vetorizado sobre os cenários: as entradas são arrays (ou escalares)
+com o mesmo formato. O banco de créditos fica em solarsim.creditos.
+"""
+import datetime
+
+import numpy as np
+
+from solarsim.calculos import FATOR_SAZONAL
+from solarsim.creditos import simular_creditos
+
+ANOS_ANALISE = 25
+DEGRADACAO_ANUAL = 0.005
+REAJUSTE_TARIFA_ANUAL = 0.06
+TAXA_DESCONTO_ANUAL = 0.10
+
+# Parcela da tarifa (TE + TUSD) que corresponde à TUSD Fio B
+PARCELA_FIO_B = 0.28
+# Lei 14.300, art. 27: fração do Fio B cobrada sobre a energia compensada
+TRANSICAO_FIO_B = {2023: 0.15, 2024: 0.30, 2025: 0.45, 2026: 0.60, 2027: 0.75, 2028: 0.90}
+# Fração da geração consumida no mesmo instante (não passa pela rede nem paga Fio B)
+AUTOCONSUMO_SIMULTANEO = 0.30
+
+
+def fator_fio_b(ano):
+    """Fração do Fio B cobrada no ano (0 antes de 2023, 1 a partir de 2029)."""
+    if ano < 2023:
+        return 0.0
+    return TRANSICAO_FIO_B.get(ano, 1.0)
+
+
+def calcular_fluxo_caixa(custo, geracao_mensal, consumo_kwh, tarifa, minimo_kwh,
+                         anos=ANOS_ANALISE, degradacao_anual=DEGRADACAO_ANUAL,
+                         reajuste_tarifa_anual=REAJUSTE_TARIFA_ANUAL,
+                         taxa_desconto_anual=TAXA_DESCONTO_ANUAL,
+                         autoconsumo_simultaneo=AUTOCONSUMO_SIMULTANEO,
+                         ano_inicio=None, fatores_mensais=FATOR_SAZONAL, calcular_tir=True):
+    """Fluxo de caixa mensal de vários cenários de uma vez.
+
+    `geracao_mensal` é a média mensal do 1º ano (como em calcular_sistema_solar).
+    `ano_inicio` (padrão: o ano corrente) define a fase da transição do Fio B;
+    quem guarda o resultado em cache deve pôr o ano na chave.
+
+    Devolve um dict de arrays, um valor por cenário: payback_meses,
+    payback_descontado_meses (NaN se não houver retorno no horizonte), vpl,
+    tir_anual (NaN sem TIR, ou se calcular_tir=False), economia_primeiro_ano e
+    creditos_expirados_kwh, além de economia_mensal com formato (n, meses).
+    """
+    custo, geracao_mensal, consumo_kwh, tarifa, minimo_kwh, degradacao_anual, \
+        reajuste_tarifa_anual, autoconsumo_simultaneo = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (
+                custo, geracao_mensal, consumo_kwh, tarifa, minimo_kwh, degradacao_anual,
+                reajuste_tarifa_anual, autoconsumo_simultaneo))
+        )
+    formato = custo.shape
+    custo, geracao_mensal, consumo_kwh, tarifa, minimo_kwh, degradacao_anual, \
+        reajuste_tarifa_anual, autoconsumo_simultaneo = (
+            v.reshape(-1) for v in (custo, geracao_mensal, consumo_kwh, tarifa, minimo_kwh,
+                                    degradacao_anual, reajuste_tarifa_anual, autoconsumo_simultaneo)
+        )
+    meses = anos * 12
+    ano_inicio = datetime.date.today().year if ano_inicio is None else ano_inicio
+    fatores_mensais = np.asarray(fatores_mensais, dtype=np.float64)
+
+    ano = np.arange(meses) // 12
+    geracao = (geracao_mensal[:, None] * fatores_mensais[np.arange(meses) % 12]
+               * (1 - degradacao_anual[:, None]) ** ano)
+    tarifa_mes = tarifa[:, None] * (1 + reajuste_tarifa_anual[:, None]) ** ano
+
+    autoconsumo = np.minimum(geracao * autoconsumo_simultaneo[:, None], consumo_kwh[:, None])
+    ledger = simular_creditos(geracao - autoconsumo, consumo_kwh[:, None] - autoconsumo, minimo_kwh)
+
+    fio_b = np.array([fator_fio_b(ano_inicio + a) for a in range(anos)])[ano]
+    conta_com = ledger["kwh_faturado"] * tarifa_mes + ledger["compensado"] * tarifa_mes * PARCELA_FIO_B * fio_b
+    conta_sem = np.maximum(consumo_kwh, minimo_kwh)[:, None] * tarifa_mes
+    economia = conta_sem - conta_com
+
+    fluxo = np.concatenate([-custo[:, None], economia], axis=1)
+    taxa_mensal = (1 + taxa_desconto_anual) ** (1 / 12) - 1
+    desconto = (1 + taxa_mensal) ** -np.arange(meses + 1)
+
+    resultado = {
+        "payback_meses": _primeiro_mes_positivo(np.cumsum(fluxo, axis=1)),
+        "payback_descontado_meses": _primeiro_mes_positivo(np.cumsum(fluxo * desconto, axis=1)),
+        "vpl": fluxo @ desconto,
+        "tir_anual": (1 + _tir_mensal(fluxo)) ** 12 - 1 if calcular_tir else np.full(len(custo), np.nan),
+        "economia_primeiro_ano": economia[:, :12].sum(axis=1),
+        "creditos_expirados_kwh": ledger["creditos_expirados"].sum(axis=1),
+    }
+    resultado = {chave: valor.reshape(formato) for chave, valor in resultado.items()}
+    resultado["economia_mensal"] = economia.reshape(formato + (meses,))
+    return resultado
+
+
+def resumo_fluxo_caixa(R, **parametros):
+    """Fluxo de caixa de um resultado de simular(), como floats (serializável)."""
+    resultado = calcular_fluxo_caixa(
+        R["custo_final"], R["dados"]["geracao_mensal"], R["consumo"], R["tarifa"], R["minimo_kwh"],
+        **parametros
+    )
+    return {chave: float(valor[0]) for chave, valor in resultado.items() if chave != "economia_mensal"}
+
+
+def _primeiro_mes_positivo(acumulado):
+    """Primeiro mês em que o fluxo acumulado fica >= 0 (NaN se nunca)."""
+    positivo = acumulado >= 0
+    mes = np.argmax(positivo, axis=1).astype(np.float64)
+    mes[~positivo.any(axis=1)] = np.nan
+    return mes
+
+
+def _tir_mensal(fluxo, iteracoes=50, tolerancia=1e-10):
+    """TIR mensal por Newton protegido por bisseção, em todos os cenários.
+
+    Supõe fluxo convencional (um desembolso e depois economias), em que o
+    VPL cai conforme a taxa sobe. Sem troca de sinal no intervalo, dá NaN.
+    """
+    n, colunas = fluxo.shape
+    expoentes = np.arange(colunas)
+    baixo = np.full(n, -0.05)
+    alto = np.full(n, 1.0)
+
+    def vpl_e_derivada(taxa):
+        desconto = np.exp(np.outer(-np.log1p(taxa), expoentes))
+        vpl = np.einsum("ij,ij->i", fluxo, desconto)
+        derivada = -np.einsum("ij,ij->i", fluxo * expoentes, desconto) / (1 + taxa)
+        return vpl, derivada
+
+    sem_tir = (vpl_e_derivada(baixo)[0] < 0) | (vpl_e_derivada(alto)[0] > 0)
+    taxa = np.full(n, 0.01)
+    for _ in range(iteracoes):
+        vpl, derivada = vpl_e_derivada(taxa)
+        positivo = vpl > 0
+        baixo = np.where(positivo, taxa, baixo)
+        alto = np.where(positivo, alto, taxa)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            passo = vpl / derivada
+        nova = taxa - passo
+        pendente = ~(np.abs(passo) <= tolerancia)
+        # Passo de Newton que sai do intervalo vira bisseção
+        fora = pendente & ~((nova >= baixo) & (nova <= alto))
+        taxa = np.where(fora, (baixo + alto) / 2, nova)
+        if not pendente.any():
+            break
+    taxa[sem_tir] = np.nan
+    return taxa
@@ -0,0 +1,99 @@
+"""Gráfico de resultados do SolarSim.
+
+pandas e altair só são importados quando o gráfico é de fato montado, para
+que o núcleo de cálculo continue leve de importar.
+"""
+from solarsim.calculos import FATOR_SAZONAL, MESES
+from solarsim.metricas import cronometro
+
+
+def montar_dados_grafico(consumo_kwh, geracao_mensal):
+    """Monta o DataFrame (formato longo) do comparativo Consumo x Geração."""
+    import pandas as pd
+
+    geracao_sazonal = [geracao_mensal * f for f in FATOR_SAZONAL]
+
+    return pd.DataFrame({
+        "Mês": MESES,
+        "Consumo (kWh)": [consumo_kwh] * 12,
+        "Geração Solar (kWh)": geracao_sazonal
+    }).melt("Mês", var_name="Categoria", value_name="Energia (kWh)")
+
+
+def montar_grafico_comparativo(consumo_kwh, geracao_mensal):
+    """Monta o gráfico Altair do comparativo mensal Consumo x Geração."""
+    import altair as alt
+
+    with cronometro("grafico_dataframe"):
+        df = montar_dados_grafico(consumo_kwh, geracao_mensal)
+
+    domain_ = ["Consumo (kWh)", "Geração Solar (kWh)"]
+    range_ = ["#FF4B4B", "#0068C9"]
+
+    with cronometro("grafico_altair"):
+        return alt.Chart(df).mark_line(point=True).encode(
+            x=alt.X("Mês", sort=MESES),
+            y=alt.Y("Energia (kWh)", title="Energia Mensal (kWh)"),
+            color=alt.Color("Categoria", scale=alt.Scale(domain=domain_, range=range_)),
+            tooltip=["Mês", "Categoria", "Energia (kWh)"]
+        ).properties(height=350, title="📊 Comparativo Mensal: Consumo x Geração Solar")  # .interactive() removido
+
+
+def montar_heatmap_sensibilidade(valores_x, valores_y, grade, titulo_x, titulo_y, titulo_metrica,
+                                 ponto_atual=None, menor_melhor=False):
+    """Monta o heatmap Altair de uma grade de sensibilidade (ny, nx).
+
+    `ponto_atual` (x, y) marca o cenário simulado. Com `menor_melhor`
+    (ex.: payback), a escala de cores é invertida: verde continua bom.
+    """
+    import altair as alt
+    import numpy as np
+    import pandas as pd
+
+    xs, ys = np.meshgrid(valores_x, valores_y)
+    df = pd.DataFrame({"x": xs.ravel(), "y": ys.ravel(), "valor": np.asarray(grade, dtype=np.float64).ravel()})
+
+    mapa = alt.Chart(df).mark_rect().encode(
+        x=alt.X("x:O", title=titulo_x, axis=alt.Axis(labelAngle=-45)),
+        y=alt.Y("y:O", title=titulo_y, sort="descending"),
+        color=alt.Color("valor:Q", title=titulo_metrica,
+                        scale=alt.Scale(scheme="redyellowgreen", reverse=menor_melhor)),
+        tooltip=[alt.Tooltip("x:Q", title=titulo_x), alt.Tooltip("y:Q", title=titulo_y),
+                 alt.Tooltip("valor:Q", title=titulo_metrica, format=",.2f")]
+    )
+    if ponto_atual is not None:
+        # Célula mais próxima do cenário atual, contornada
+        x = valores_x[int(np.abs(np.asarray(valores_x) - ponto_atual[0]).argmin())]
+        y = valores_y[int(np.abs(np.asarray(valores_y) - ponto_atual[1]).argmin())]
+        marca = alt.Chart(pd.DataFrame({"x": [x], "y": [y]})).mark_rect(
+            fill=None, stroke="black", strokeWidth=2
+        ).encode(x="x:O", y=alt.Y("y:O", sort="descending"))
+        mapa = mapa + marca
+    return mapa.properties(height=380, title=f"🔥 {titulo_metrica}: {titulo_y} x {titulo_x}")
+
+
+def montar_grafico_telhado(vertices, modulos, titulo):
+    """Desenha uma água do telhado (contorno) e os módulos de solarsim.telhado (retângulos)."""
+    import altair as alt
+    import pandas as pd
+
+    fechado = list(vertices) + [vertices[0]]
+    contorno = alt.Chart(pd.DataFrame({
+        "x": [v[0] for v in fechado], "y": [v[1] for v in fechado], "ordem": range(len(fechado))
+    })).mark_line(color="#7F7F7F", strokeWidth=2).encode(
+        x=alt.X("x:Q", title="Ao longo do beiral (m)"),
+        y=alt.Y("y:Q", title="Subindo o caimento (m)"),
+        order="ordem:Q"
+    )
+    df = pd.DataFrame(modulos, columns=["x", "y", "largura", "altura"])
+    df["x2"] = df["x"] + df["largura"]
+    df["y2"] = df["y"] + df["altura"]
+    df["Orientação"] = ["Retrato" if altura > largura else "Paisagem"
+                        for largura, altura in zip(df["largura"], df["altura"])]
+    paineis = alt.Chart(df).mark_rect(stroke="white", strokeWidth=1).encode(
+        x="x:Q", x2="x2:Q", y="y:Q", y2="y2:Q",
+        color=alt.Color("Orientação:N", scale=alt.Scale(domain=["Retrato", "Paisagem"],
+                                                        range=["#0068C9", "#83C9FF"])),
+        tooltip=["Orientação"]
+    )
+    return (contorno + paineis).properties(height=320, title=titulo)
@@ -0,0 +1,157 @@
+"""Modelo horário (8760 h) de geração solar.
+
+A forma de cada dia vem de um modelo de céu claro (Haurwitz) para a
+latitude do local; a energia de cada mês é então escalada para bater com o
+modelo mensal do SolarSim (HSP × TAXA_DESEMPENHO × 30 dias × FATOR_SAZONAL).
+Assim os totais mensais reconciliam com geracao_mensal × fator sazonal, mas
+ficam disponíveis as séries horárias para autoconsumo, clipping do inversor
+e tarifas horárias.
+
+Tudo em float32 e vetorizado: `gerar_geracao_horaria` calcula o ano inteiro
+de milhares de sistemas numa única chamada, com formato (n, 8760).
+"""
+import functools
+
+import numpy as np
+
+from solarsim.calculos import FATOR_SAZONAL, TAXA_DESEMPENHO
+
+ANO_REFERENCIA = 2025  # ano não bissexto: 365 dias × 24 h
+HORAS_ANO = 8760
+DIAS_POR_MES_MODELO = 30  # o modelo mensal do SolarSim usa meses de 30 dias
+FRACAO_DIA_NUBLADO = 0.3  # geração de um dia nublado ÷ a de um dia de céu claro
+
+
+@functools.lru_cache(maxsize=None)
+def calendario(ano=ANO_REFERENCIA):
+    """Calendário horário do ano: mês (0-11), dia do ano, hora e dia da semana.
+
+    Devolve um dict de arrays somente leitura com HORAS_ANO posições, mais
+    `inicio_mes`, o índice da primeira hora de cada mês.
+    """
+    horas = np.arange(f"{ano}-01-01T00", f"{ano + 1}-01-01T00", dtype="datetime64[h]")
+    if horas.size != HORAS_ANO:
+        raise ValueError(f"O modelo horário usa anos de {HORAS_ANO} h; {ano} tem {horas.size}.")
+    dias = horas.astype("datetime64[D]")
+    meses = horas.astype("datetime64[M]")
+    tabela = {
+        "mes": (meses - meses[0]).astype(np.int64),
+        "dia_do_ano": (dias - dias[0]).astype(np.int64),
+        "hora": (horas - dias).astype(np.int64),
+        # 1970-01-01 foi quinta-feira; 0 = segunda-feira
+        "dia_semana": ((dias.astype(np.int64) + 3) % 7),
+    }
+    tabela["inicio_mes"] = np.searchsorted(tabela["mes"], np.arange(12))
+    for valores in tabela.values():
+        valores.setflags(write=False)
+    return tabela
+
+
+@functools.lru_cache(maxsize=256)
+def _forma_ceu_claro(latitude):
+    """Irradiância de céu claro (Haurwitz, W/m²) hora a hora para a latitude."""
+    cal = calendario()
+    dia = cal["dia_do_ano"] + 1
+    # Meio da hora em tempo solar aproximado
+    hora_solar = cal["hora"] + 0.5
+    declinacao = np.radians(23.45) * np.sin(2 * np.pi * (284 + dia) / 365)
+    angulo_horario = np.radians(15.0 * (hora_solar - 12.0))
+    lat = np.radians(latitude)
+    cos_zenite = (np.sin(lat) * np.sin(declinacao)
+                  + np.cos(lat) * np.cos(declinacao) * np.cos(angulo_horario))
+    ghi = np.zeros(HORAS_ANO)
+    sol = cos_zenite > 0.01
+    ghi[sol] = 1098.0 * cos_zenite[sol] * np.exp(-0.057 / cos_zenite[sol])
+    ghi.setflags(write=False)
+    return ghi
+
+
+@functools.lru_cache(maxsize=256)
+def _perfil_base(latitude, fatores_mensais=tuple(FATOR_SAZONAL)):
+    """Perfil horário para HSP × PR = 1: cada mês soma 30 × fator do mês."""
+    cal = calendario()
+    forma = _forma_ceu_claro(latitude)
+    soma_mes = np.add.reduceat(forma, cal["inicio_mes"])
+    alvo_mes = DIAS_POR_MES_MODELO * np.asarray(fatores_mensais)
+    perfil = (forma * (alvo_mes / soma_mes)[cal["mes"]]).astype(np.float32)
+    perfil.setflags(write=False)
+    return perfil
+
+
+def perfil_geracao_horaria(hsp, latitude, taxa_desempenho=TAXA_DESEMPENHO, fatores_mensais=FATOR_SAZONAL):
+    """Geração horária por kWp instalado (kWh/kWp), float32.
+
+    Com `hsp` escalar devolve (8760,); com arrays de hsp/latitude/taxa de
+    desempenho, devolve (n, 8760). Cada perfil é calculado uma vez por
+    latitude e reaproveitado.
+    """
+    hsp, latitude, taxa_desempenho = np.broadcast_arrays(
+        np.asarray(hsp, dtype=np.float64),
+        np.asarray(latitude, dtype=np.float64),
+        np.asarray(taxa_desempenho, dtype=np.float64),
+    )
+    fatores_mensais = tuple(float(f) for f in fatores_mensais)
+    latitudes, indice = np.unique(np.round(latitude, 2).reshape(-1), return_inverse=True)
+    bases = np.stack([_perfil_base(float(lat), fatores_mensais) for lat in latitudes])
+    escala = (hsp * taxa_desempenho).reshape(-1).astype(np.float32)
+    perfis = bases[indice] * escala[:, None]
+    return perfis.reshape(hsp.shape + (HORAS_ANO,))
+
+
+def aplicar_nebulosidade(perfil_kwh_kwp, latitude, taxa_desempenho=TAXA_DESEMPENHO, semente=0):
+    """Troca o "dia médio" de cada mês por dias claros e nublados.
+
+    O perfil de perfil_geracao_horaria tem todos os dias do mês com a mesma
+    forma e o mesmo total, o que achata os picos (importante para o clipping
+    do inversor). Aqui cada dia vira claro (geração de céu claro) ou nublado
+    (FRACAO_DIA_NUBLADO do céu claro), na proporção que preserva a média;
+    o sorteio dos dias é fixo pela `semente` e cada mês é reescalado para
+    manter exatamente os totais mensais.
+    """
+    perfil = np.asarray(perfil_kwh_kwp, dtype=np.float32)
+    cal = calendario()
+    inicio_dia = np.flatnonzero(cal["hora"] == 0)
+    latitude = np.broadcast_to(np.asarray(latitude, dtype=np.float64), perfil.shape[:-1])
+    latitudes, indice = np.unique(np.round(latitude, 2).reshape(-1), return_inverse=True)
+    ceu_claro = np.stack([_forma_ceu_claro(float(lat)) for lat in latitudes])[indice] / 1000.0
+    ceu_claro = ceu_claro.reshape(perfil.shape) * np.asarray(taxa_desempenho, dtype=np.float64)[..., None]
+
+    dia_medio = np.add.reduceat(perfil, inicio_dia, axis=-1, dtype=np.float64)
+    dia_claro = np.add.reduceat(ceu_claro, inicio_dia, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        razao = np.where(dia_claro > 0, dia_medio / dia_claro, 1.0)
+    fracao_claros = np.clip((razao - FRACAO_DIA_NUBLADO) / (1 - FRACAO_DIA_NUBLADO), 0.0, 1.0)
+    claro = np.random.default_rng(semente).random(inicio_dia.size) < fracao_claros
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fator = np.where(razao > 0, np.where(claro, 1.0, FRACAO_DIA_NUBLADO) / razao, 0.0)
+
+    novo = perfil * fator[..., cal["dia_do_ano"]].astype(np.float32)
+    total_antes = np.add.reduceat(perfil, cal["inicio_mes"], axis=-1, dtype=np.float64)
+    total_depois = np.add.reduceat(novo, cal["inicio_mes"], axis=-1, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ajuste = np.where(total_depois > 0, total_antes / total_depois, 0.0)
+    return novo * ajuste[..., cal["mes"]].astype(np.float32)
+
+
+def perfil_de_irradiancia(ghi_wm2, taxa_desempenho=TAXA_DESEMPENHO):
+    """Geração horária por kWp (kWh/kWp) a partir de irradiância medida (W/m², 8760 h)."""
+    ghi_wm2 = np.asarray(ghi_wm2, dtype=np.float32)
+    if ghi_wm2.shape[-1] != HORAS_ANO:
+        raise ValueError(f"A série de irradiância precisa de {HORAS_ANO} valores horários.")
+    return ghi_wm2 * np.float32(taxa_desempenho / 1000.0)
+
+
+def gerar_geracao_horaria(potencia_kwp, perfil_kwh_kwp):
+    """Geração horária (kWh) de vários sistemas, float32 com formato (n, 8760).
+
+    `perfil_kwh_kwp` pode ser um único perfil (8760,), compartilhado por todos
+    os sistemas, ou um perfil por sistema (n, 8760).
+    """
+    potencia_kwp = np.asarray(potencia_kwp, dtype=np.float32)
+    return potencia_kwp[..., None] * np.asarray(perfil_kwh_kwp, dtype=np.float32)
+
+
+def totais_mensais(serie_horaria):
+    """Soma uma série horária (..., 8760) em 12 totais mensais (..., 12), em float64."""
+    serie_horaria = np.asarray(serie_horaria)
+    return np.add.reduceat(serie_horaria, calendario()["inicio_mes"], axis=-1, dtype=np.float64)
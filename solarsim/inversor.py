@@ -0,0 +1,158 @@
+"""Modelo do inversor: curva de eficiência, limite CA e clipping.
+
+A série horária de entrada é a potência CC dos painéis (kW médio de cada
+hora = kWh da hora). O inversor converte com uma eficiência que depende da
+carga (CURVA_EFICIENCIA) e corta o que passar da sua potência nominal CA
+(clipping). O perfil de solarsim.horario já embute as perdas do inversor em
+TAXA_DESEMPENHO; `perfil_cc` as retira, para que um inversor folgado
+reproduza o modelo mensal.
+
+`varrer_razao_cc_ca` avalia dezenas de razões CC/CA de uma vez (array
+razões × horas) e recomenda a que dá mais energia por real investido. O
+/1.25 de calcular_sistema_solar continua sendo a estimativa rápida da página.
+"""
+import numpy as np
+
+from solarsim.calculos import CUSTO_WP_CAPITAIS, LATITUDE_CAPITAIS
+from solarsim.horario import aplicar_nebulosidade, perfil_geracao_horaria
+
+# Eficiência em função da carga (potência CC ÷ potência nominal CA), típica de string
+CURVA_EFICIENCIA = (
+    (0.0, 0.0), (0.02, 0.80), (0.05, 0.91), (0.10, 0.945), (0.20, 0.963),
+    (0.30, 0.968), (0.50, 0.970), (0.75, 0.968), (1.00, 0.965), (1.30, 0.960),
+)
+# Eficiência ponderada usada para tirar as perdas do inversor do perfil horário
+EFICIENCIA_REFERENCIA = 0.965
+
+RAZOES_CC_CA = tuple(np.round(np.arange(0.90, 1.61, 0.02), 2))
+
+# Custo do inversor: parte fixa + R$/kW de potência CA
+CUSTO_INVERSOR_FIXO = 600.0
+CUSTO_INVERSOR_KW = 400.0
+
+# Limite de memória da varredura (elementos de razões × horas por bloco)
+_ELEMENTOS_POR_BLOCO = 1 << 22
+
+
+def perfil_cc(perfil_kwh_kwp, eficiencia=EFICIENCIA_REFERENCIA):
+    """Tira as perdas do inversor de um perfil de solarsim.horario (kWh/kWp CC)."""
+    return np.asarray(perfil_kwh_kwp, dtype=np.float32) / np.float32(eficiencia)
+
+
+def custo_inversor(potencia_ca_kw):
+    """Custo estimado (R$) de um inversor com a potência CA dada."""
+    return CUSTO_INVERSOR_FIXO + CUSTO_INVERSOR_KW * np.asarray(potencia_ca_kw, dtype=np.float64)
+
+
+def _converter(potencia_cc, potencia_ca_kw, curva):
+    """Potência CA entregue e potência cortada, hora a hora (mesmo formato)."""
+    cargas, eficiencias = (np.asarray(v, dtype=np.float32) for v in zip(*curva))
+    potencia_ca_kw = np.asarray(potencia_ca_kw, dtype=np.float32)
+    carga = potencia_cc / potencia_ca_kw
+    convertida = potencia_cc * np.interp(carga, cargas, eficiencias).astype(np.float32)
+    entregue = np.minimum(convertida, potencia_ca_kw)
+    return entregue, convertida - entregue
+
+
+def simular_inversor(potencia_cc_horaria, potencia_ca_kw, curva=CURVA_EFICIENCIA):
+    """Passa séries CC (..., 8760) em kW por inversores de `potencia_ca_kw` (...,).
+
+    Devolve um dict com a série CA entregue (float32, ..., 8760) e os totais
+    anuais (kWh): energia_cc, energia_ca, energia_cortada e perda_conversao.
+    """
+    potencia_cc = np.asarray(potencia_cc_horaria, dtype=np.float32)
+    potencia_ca_kw = np.asarray(potencia_ca_kw, dtype=np.float32)[..., None]
+    entregue, cortada = _converter(potencia_cc, potencia_ca_kw, curva)
+    energia_cc = potencia_cc.sum(axis=-1, dtype=np.float64)
+    energia_ca = entregue.sum(axis=-1, dtype=np.float64)
+    energia_cortada = cortada.sum(axis=-1, dtype=np.float64)
+    return {
+        "ca_horaria": entregue,
+        "energia_cc": energia_cc,
+        "energia_ca": energia_ca,
+        "energia_cortada": energia_cortada,
+        "perda_conversao": energia_cc - energia_ca - energia_cortada,
+    }
+
+
+def varrer_razao_cc_ca(potencia_kwp, perfil_cc_kwh_kwp, custo_wp, razoes=RAZOES_CC_CA,
+                       curva=CURVA_EFICIENCIA):
+    """Avalia várias razões CC/CA e recomenda o inversor de cada proposta.
+
+    `potencia_kwp` e `custo_wp` são escalares ou (n,); `perfil_cc_kwh_kwp` é
+    (8760,) ou (n, 8760). O custo dos painéis e do resto da instalação é
+    potência × custo_wp sem a parte do inversor (20%, como em custos
+    detalhados), somado a custo_inversor(potência CA) de cada razão.
+
+    Devolve arrays (n, razões) — potencia_ca_kw, energia_ca_anual,
+    energia_cortada_anual, custo_total e kwh_por_real — e, por proposta (n,),
+    indice_recomendado, razao_recomendada e inversor_kw_recomendado.
+    """
+    potencia_kwp, custo_wp = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(potencia_kwp, dtype=np.float64)),
+        np.atleast_1d(np.asarray(custo_wp, dtype=np.float64)),
+    )
+    perfil = np.asarray(perfil_cc_kwh_kwp, dtype=np.float32)
+    if perfil.ndim == 1:
+        perfil = perfil[None, :]
+    n = len(potencia_kwp)
+    razoes = np.asarray(razoes, dtype=np.float64)
+
+    # Horas sem sol não passam pelo inversor: só entram as colunas com geração
+    perfil = perfil[:, perfil.any(axis=0)]
+    potencia_ca = potencia_kwp[:, None] / razoes
+    energia_ca = np.empty((n, len(razoes)))
+    energia_cortada = np.empty((n, len(razoes)))
+
+    bloco = max(1, _ELEMENTOS_POR_BLOCO // (len(razoes) * perfil.shape[1]))
+    for inicio in range(0, n, bloco):
+        fim = min(inicio + bloco, n)
+        linhas = perfil[inicio:fim] if len(perfil) > 1 else perfil
+        potencia_cc = (potencia_kwp[inicio:fim, None] * linhas).astype(np.float32)
+        entregue, cortada = _converter(potencia_cc[:, None, :], potencia_ca[inicio:fim, :, None], curva)
+        energia_ca[inicio:fim] = entregue.sum(axis=-1, dtype=np.float64)
+        energia_cortada[inicio:fim] = cortada.sum(axis=-1, dtype=np.float64)
+
+    custo_total = potencia_kwp[:, None] * 1000 * custo_wp[:, None] * 0.80 + custo_inversor(potencia_ca)
+    kwh_por_real = energia_ca / custo_total
+    indice = np.argmax(kwh_por_real, axis=1)
+    linhas = np.arange(n)
+    return {
+        "razoes": razoes,
+        "potencia_ca_kw": potencia_ca,
+        "energia_ca_anual": energia_ca,
+        "energia_cortada_anual": energia_cortada,
+        "custo_total": custo_total,
+        "kwh_por_real": kwh_por_real,
+        "indice_recomendado": indice,
+        "razao_recomendada": razoes[indice],
+        "inversor_kw_recomendado": potencia_ca[linhas, indice],
+    }
+
+
+def dimensionar_inversor(potencia_kwp, hsp, latitude, custo_wp, razoes=RAZOES_CC_CA):
+    """Inversor recomendado para um sistema de `potencia_kwp`, como floats (serializável).
+
+    Usa o perfil horário de solarsim.horario para o HSP e a latitude, com
+    dias claros e nublados (aplicar_nebulosidade): no dia médio quase não há
+    clipping. Devolve inversor_kw, razao_cc_ca, corte_percentual (energia
+    cortada ÷ energia CA) e energia_ca_anual.
+    """
+    perfil = perfil_cc(aplicar_nebulosidade(perfil_geracao_horaria(hsp, latitude), latitude))
+    varredura = varrer_razao_cc_ca(potencia_kwp, perfil, custo_wp, razoes)
+    i = int(varredura["indice_recomendado"][0])
+    energia_ca = float(varredura["energia_ca_anual"][0, i])
+    return {
+        "inversor_kw": float(varredura["inversor_kw_recomendado"][0]),
+        "razao_cc_ca": float(varredura["razao_recomendada"][0]),
+        "corte_percentual": float(varredura["energia_cortada_anual"][0, i]) / energia_ca * 100,
+        "energia_ca_anual": energia_ca,
+    }
+
+
+def inversor_da_simulacao(R, **parametros):
+    """Inversor recomendado para um resultado de simular()."""
+    return dimensionar_inversor(
+        R["dados"]["potencia_kwp"], R["hsp"], LATITUDE_CAPITAIS[R["cidade"]], CUSTO_WP_CAPITAIS[R["cidade"]],
+        **parametros
+    )
@@ -0,0 +1,224 @@
+"""Localização: HSP e custo do Wp para qualquer ponto do Brasil.
+
+Carrega uma grade de irradiação no formato do CRESESB / Atlas Brasileiro de
+Energia Solar (colunas LON, LAT, ANNUAL, JAN..DEC, em Wh/m²·dia ou em HSP)
+e uma tabela regional de custo do Wp (pontos com latitude, longitude e
+custo_wp). As consultas usam um índice espacial (KD-tree do scipy, quando
+instalado; senão uma busca vetorizada em NumPy) e aceitam arrays, para os
+jobs em lote. Cada arquivo é carregado e indexado uma única vez por processo.
+"""
+import csv
+import functools
+import unicodedata
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy é opcional
+    cKDTree = None
+
+MESES_GRADE = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+
+
+def _para_xyz(latitude, longitude):
+    """Converte lat/lon (graus) em pontos na esfera unitária.
+
+    A distância euclidiana entre esses pontos cresce com a distância sobre a
+    Terra, então o vizinho mais próximo em 3D é o mais próximo no globo.
+    """
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class IndiceEspacial:
+    """Índice de vizinho mais próximo para pontos (latitude, longitude)."""
+
+    def __init__(self, latitude, longitude):
+        self._pontos = _para_xyz(latitude, longitude)
+        self._arvore = cKDTree(self._pontos) if cKDTree is not None else None
+
+    def mais_proximo(self, latitude, longitude):
+        """Índice do ponto mais próximo de cada consulta (aceita arrays)."""
+        consultas = _para_xyz(latitude, longitude)
+        if self._arvore is not None:
+            return self._arvore.query(consultas)[1]
+
+        planas = consultas.reshape(-1, 3)
+        indices = np.empty(len(planas), dtype=np.int64)
+        # Sem scipy: produto escalar máximo = ponto mais próximo, em blocos para limitar memória
+        for inicio in range(0, len(planas), 256):
+            bloco = planas[inicio:inicio + 256]
+            indices[inicio:inicio + 256] = np.argmax(bloco @ self._pontos.T, axis=1)
+        return indices.reshape(consultas.shape[:-1])
+
+
+def ler_tabela(caminho):
+    """Lê um CSV separado por ';' ou ',' e devolve um dict de colunas (texto)."""
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=";,")
+        leitor = csv.reader(arquivo, dialeto)
+        cabecalho = [nome.strip().upper() for nome in next(leitor)]
+        linhas = [linha for linha in leitor if linha]
+    return {nome: [linha[i] for linha in linhas] for i, nome in enumerate(cabecalho)}
+
+
+class GradeIrradiancia:
+    """Grade de HSP (média anual e mensal) com consultas por lat/lon."""
+
+    def __init__(self, latitude, longitude, hsp_anual, hsp_mensal=None):
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self.hsp_anual = np.asarray(hsp_anual, dtype=np.float64)
+        self.hsp_mensal = None if hsp_mensal is None else np.asarray(hsp_mensal, dtype=np.float64)
+        self.indice = IndiceEspacial(self.latitude, self.longitude)
+        self._montar_matriz()
+
+    def _montar_matriz(self):
+        """Monta a matriz regular (lat × lon) usada na interpolação bilinear.
+
+        Latitude e longitude têm passos próprios (ex.: grades de 0,1° × 0,125°).
+        """
+        lats = np.unique(self.latitude)
+        lons = np.unique(self.longitude)
+        self.passos = tuple(float(np.diff(eixo).min()) if eixo.size > 1 else 0.0 for eixo in (lats, lons))
+        self._matriz = None
+        if min(self.passos) <= 0:
+            return
+        passo_lat, passo_lon = self.passos
+        i = np.rint((self.latitude - lats[0]) / passo_lat)
+        j = np.rint((self.longitude - lons[0]) / passo_lon)
+        fora_da_grade = (np.abs(i * passo_lat + lats[0] - self.latitude) > 1e-6) | \
+                        (np.abs(j * passo_lon + lons[0] - self.longitude) > 1e-6)
+        if fora_da_grade.any():
+            return  # pontos espalhados: só vizinho mais próximo
+        self._origem = (lats[0], lons[0])
+        self._matriz = np.full((int(i.max()) + 1, int(j.max()) + 1), np.nan)
+        self._matriz[i.astype(np.int64), j.astype(np.int64)] = self.hsp_anual
+
+    @classmethod
+    def de_csv(cls, caminho):
+        """Lê a grade no formato CRESESB/Atlas (LON, LAT, ANNUAL, JAN..DEC)."""
+        tabela = ler_tabela(caminho)
+        anual = np.array(tabela["ANNUAL"], dtype=np.float64)
+        mensal = None
+        if all(mes in tabela for mes in MESES_GRADE):
+            mensal = np.array([tabela[mes] for mes in MESES_GRADE], dtype=np.float64).T
+        # Arquivos do Atlas vêm em Wh/m²·dia; HSP é kWh/m²·dia
+        if np.nanmedian(anual) > 100:
+            anual = anual / 1000
+            mensal = None if mensal is None else mensal / 1000
+        return cls(tabela["LAT"], tabela["LON"], anual, mensal)
+
+    def hsp_mais_proximo(self, latitude, longitude):
+        """HSP anual do ponto da grade mais próximo."""
+        return self.hsp_anual[self.indice.mais_proximo(latitude, longitude)]
+
+    def hsp_mensal_mais_proximo(self, latitude, longitude):
+        """HSP dos 12 meses do ponto da grade mais próximo (..., 12)."""
+        if self.hsp_mensal is None:
+            raise ValueError("Esta grade não tem as colunas mensais (JAN..DEC).")
+        return self.hsp_mensal[self.indice.mais_proximo(latitude, longitude)]
+
+    def hsp_interpolado(self, latitude, longitude):
+        """HSP anual por interpolação bilinear entre os 4 pontos vizinhos.
+
+        Fora da grade, ou quando falta algum dos 4 vizinhos (borda, mar),
+        usa o ponto mais próximo.
+        """
+        latitude, longitude = np.broadcast_arrays(
+            np.asarray(latitude, dtype=np.float64), np.asarray(longitude, dtype=np.float64)
+        )
+        if self._matriz is None:
+            return self.hsp_mais_proximo(latitude, longitude)
+
+        fi = (latitude - self._origem[0]) / self.passos[0]
+        fj = (longitude - self._origem[1]) / self.passos[1]
+        i0 = np.floor(fi).astype(np.int64)
+        j0 = np.floor(fj).astype(np.int64)
+        ti, tj = fi - i0, fj - j0
+        n_lat, n_lon = self._matriz.shape
+        dentro = (i0 >= 0) & (j0 >= 0) & (i0 + 1 < n_lat) & (j0 + 1 < n_lon)
+        i0c = np.clip(i0, 0, n_lat - 2)
+        j0c = np.clip(j0, 0, n_lon - 2)
+        m = self._matriz
+        valor = np.array((1 - ti) * (1 - tj) * m[i0c, j0c] + ti * (1 - tj) * m[i0c + 1, j0c]
+                         + (1 - ti) * tj * m[i0c, j0c + 1] + ti * tj * m[i0c + 1, j0c + 1])
+        invalido = ~dentro | np.isnan(valor)
+        if invalido.any():
+            valor[invalido] = self.hsp_mais_proximo(latitude[invalido], longitude[invalido])
+        return valor[()]
+
+
+class TabelaCustoWp:
+    """Custo regional do Wp instalado, pelo ponto de referência mais próximo."""
+
+    def __init__(self, latitude, longitude, custo_wp, regiao=None):
+        self.custo_wp = np.asarray(custo_wp, dtype=np.float64)
+        self.regiao = regiao
+        self.indice = IndiceEspacial(latitude, longitude)
+
+    @classmethod
+    def de_csv(cls, caminho):
+        """Lê um CSV com LAT, LON, CUSTO_WP e, opcionalmente, REGIAO."""
+        tabela = ler_tabela(caminho)
+        return cls(tabela["LAT"], tabela["LON"], tabela["CUSTO_WP"], tabela.get("REGIAO"))
+
+    def consultar(self, latitude, longitude):
+        """Custo do Wp (R$/Wp) para cada ponto consultado."""
+        return self.custo_wp[self.indice.mais_proximo(latitude, longitude)]
+
+
+def _normalizar_nome(nome):
+    sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    return " ".join(sem_acento.lower().split())
+
+
+class Municipios:
+    """Coordenadas dos municípios, consultadas por nome e UF."""
+
+    def __init__(self, nomes, ufs, latitude, longitude):
+        self.nomes = list(nomes)
+        self.ufs = [uf.strip().upper() for uf in ufs]
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self._por_nome = {
+            (_normalizar_nome(nome), uf): i for i, (nome, uf) in enumerate(zip(self.nomes, self.ufs))
+        }
+
+    @classmethod
+    def de_csv(cls, caminho):
+        """Lê um CSV com NOME, UF, LAT e LON (ex.: a tabela de municípios do IBGE)."""
+        tabela = ler_tabela(caminho)
+        return cls(tabela["NOME"], tabela["UF"], tabela["LAT"], tabela["LON"])
+
+    def coordenadas(self, nome, uf):
+        """(latitude, longitude) do município; KeyError se não existir."""
+        i = self._por_nome[(_normalizar_nome(nome), uf.strip().upper())]
+        return float(self.latitude[i]), float(self.longitude[i])
+
+    def rotulos(self):
+        """Rótulos no formato usado na página, ex.: 'Rio das Ostras (RJ)'."""
+        return [f"{nome} ({uf})" for nome, uf in zip(self.nomes, self.ufs)]
+
+
+@functools.lru_cache(maxsize=8)
+def carregar_grade(caminho):
+    """Grade de irradiação do arquivo, indexada uma vez por processo."""
+    return GradeIrradiancia.de_csv(caminho)
+
+
+@functools.lru_cache(maxsize=8)
+def carregar_custos_wp(caminho):
+    """Tabela de custo do Wp do arquivo, indexada uma vez por processo."""
+    return TabelaCustoWp.de_csv(caminho)
+
+
+@functools.lru_cache(maxsize=8)
+def carregar_municipios(caminho):
+    """Tabela de municípios do arquivo, carregada uma vez por processo."""
+    return Municipios.de_csv(caminho)
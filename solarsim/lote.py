@@ -0,0 +1,208 @@
+"""Calculadoras do SolarSim em lote (NumPy), para jobs com muitos clientes."""
+import numpy as np
+
+from solarsim.calculos import (
+    AREA_PAINEL_M2,
+    FATOR_EMISSAO_CO2_KWH,
+    POTENCIA_PAINEL_WP,
+    TAXA_DESEMPENHO,
+)
+
+
+# --- FUNÇÕES DE CÁLCULO EM LOTE (NumPy) ---
+# Versões vetorizadas das calculadoras de solarsim.calculos: recebem arrays (ou
+# escalares) e devolvem colunas, com exatamente os mesmos valores escalares.
+
+def _arredondar(valores, casas):
+    """Arredonda como o round() do Python (np.round diverge em alguns empates)."""
+    valores = np.asarray(valores, dtype=np.float64)
+    # Trabalha num array 1-D: com um escalar, np.round devolveria uma cópia
+    planos = np.atleast_1d(valores).reshape(-1)
+    resultado = np.round(planos, casas)
+    # Só os valores cuja parte decimal fica perto de ,5 podem divergir
+    fracao = np.abs(planos * 10.0 ** casas) % 1.0
+    for i in np.flatnonzero(np.abs(fracao - 0.5) < 1e-6):
+        resultado[i] = round(float(planos[i]), casas)
+    return resultado.reshape(valores.shape)[()]
+
+
+def _custos_detalhados_lote(custo_total):
+    """Divide o custo total nas mesmas proporções das calculadoras escalares."""
+    return {
+        "Painéis Fotovoltaicos": custo_total * 0.40,
+        "Inversor(es)": custo_total * 0.20,
+        "Estruturas, Cabos e Proteções": custo_total * 0.15,
+        "Mão de Obra e Projeto": custo_total * 0.25
+    }
+
+
+def calcular_sistema_solar_lote(consumo_kwh, tarifa, hsp, custo_wp_regional):
+    """Calculadora por Consumo em lote (arrays de kWh -> colunas em R$)"""
+    consumo_kwh, tarifa, hsp, custo_wp_regional = np.broadcast_arrays(
+        np.asarray(consumo_kwh, dtype=np.float64),
+        np.asarray(tarifa, dtype=np.float64),
+        np.asarray(hsp, dtype=np.float64),
+        np.asarray(custo_wp_regional, dtype=np.float64),
+    )
+
+    consumo_diario_kwh = consumo_kwh / 30
+    potencia_necessaria_kwp = consumo_diario_kwh / (hsp * TAXA_DESEMPENHO)
+    potencia_necessaria_wp = potencia_necessaria_kwp * 1000
+
+    numero_paineis = np.maximum(1, np.ceil(potencia_necessaria_wp / POTENCIA_PAINEL_WP)).astype(np.int64)
+    potencia_final_sistema_wp = numero_paineis * POTENCIA_PAINEL_WP
+    potencia_kwp_final = potencia_final_sistema_wp / 1000
+    area_total_m2 = numero_paineis * AREA_PAINEL_M2
+    inversor_kw_rec = potencia_kwp_final / 1.25
+
+    geracao_diaria_kwh = potencia_kwp_final * hsp * TAXA_DESEMPENHO
+    geracao_mensal_kwh = geracao_diaria_kwh * 30
+    custo_total_estimado = potencia_final_sistema_wp * custo_wp_regional
+    economia_mensal_reais = np.minimum(geracao_mensal_kwh, consumo_kwh) * tarifa
+    geracao_anual_kwh = geracao_mensal_kwh * 12
+    co2_evitado_anual_kg = geracao_anual_kwh * FATOR_EMISSAO_CO2_KWH
+
+    return {
+        "potencia_kwp": _arredondar(potencia_kwp_final, 2),
+        "inversor_kw_recomendado": _arredondar(inversor_kw_rec, 2),
+        "numero_paineis": numero_paineis,
+        "area_m2": _arredondar(area_total_m2, 2),
+        "custo_total_estimado_site": custo_total_estimado,
+        "economia_mensal_reais": economia_mensal_reais,
+        "co2_evitado_kg": _arredondar(co2_evitado_anual_kg, 2),
+        "geracao_mensal": _arredondar(geracao_mensal_kwh, 2),
+        "custos_detalhados": _custos_detalhados_lote(custo_total_estimado)
+    }
+
+
+def calcular_sistema_por_orcamento_lote(orcamento, custo_wp_regional, consumo_kwh, tarifa, hsp):
+    """Calculadora por Orçamento em lote (arrays de R$ -> colunas em kWh)"""
+    orcamento, custo_wp_regional, consumo_kwh, tarifa, hsp = np.broadcast_arrays(
+        np.asarray(orcamento, dtype=np.float64),
+        np.asarray(custo_wp_regional, dtype=np.float64),
+        np.asarray(consumo_kwh, dtype=np.float64),
+        np.asarray(tarifa, dtype=np.float64),
+        np.asarray(hsp, dtype=np.float64),
+    )
+
+    potencia_final_sistema_wp = orcamento / custo_wp_regional
+    potencia_kwp_final = potencia_final_sistema_wp / 1000
+    inversor_kw_rec = potencia_kwp_final / 1.25
+    numero_paineis = np.maximum(1, np.ceil(potencia_final_sistema_wp / POTENCIA_PAINEL_WP)).astype(np.int64)
+    area_total_m2 = numero_paineis * AREA_PAINEL_M2
+
+    geracao_diaria_kwh = potencia_kwp_final * hsp * TAXA_DESEMPENHO
+    geracao_mensal_kwh = geracao_diaria_kwh * 30
+    economia_mensal_reais = np.minimum(geracao_mensal_kwh, consumo_kwh) * tarifa
+    geracao_anual_kwh = geracao_mensal_kwh * 12
+    co2_evitado_anual_kg = geracao_anual_kwh * FATOR_EMISSAO_CO2_KWH
+
+    return {
+        "potencia_kwp": _arredondar(potencia_kwp_final, 2),
+        "inversor_kw_recomendado": _arredondar(inversor_kw_rec, 2),
+        "numero_paineis": numero_paineis,
+        "area_m2": _arredondar(area_total_m2, 2),
+        "custo_total_estimado_site": orcamento.copy(),
+        "economia_mensal_reais": economia_mensal_reais,
+        "co2_evitado_kg": _arredondar(co2_evitado_anual_kg, 2),
+        "geracao_mensal": _arredondar(geracao_mensal_kwh, 2),
+        "custos_detalhados": _custos_detalhados_lote(orcamento)
+    }
+
+
+def minimo_kwh_por_conexao_lote(conexoes):
+    """Taxa mínima em kWh para cada tipo de conexão (texto livre ou nº de fases)."""
+    conexoes = np.char.lower(np.char.strip(np.asarray(conexoes).astype(str)))
+    # Coluna numérica com célula vazia vira float no pandas: "3.0" -> "3"
+    decimal = np.char.find(conexoes, ".") >= 0
+    conexoes = np.where(decimal, np.char.rstrip(np.char.rstrip(conexoes, "0"), "."), conexoes)
+    minimo = np.full(conexoes.shape, 50, dtype=np.int64)
+    minimo[(np.char.find(conexoes, "mono") >= 0) | (conexoes == "1")] = 30
+    minimo[(np.char.find(conexoes, "tri") >= 0) | (conexoes == "3")] = 100
+    return minimo
+
+
+def calcular_nova_fatura_lote(saldo_kwh, minimo_kwh, tarifa):
+    """Nova fatura mensal em lote (mesma regra de calcular_nova_fatura)."""
+    saldo_kwh = np.asarray(saldo_kwh, dtype=np.float64)
+    kwh_a_pagar = np.where(saldo_kwh < 0, np.maximum(np.abs(saldo_kwh), minimo_kwh), minimo_kwh)
+    return kwh_a_pagar * np.asarray(tarifa, dtype=np.float64)
+
+
+def calcular_payback_lote(custo, economia_mensal):
+    """Payback em anos e meses inteiros, como em formatar_payback.
+
+    Onde a economia não é positiva, anos e meses valem -1 (não aplicável).
+    """
+    custo = np.asarray(custo, dtype=np.float64)
+    economia_mensal = np.asarray(economia_mensal, dtype=np.float64)
+    aplicavel = economia_mensal > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payback_anos = np.where(aplicavel, custo / (economia_mensal * 12), 0.0)
+    anos = np.trunc(payback_anos)
+    meses = np.rint((payback_anos - anos) * 12)
+    virada = meses == 12
+    anos = np.where(virada, anos + 1, anos).astype(np.int64)
+    meses = np.where(virada, 0, meses).astype(np.int64)
+    anos[~aplicavel] = -1
+    meses[~aplicavel] = -1
+    return anos, meses
+
+
+def formatar_payback_lote(custo, economia_mensal):
+    """Versão em lote de formatar_payback (array de textos)."""
+    anos, meses = calcular_payback_lote(custo, economia_mensal)
+    texto_meses = np.char.add(np.char.mod("%d", meses), " meses")
+    texto_completo = np.char.add(np.char.add("~ ", np.char.mod("%d", anos)), np.char.add(" anos e ", texto_meses))
+    texto = np.where(anos > 0, texto_completo, np.char.add("~ ", texto_meses))
+    return np.where(anos < 0, "Não aplicável", texto)
+
+
+def simular_lote(consumo_kwh, tarifa, minimo_kwh, hsp, custo_wp_regional, orcamento=None):
+    """Fluxo completo do botão "Simular" em lote.
+
+    Onde orcamento é NaN (ou não informado) o sistema é dimensionado pelo
+    consumo; nas demais linhas, pelo orçamento. Devolve as colunas do
+    dimensionamento mais custo_final, payback (texto), payback_simples_meses,
+    saldo_kwh e nova_fatura.
+    """
+    consumo_kwh, tarifa, minimo_kwh, hsp, custo_wp_regional = np.broadcast_arrays(
+        np.asarray(consumo_kwh, dtype=np.float64),
+        np.asarray(tarifa, dtype=np.float64),
+        np.asarray(minimo_kwh, dtype=np.float64),
+        np.asarray(hsp, dtype=np.float64),
+        np.asarray(custo_wp_regional, dtype=np.float64),
+    )
+    if orcamento is None:
+        orcamento = np.full(consumo_kwh.shape, np.nan)
+    orcamento = np.broadcast_to(np.asarray(orcamento, dtype=np.float64), consumo_kwh.shape)
+    por_orcamento = ~np.isnan(orcamento)
+
+    dados = calcular_sistema_solar_lote(consumo_kwh, tarifa, hsp, custo_wp_regional)
+    if por_orcamento.any():
+        dados_orcamento = calcular_sistema_por_orcamento_lote(
+            orcamento[por_orcamento], custo_wp_regional[por_orcamento],
+            consumo_kwh[por_orcamento], tarifa[por_orcamento], hsp[por_orcamento]
+        )
+        for chave, coluna in dados_orcamento.items():
+            if chave == "custos_detalhados":
+                for item, valores in coluna.items():
+                    dados[chave][item][por_orcamento] = valores
+            else:
+                dados[chave][por_orcamento] = coluna
+
+    custo_final = dados["custo_total_estimado_site"]
+    payback_anos, payback_meses = calcular_payback_lote(custo_final, dados["economia_mensal_reais"])
+    # Em meses corridos, como o payback_meses do fluxo de caixa (NaN: não se paga)
+    payback_simples_meses = np.where(payback_anos >= 0, payback_anos * 12 + payback_meses, np.nan)
+    saldo_kwh = dados["geracao_mensal"] - consumo_kwh
+
+    dados.update({
+        "custo_final": custo_final,
+        "payback": formatar_payback_lote(custo_final, dados["economia_mensal_reais"]),
+        "payback_simples_meses": payback_simples_meses,
+        "minimo_kwh": minimo_kwh,
+        "saldo_kwh": saldo_kwh,
+        "nova_fatura": calcular_nova_fatura_lote(saldo_kwh, minimo_kwh, tarifa)
+    })
+    return dados
@@ -0,0 +1,213 @@
+"""Instrumentação da página: contadores, histogramas de tempo e perfis.
+
+Um registro por processo (REGISTRO), seguro entre threads: cada sessão do
+Streamlit roda em sua thread e todas observam no mesmo registro. As etapas
+são medidas com `cronometro("nome")`, que serve como bloco `with` e como
+decorador. Os histogramas têm baldes fixos em ms (BALDES_MS), então
+observar é O(log baldes) e a memória não cresce com o uso.
+
+Saídas (todas opcionais e locais):
+
+* `servir_metricas(porta)`: endpoint HTTP em 127.0.0.1 com /metrics
+  (formato de texto do Prometheus) e /metrics.json;
+* `gravar_periodicamente(caminho, intervalo)`: uma linha JSON com o
+  instantâneo a cada `intervalo` segundos (log sink);
+* `Perfil`: relatório de uma execução com pyinstrument, se instalado, ou
+  cProfile.
+"""
+import bisect
+import collections
+import contextlib
+import io
+import json
+import math
+import threading
+import time
+
+# Limites superiores (ms) dos baldes dos histogramas; o último balde é +inf
+BALDES_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class _Histograma:
+    __slots__ = ("baldes", "contagem", "soma", "maximo")
+
+    def __init__(self):
+        self.baldes = [0] * (len(BALDES_MS) + 1)
+        self.contagem = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, valor):
+        self.baldes[bisect.bisect_left(BALDES_MS, valor)] += 1
+        self.contagem += 1
+        self.soma += valor
+        self.maximo = max(self.maximo, valor)
+
+    def quantil(self, q):
+        """Limite superior do balde que contém o quantil q (estimativa)."""
+        alvo = q * self.contagem
+        acumulado = 0
+        for limite, n in zip(BALDES_MS + (math.inf,), self.baldes):
+            acumulado += n
+            if acumulado >= alvo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+class Metricas:
+    """Contadores e histogramas de tempo (ms) por nome de etapa."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._contadores = collections.Counter()
+        self._histogramas = collections.defaultdict(_Histograma)
+        self._medidores = {}
+
+    def contar(self, nome, n=1):
+        with self._trava:
+            self._contadores[nome] += n
+
+    def observar(self, nome, milissegundos):
+        with self._trava:
+            self._histogramas[nome].observar(milissegundos)
+
+    @contextlib.contextmanager
+    def cronometrar(self, nome):
+        """Mede o bloco (ou a função decorada) no histograma `nome`."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, (time.perf_counter() - inicio) * 1000)
+
+    def registrar_medidor(self, nome, funcao):
+        """Inclui no instantâneo o dict devolvido por `funcao()` (ex.: cache.estatisticas)."""
+        with self._trava:
+            self._medidores[nome] = funcao
+
+    def instantaneo(self):
+        """Contadores, resumo dos histogramas e medidores, serializável em JSON."""
+        with self._trava:
+            contadores = dict(self._contadores)
+            etapas = {
+                nome: {
+                    "contagem": h.contagem,
+                    "media_ms": h.soma / h.contagem if h.contagem else 0.0,
+                    "p50_ms": h.quantil(0.50),
+                    "p95_ms": h.quantil(0.95),
+                    "max_ms": h.maximo,
+                    "baldes": dict(zip([str(b) for b in BALDES_MS] + ["+Inf"], h.baldes)),
+                }
+                for nome, h in sorted(self._histogramas.items())
+            }
+            medidores = dict(self._medidores)
+        return {
+            "contadores": contadores,
+            "etapas": etapas,
+            "medidores": {nome: funcao() for nome, funcao in medidores.items()},
+        }
+
+    def formato_prometheus(self):
+        """Texto no formato de exposição do Prometheus."""
+        with self._trava:
+            linhas = ["# TYPE solarsim_eventos_total counter"]
+            for nome, valor in sorted(self._contadores.items()):
+                linhas.append(f'solarsim_eventos_total{{evento="{nome}"}} {valor}')
+            linhas.append("# TYPE solarsim_etapa_ms histogram")
+            for nome, h in sorted(self._histogramas.items()):
+                acumulado = 0
+                for limite, n in zip(BALDES_MS + (math.inf,), h.baldes):
+                    acumulado += n
+                    le = "+Inf" if limite == math.inf else f"{limite:g}"
+                    linhas.append(f'solarsim_etapa_ms_bucket{{etapa="{nome}",le="{le}"}} {acumulado}')
+                linhas.append(f'solarsim_etapa_ms_sum{{etapa="{nome}"}} {h.soma:.3f}')
+                linhas.append(f'solarsim_etapa_ms_count{{etapa="{nome}"}} {h.contagem}')
+        return "\n".join(linhas) + "\n"
+
+    def limpar(self):
+        with self._trava:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+
+REGISTRO = Metricas()
+cronometro = REGISTRO.cronometrar
+
+
+def servir_metricas(porta, endereco="127.0.0.1", registro=REGISTRO):
+    """Sobe o endpoint /metrics (e /metrics.json) numa thread daemon; devolve o servidor."""
+    import http.server
+
+    class Manipulador(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                corpo, tipo = registro.formato_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                corpo, tipo = json.dumps(registro.instantaneo(), ensure_ascii=False), "application/json"
+            else:
+                self.send_error(404)
+                return
+            dados = corpo.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = http.server.ThreadingHTTPServer((endereco, porta), Manipulador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="solarsim-metricas", daemon=True).start()
+    return servidor
+
+
+def gravar_periodicamente(caminho, intervalo=60.0, registro=REGISTRO):
+    """Acrescenta o instantâneo (uma linha JSON com horário) ao arquivo a cada `intervalo` s."""
+    def gravar():
+        while True:
+            time.sleep(intervalo)
+            linha = {"horario": time.strftime("%Y-%m-%dT%H:%M:%S"), **registro.instantaneo()}
+            with open(caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+    thread = threading.Thread(target=gravar, name="solarsim-metricas-log", daemon=True)
+    thread.start()
+    return thread
+
+
+class Perfil:
+    """Perfil de uma execução na thread atual: pyinstrument se instalado, senão cProfile."""
+
+    def __init__(self):
+        try:
+            import pyinstrument
+        except ImportError:
+            import cProfile
+
+            self.ferramenta = "cProfile"
+            self._perfil = cProfile.Profile()
+        else:
+            self.ferramenta = "pyinstrument"
+            self._perfil = pyinstrument.Profiler()
+
+    def iniciar(self):
+        """Começa a medir; ValueError se outro perfilador já estiver ativo (Python 3.12+)."""
+        if self.ferramenta == "pyinstrument":
+            self._perfil.start()
+        else:
+            self._perfil.enable()
+        return self
+
+    def parar(self, linhas=40):
+        """Para e devolve o relatório em texto (cProfile: as `linhas` maiores por tempo acumulado)."""
+        if self.ferramenta == "pyinstrument":
+            self._perfil.stop()
+            return self._perfil.output_text(unicode=True)
+        import pstats
+
+        self._perfil.disable()
+        saida = io.StringIO()
+        pstats.Stats(self._perfil, stream=saida).sort_stats("cumulative").print_stats(linhas)
+        return saida.getvalue()
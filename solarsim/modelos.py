@@ -0,0 +1,113 @@
+"""Modelos de documento das propostas (resumo em texto e página HTML).
+
+O texto de cada modelo é compilado uma única vez: os campos {nome} viram
+%s de uma string de formato, e renderizar é uma única operação % em C, sem
+concatenações. O resumo de uma simulação (gerar_resumo_txt) e o gerador em
+massa de solarsim.relatorios usam os mesmos modelos; os valores chegam já
+formatados como texto.
+"""
+import string
+
+
+class Modelo:
+    """Texto com campos {nome}, compilado para o operador %."""
+
+    def __init__(self, texto):
+        partes, campos = [], []
+        for literal, campo, especificacao, conversao in string.Formatter().parse(texto):
+            partes.append(literal.replace("%", "%%"))
+            if campo is not None:
+                if especificacao or conversao:
+                    raise ValueError(f"Campo {campo!r}: formate o valor antes; o modelo só aceita {{nome}}.")
+                partes.append("%s")
+                campos.append(campo)
+        self.texto = texto
+        self.campos = tuple(campos)
+        self._formato = "".join(partes)
+
+    def renderizar(self, valores):
+        """Documento de um dict campo -> valor (KeyError se faltar campo)."""
+        return self._formato % tuple(valores[campo] for campo in self.campos)
+
+    def renderizar_lote(self, colunas):
+        """Documentos de colunas campo -> sequência de valores, um por linha (gerador)."""
+        formato = self._formato
+        for linha in zip(*(colunas[campo] for campo in self.campos)):
+            yield formato % linha
+
+
+MODELO_RESUMO_TXT = Modelo("""\
+--- RESUMO DA SIMULAÇÃO SOLAR (SolarSim) ---
+
+Localização: {cidade}
+Consumo Mensal Base: {consumo} kWh
+Tarifa Considerada: {tarifa} / kWh
+Taxa Mínima (Conexão): {minimo_kwh} kWh
+---------------------------------------------
+INVESTIMENTO
+---------------------------------------------
+Investimento Total: {custo_final}
+Retorno (Payback): {payback}
+Economia Mensal Bruta: {economia_mensal}
+
+---------------------------------------------
+DETALHES DO SISTEMA
+---------------------------------------------
+Potência do Sistema: {potencia_kwp} kWp
+Inversor Recomendado: ~{inversor_kw} kW
+Quantidade de Painéis: {numero_paineis}
+Área Mínima: {area_m2} m²
+
+---------------------------------------------
+NOVA REALIDADE (PÓS-INSTALAÇÃO)
+---------------------------------------------
+Geração Mensal Estimada: {geracao_mensal} kWh
+{rotulo_saldo}: {saldo_kwh} kWh
+{rotulo_fatura}: {nova_fatura}
+
+---------------------------------------------
+IMPACTO AMBIENTAL
+---------------------------------------------
+CO₂ evitado por ano: {co2_kg} kg
+Equivalente a: {arvores} árvores plantadas
+""")
+
+# Página única, sem recursos externos: abre em qualquer navegador e imprime em PDF
+MODELO_PROPOSTA_HTML = Modelo("""\
+<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Proposta SolarSim {numero}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 42em; margin: 2em auto; color: #222; }}
+h1 {{ font-size: 1.5em; }} h2 {{ font-size: 1.1em; border-bottom: 1px solid #ccc; }}
+td {{ padding: 0.2em 1em 0.2em 0; }} td + td {{ text-align: right; font-weight: bold; }}
+</style>
+</head>
+<body>
+<h1>☀️ Proposta de Energia Solar nº {numero}</h1>
+<p>{cidade} · consumo de {consumo} kWh/mês · tarifa de {tarifa}/kWh · taxa mínima de {minimo_kwh} kWh</p>
+<h2>Investimento</h2>
+<table>
+<tr><td>Investimento Total</td><td>{custo_final}</td></tr>
+<tr><td>Retorno (Payback)</td><td>{payback}</td></tr>
+<tr><td>Economia Mensal Bruta</td><td>{economia_mensal}</td></tr>
+</table>
+<h2>Sistema</h2>
+<table>
+<tr><td>Potência</td><td>{potencia_kwp} kWp</td></tr>
+<tr><td>Inversor Recomendado</td><td>~{inversor_kw} kW</td></tr>
+<tr><td>Painéis</td><td>{numero_paineis}</td></tr>
+<tr><td>Área Mínima</td><td>{area_m2} m²</td></tr>
+</table>
+<h2>Depois da Instalação</h2>
+<table>
+<tr><td>Geração Mensal Estimada</td><td>{geracao_mensal} kWh</td></tr>
+<tr><td>{rotulo_saldo}</td><td>{saldo_kwh} kWh</td></tr>
+<tr><td>{rotulo_fatura}</td><td>{nova_fatura}</td></tr>
+<tr><td>CO₂ evitado por ano</td><td>{co2_kg} kg ({arvores} árvores)</td></tr>
+</table>
+</body>
+</html>
+""")
@@ -0,0 +1,125 @@
+"""Modo Monte Carlo: faixas de incerteza (P10/P50/P90) de uma proposta.
+
+O sistema é dimensionado uma vez com os valores nominais (como na página);
+depois HSP, TAXA_DESEMPENHO, tarifa e custo do Wp são sorteados de
+distribuições configuráveis e a geração, a economia e o payback são
+recalculados para todas as amostras de uma vez, em NumPy.
+
+Os percentis seguem a convenção estatística: "p10" é o valor que só 10% das
+amostras ficam abaixo. Para geração, o "P90" de mercado (valor superado em
+90% dos casos) é, portanto, o "p10" daqui.
+
+Com a mesma semente o resultado é sempre o mesmo, inclusive no lote em
+vários processos: cada proposta recebe sua própria semente derivada.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from solarsim.calculos import (
+    CUSTO_WP_CAPITAIS,
+    POTENCIA_PAINEL_WP,
+    TAXA_DESEMPENHO,
+    calcular_sistema_solar,
+)
+
+N_AMOSTRAS = 100_000
+PERCENTIS = (10, 50, 90)
+
+# Cada distribuição é relativa ao valor nominal (multiplicador):
+#   ("normal", desvio)                 média 1
+#   ("lognormal", sigma)               mediana 1
+#   ("uniforme", minimo, maximo)
+#   ("triangular", minimo, moda, maximo)
+DISTRIBUICOES_PADRAO = {
+    "hsp": ("normal", 0.06),
+    "taxa_desempenho": ("triangular", 0.90, 1.00, 1.05),
+    "tarifa": ("lognormal", 0.08),
+    "custo_wp": ("uniforme", 0.90, 1.15),
+}
+
+
+def _sortear(distribuicao, n_amostras, rng):
+    """Sorteia multiplicadores para uma distribuição (tipo, parâmetros...)."""
+    tipo, *parametros = distribuicao
+    if tipo == "normal":
+        return np.maximum(rng.normal(1.0, parametros[0], n_amostras), 0.0)
+    if tipo == "lognormal":
+        return rng.lognormal(0.0, parametros[0], n_amostras)
+    if tipo == "uniforme":
+        return rng.uniform(parametros[0], parametros[1], n_amostras)
+    if tipo == "triangular":
+        return rng.triangular(parametros[0], parametros[1], parametros[2], n_amostras)
+    if tipo == "fixo":
+        return np.ones(n_amostras)
+    raise ValueError(f"Distribuição desconhecida: {tipo!r}")
+
+
+def _percentis(valores):
+    return {f"p{p}": float(v) for p, v in zip(PERCENTIS, np.percentile(valores, PERCENTIS, method="inverted_cdf"))}
+
+
+def simular_monte_carlo(consumo, tarifa, hsp, custo_wp, orcamento=None,
+                        n_amostras=N_AMOSTRAS, semente=0, distribuicoes=None):
+    """P10/P50/P90 de geracao_mensal, economia_mensal_reais e payback (anos).
+
+    `distribuicoes` sobrepõe entradas de DISTRIBUICOES_PADRAO; use ("fixo",)
+    para não sortear um parâmetro. `semente` pode ser um int ou um
+    np.random.SeedSequence.
+    """
+    distribuicoes = {**DISTRIBUICOES_PADRAO, **(distribuicoes or {})}
+    rng = np.random.default_rng(semente)
+
+    # A potência instalada é a da proposta nominal; o que varia é o ambiente
+    if orcamento is not None:
+        potencia_wp = orcamento / custo_wp
+    else:
+        potencia_wp = calcular_sistema_solar(consumo, tarifa, hsp, custo_wp)["numero_paineis"] * POTENCIA_PAINEL_WP
+
+    # Ordem fixa dos sorteios, para a semente reproduzir o mesmo resultado
+    hsp_s = hsp * _sortear(distribuicoes["hsp"], n_amostras, rng)
+    taxa_s = TAXA_DESEMPENHO * _sortear(distribuicoes["taxa_desempenho"], n_amostras, rng)
+    tarifa_s = tarifa * _sortear(distribuicoes["tarifa"], n_amostras, rng)
+    custo_wp_s = custo_wp * _sortear(distribuicoes["custo_wp"], n_amostras, rng)
+
+    geracao_mensal = potencia_wp / 1000 * hsp_s * taxa_s * 30
+    economia_mensal = np.minimum(geracao_mensal, consumo) * tarifa_s
+    custo = np.full(n_amostras, float(orcamento)) if orcamento is not None else potencia_wp * custo_wp_s
+    with np.errstate(divide="ignore"):
+        payback_anos = np.where(economia_mensal > 0, custo / (economia_mensal * 12), np.inf)
+
+    return {
+        "n_amostras": n_amostras,
+        "geracao_mensal": _percentis(geracao_mensal),
+        "economia_mensal_reais": _percentis(economia_mensal),
+        "payback_anos": _percentis(payback_anos),
+    }
+
+
+def monte_carlo_da_simulacao(R, **parametros):
+    """Monte Carlo de um resultado de simular() (mesma cidade, modo e orçamento)."""
+    return simular_monte_carlo(
+        R["consumo"], R["tarifa"], R["hsp"], CUSTO_WP_CAPITAIS[R["cidade"]], R.get("orcamento"), **parametros
+    )
+
+
+def _simular_proposta(argumentos):
+    proposta, n_amostras, semente, distribuicoes = argumentos
+    return simular_monte_carlo(**proposta, n_amostras=n_amostras, semente=semente, distribuicoes=distribuicoes)
+
+
+def simular_monte_carlo_lote(propostas, n_amostras=N_AMOSTRAS, semente=0, distribuicoes=None, processos=None):
+    """Monte Carlo de várias propostas, opcionalmente em um pool de processos.
+
+    `propostas` é uma lista de dicts com os argumentos de simular_monte_carlo
+    (consumo, tarifa, hsp, custo_wp e, se houver, orcamento). O resultado não
+    depende do número de processos.
+    """
+    sementes = np.random.SeedSequence(semente).spawn(len(propostas))
+    tarefas = [(proposta, n_amostras, s, distribuicoes) for proposta, s in zip(propostas, sementes)]
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(tarefas) < 2:
+        return [_simular_proposta(tarefa) for tarefa in tarefas]
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        return list(pool.map(_simular_proposta, tarefas, chunksize=max(1, len(tarefas) // (4 * processos))))
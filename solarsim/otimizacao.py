@@ -0,0 +1,153 @@
+"""Otimização do tamanho do sistema: nº de painéis com maior VPL ou menor payback.
+
+Além dos dois caminhos da página (dimensionar pelo consumo ou pelo
+orçamento), procura o número de painéis — e portanto o orçamento — que
+maximiza o VPL do fluxo de caixa de 25 anos (solarsim.fluxo_caixa) ou que
+minimiza o payback.
+
+Com custo proporcional à potência, o VPL é côncavo no número de painéis:
+cada painel a mais vale o mesmo até a geração passar do consumo acima da
+taxa mínima, e daí em diante vira crédito que expira. Então o ótimo é o
+primeiro n em que o ganho marginal VPL(n + 1) - VPL(n) deixa de ser
+positivo, encontrado por bisseção. Já o payback não diminui com n: o ótimo
+é o maior n que ainda tem o payback mínimo (o de 1 painel), também por
+bisseção. A busca nunca passa do tamanho que cobre o consumo acima da taxa
+mínima (30/50/100 kWh) no mês de menor geração: além dele o fluxo de caixa
+ainda mostra um ganho pequeno (o autoconsumo simultâneo é uma fração fixa
+da geração), mas a energia a mais só vira crédito sobrando.
+
+Todos os leads avançam juntos: cada passo da bisseção é uma única chamada
+vetorizada de calcular_fluxo_caixa, em blocos para limitar a memória.
+"""
+import numpy as np
+
+from solarsim.calculos import (
+    CUSTO_WP_CAPITAIS,
+    FATOR_SAZONAL,
+    POTENCIA_PAINEL_WP,
+    TAXA_DESEMPENHO,
+)
+from solarsim.fluxo_caixa import calcular_fluxo_caixa
+
+OBJETIVOS = ("vpl", "payback")
+
+# Leads por chamada de calcular_fluxo_caixa (cada um vira 2 cenários por passo)
+_LEADS_POR_BLOCO = 4096
+
+
+def limite_paineis(consumo_kwh, minimo_kwh, hsp, taxa_desempenho=TAXA_DESEMPENHO):
+    """Maior nº de painéis que ainda pode ser útil para cada lead.
+
+    Acima dele a geração passa do consumo compensável (consumo - taxa
+    mínima) em todos os meses, inclusive no de menor geração.
+    """
+    geracao_painel = POTENCIA_PAINEL_WP / 1000 * np.asarray(hsp) * taxa_desempenho * 30 * min(FATOR_SAZONAL)
+    compensavel = np.maximum(np.asarray(consumo_kwh, dtype=np.float64) - minimo_kwh, 0.0)
+    return np.maximum(np.ceil(compensavel / geracao_painel), 1).astype(np.int64) + 1
+
+
+def _avaliar(paineis, consumo_kwh, tarifa, hsp, custo_wp, minimo_kwh, parametros, calcular_tir=False):
+    potencia_wp = paineis * POTENCIA_PAINEL_WP
+    geracao = potencia_wp / 1000 * hsp * TAXA_DESEMPENHO * 30
+    return calcular_fluxo_caixa(potencia_wp * custo_wp, geracao, consumo_kwh, tarifa, minimo_kwh,
+                                calcular_tir=calcular_tir, **parametros)
+
+
+def _bissecao(baixo, alto, continuar):
+    """Menor n em [baixo, alto] com continuar(n) falso (alto se nunca), vetorizado.
+
+    `continuar(linhas, n)` avalia só as linhas ainda em aberto.
+    """
+    baixo, alto = baixo.copy(), alto.copy()
+    while True:
+        abertas = np.flatnonzero(baixo < alto)
+        if not abertas.size:
+            return baixo
+        meio = (baixo[abertas] + alto[abertas]) // 2
+        segue = continuar(abertas, meio)
+        baixo[abertas] = np.where(segue, meio + 1, baixo[abertas])
+        alto[abertas] = np.where(segue, alto[abertas], meio)
+
+
+def _otimizar_bloco(consumo_kwh, tarifa, hsp, custo_wp, minimo_kwh, objetivo, orcamento_maximo, parametros):
+    alto = limite_paineis(consumo_kwh, minimo_kwh, hsp)
+    if orcamento_maximo is not None:
+        # Orçamento menor que um painel: alto = 0, nenhum sistema viável
+        cabe = np.floor(orcamento_maximo / (POTENCIA_PAINEL_WP * custo_wp))
+        alto = np.maximum(np.minimum(alto, cabe), 0).astype(np.int64)
+    # Pelo VPL, 0 painéis (não instalar) é uma resposta possível; o payback exige um sistema
+    baixo = np.minimum(np.full_like(alto, 0 if objetivo == "vpl" else 1), alto)
+
+    def entrada(linhas):
+        return consumo_kwh[linhas], tarifa[linhas], hsp[linhas], custo_wp[linhas], minimo_kwh[linhas]
+
+    if objetivo == "vpl":
+        def continuar(linhas, n):
+            # VPL de n e de n + 1 numa chamada só
+            c, t, h, w, m = (np.concatenate([v, v]) for v in entrada(linhas))
+            vpl = _avaliar(np.concatenate([n, n + 1]), c, t, h, w, m, parametros)["vpl"]
+            return vpl[len(n):] - vpl[:len(n)] > 0
+    else:
+        payback_minimo = _avaliar(baixo, *entrada(slice(None)), parametros)["payback_meses"]
+        payback_minimo = np.where(np.isnan(payback_minimo), np.inf, payback_minimo)
+
+        def continuar(linhas, n):
+            # Ainda no payback mínimo com n + 1 painéis: vale subir
+            payback = _avaliar(n + 1, *entrada(linhas), parametros)["payback_meses"]
+            return payback <= payback_minimo[linhas]
+
+    paineis = _bissecao(baixo, alto, continuar)
+    # A TIR só é calculada no fim, para o tamanho escolhido
+    resultado = _avaliar(paineis, consumo_kwh, tarifa, hsp, custo_wp, minimo_kwh, parametros, calcular_tir=True)
+    sem_sistema = paineis == 0
+    resultado["payback_meses"][sem_sistema] = np.nan
+    resultado["tir_anual"][sem_sistema] = np.nan
+    potencia_wp = paineis * POTENCIA_PAINEL_WP
+    return {
+        "numero_paineis": paineis,
+        "potencia_kwp": potencia_wp / 1000,
+        "orcamento": potencia_wp * custo_wp,
+        "geracao_mensal": potencia_wp / 1000 * hsp * TAXA_DESEMPENHO * 30,
+        "vpl": resultado["vpl"],
+        "payback_meses": resultado["payback_meses"],
+        "tir_anual": resultado["tir_anual"],
+    }
+
+
+def otimizar_sistema(consumo_kwh, tarifa, hsp, custo_wp, minimo_kwh, objetivo="vpl",
+                     orcamento_maximo=None, **parametros):
+    """Nº de painéis ótimo de cada lead (arrays ou escalares de mesmo formato).
+
+    `objetivo` é "vpl" (maior VPL) ou "payback" (menor payback; entre os
+    empatados, o maior sistema). `orcamento_maximo` limita o investimento;
+    `parametros` vão para calcular_fluxo_caixa (ano_inicio, taxa de
+    desconto...). Devolve arrays (n,): numero_paineis (0 quando nenhum
+    tamanho tem VPL positivo ou o orçamento não paga um painel),
+    potencia_kwp, orcamento, geracao_mensal, vpl, payback_meses e tir_anual.
+    """
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo desconhecido: {objetivo!r} (use {' ou '.join(OBJETIVOS)}).")
+    consumo_kwh, tarifa, hsp, custo_wp, minimo_kwh = (
+        np.ravel(v) for v in np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (
+            consumo_kwh, tarifa, hsp, custo_wp, minimo_kwh)))
+    )
+    if orcamento_maximo is not None:
+        orcamento_maximo = np.broadcast_to(np.asarray(orcamento_maximo, dtype=np.float64), consumo_kwh.shape)
+
+    blocos = []
+    for inicio in range(0, len(consumo_kwh), _LEADS_POR_BLOCO):
+        fatia = slice(inicio, inicio + _LEADS_POR_BLOCO)
+        blocos.append(_otimizar_bloco(
+            consumo_kwh[fatia], tarifa[fatia], hsp[fatia], custo_wp[fatia], minimo_kwh[fatia], objetivo,
+            None if orcamento_maximo is None else orcamento_maximo[fatia], parametros
+        ))
+    return {chave: np.concatenate([bloco[chave] for bloco in blocos]) for chave in blocos[0]}
+
+
+def otimizar_simulacao(R, objetivo="vpl", **parametros):
+    """Sistema ótimo para um resultado de simular(), como floats (serializável)."""
+    resultado = otimizar_sistema(
+        R["consumo"], R["tarifa"], R["hsp"], CUSTO_WP_CAPITAIS[R["cidade"]], R["minimo_kwh"], objetivo,
+        R.get("orcamento"), **parametros
+    )
+    return {chave: float(valor[0]) for chave, valor in resultado.items()}
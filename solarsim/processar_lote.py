@@ -0,0 +1,244 @@
+"""Processamento em massa de contas de luz: CSV -> propostas em Parquet/CSV/ZIP.
+
+Lê o CSV em blocos (memória limitada), simula cada bloco em um pool de
+processos com o mesmo fluxo do botão "Simular" e grava os resultados de
+forma incremental, na ordem de entrada. Uso:
+
+    python -m solarsim.processar_lote contas.csv propostas.parquet
+
+Colunas esperadas no CSV:
+    consumo_kwh        consumo médio mensal
+    tarifa_*           componentes TE/TUSD, somados como no tarifas_list
+    tipo_conexao       Monofásica/Bifásica/Trifásica (ou 1/2/3 fases)
+    orcamento          opcional; vazio = dimensionar pelo consumo
+    cidade             opcional; padrão definido por --cidade
+    latitude/longitude opcionais; com --grade-hsp, o HSP vem da grade
+                       (e o custo do Wp de --custos-wp, se informado)
+    telhado            opcional; águas do telhado em JSON (solarsim.telhado),
+                       acrescenta paineis_cabem_telhado e cabe_no_telhado
+
+Os prazos saem em meses corridos: payback_simples_meses (investimento /
+economia, NaN se não se paga) e, com --otimizar vpl|payback, as colunas
+otimo_* (otimo_payback_meses vem do fluxo de caixa) com o tamanho de maior
+VPL ou menor payback (solarsim.otimizacao). Com uma
+saída .zip, grava os documentos das propostas (TXT, HTML e o CSV da
+campanha, ver solarsim.relatorios) em vez da tabela.
+"""
+import argparse
+import collections
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from solarsim.calculos import CUSTO_WP_CAPITAIS, HSP_CAPITAIS
+from solarsim.localizacao import carregar_custos_wp, carregar_grade
+from solarsim.lote import minimo_kwh_por_conexao_lote, simular_lote
+from solarsim.otimizacao import OBJETIVOS, otimizar_sistema
+from solarsim.telhado import capacidade_lote, ler_telhado
+
+CIDADE_PADRAO = "Rio das Ostras (RJ)"
+
+# Nome das colunas de saída para cada item de custos_detalhados
+COLUNAS_CUSTOS = {
+    "Painéis Fotovoltaicos": "custo_paineis",
+    "Inversor(es)": "custo_inversores",
+    "Estruturas, Cabos e Proteções": "custo_estruturas",
+    "Mão de Obra e Projeto": "custo_mao_de_obra"
+}
+
+
+def simular_bloco(bloco, cidade_padrao=CIDADE_PADRAO, grade_hsp=None, custos_wp=None, otimizar=None):
+    """Simula um bloco (DataFrame) de contas e devolve o DataFrame de propostas.
+
+    `grade_hsp` e `custos_wp` são caminhos de arquivos de solarsim.localizacao;
+    são usados nas linhas com latitude/longitude. Com `otimizar` ("vpl" ou
+    "payback"), acrescenta as colunas otimo_* (o orçamento da linha, se
+    houver, limita o tamanho ótimo).
+    """
+    colunas_tarifa = [c for c in bloco.columns if c.startswith("tarifa_")]
+    if not colunas_tarifa:
+        raise ValueError("O CSV precisa de ao menos uma coluna tarifa_* (TE/TUSD).")
+
+    consumo = bloco["consumo_kwh"].to_numpy(dtype=np.float64)
+    tarifa = bloco[colunas_tarifa].fillna(0.0).to_numpy(dtype=np.float64).sum(axis=1)
+
+    if "tipo_conexao" in bloco.columns:
+        minimo = minimo_kwh_por_conexao_lote(bloco["tipo_conexao"].fillna("").to_numpy())
+    else:
+        minimo = np.full(len(bloco), 50, dtype=np.int64)
+
+    if "cidade" in bloco.columns:
+        cidades = bloco["cidade"].fillna(cidade_padrao)
+    else:
+        cidades = pd.Series(cidade_padrao, index=bloco.index)
+    hsp = cidades.map(HSP_CAPITAIS).to_numpy(dtype=np.float64, copy=True)
+    custo_wp = cidades.map(CUSTO_WP_CAPITAIS).to_numpy(dtype=np.float64, copy=True)
+    if grade_hsp and {"latitude", "longitude"} <= set(bloco.columns):
+        latitude = bloco["latitude"].to_numpy(dtype=np.float64)
+        longitude = bloco["longitude"].to_numpy(dtype=np.float64)
+        com_coordenadas = ~(np.isnan(latitude) | np.isnan(longitude))
+        if com_coordenadas.any():
+            hsp[com_coordenadas] = carregar_grade(grade_hsp).hsp_interpolado(
+                latitude[com_coordenadas], longitude[com_coordenadas]
+            )
+            if custos_wp:
+                custo_wp[com_coordenadas] = carregar_custos_wp(custos_wp).consultar(
+                    latitude[com_coordenadas], longitude[com_coordenadas]
+                )
+    if np.isnan(hsp).any() or np.isnan(custo_wp).any():
+        desconhecidas = sorted(set(cidades[np.isnan(hsp) | np.isnan(custo_wp)]))
+        raise ValueError(f"Cidades sem HSP ou custo do Wp cadastrado: {', '.join(map(str, desconhecidas))}")
+
+    orcamento = None
+    if "orcamento" in bloco.columns:
+        orcamento = pd.to_numeric(bloco["orcamento"], errors="coerce").to_numpy(dtype=np.float64)
+
+    dados = simular_lote(consumo, tarifa, minimo, hsp, custo_wp, orcamento)
+    custos = dados.pop("custos_detalhados")
+
+    saida = pd.DataFrame({
+        "consumo_kwh": consumo,
+        "tarifa": tarifa,
+        "cidade": cidades.to_numpy(),
+        **dados,
+        **{COLUNAS_CUSTOS[item]: valores for item, valores in custos.items()}
+    }, index=bloco.index)
+    if otimizar:
+        otimo = otimizar_sistema(consumo, tarifa, hsp, custo_wp, minimo, otimizar,
+                                 None if orcamento is None else np.where(np.isnan(orcamento), np.inf, orcamento))
+        for chave in ("numero_paineis", "orcamento", "vpl", "payback_meses", "tir_anual"):
+            saida[f"otimo_{chave}"] = otimo[chave]
+    if "telhado" in bloco.columns:
+        com_telhado = bloco["telhado"].notna().to_numpy()
+        capacidade = pd.array([pd.NA] * len(bloco), dtype="Int64")
+        capacidade[com_telhado] = capacidade_lote([ler_telhado(t) for t in bloco["telhado"][com_telhado]])
+        saida["paineis_cabem_telhado"] = capacidade
+        saida["cabe_no_telhado"] = capacidade >= saida["numero_paineis"].to_numpy()
+    return saida
+
+
+class _EscritorParquet:
+    """Grava blocos num único arquivo Parquet (requer pyarrow)."""
+
+    def __init__(self, caminho):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Saída Parquet requer o pacote pyarrow (pip install pyarrow) ou use um .csv.")
+        self._pa = pa
+        self._pq = pq
+        self._caminho = caminho
+        self._escritor = None
+
+    def escrever(self, df):
+        tabela = self._pa.Table.from_pandas(df, preserve_index=False)
+        if self._escritor is None:
+            self._escritor = self._pq.ParquetWriter(self._caminho, tabela.schema)
+        self._escritor.write_table(tabela)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+class _EscritorCSV:
+    """Grava blocos num CSV, com cabeçalho só no primeiro bloco."""
+
+    def __init__(self, caminho):
+        self._caminho = caminho
+        self._primeiro = True
+
+    def escrever(self, df):
+        df.to_csv(self._caminho, mode="w" if self._primeiro else "a", header=self._primeiro, index=False)
+        self._primeiro = False
+
+    def fechar(self):
+        pass
+
+
+def _criar_escritor(caminho, formatos=None):
+    if caminho.lower().endswith(".zip"):
+        from solarsim.relatorios import FORMATOS, EscritorZip
+
+        return EscritorZip(caminho, formatos or FORMATOS)
+    if caminho.lower().endswith(".parquet"):
+        return _EscritorParquet(caminho)
+    return _EscritorCSV(caminho)
+
+
+def processar_arquivo(entrada, saida, tamanho_bloco=100_000, processos=None,
+                      cidade_padrao=CIDADE_PADRAO, grade_hsp=None, custos_wp=None,
+                      progresso=sys.stderr, otimizar=None, formatos=None):
+    """Processa o CSV de entrada e grava as propostas; devolve o nº de linhas.
+
+    `formatos` (txt, html, csv) vale só para saída .zip.
+    """
+    processos = processos or os.cpu_count() or 1
+    escritor = _criar_escritor(saida, formatos)
+    leitor = pd.read_csv(entrada, chunksize=tamanho_bloco)
+    # Limita os blocos em voo para a memória não crescer com o tamanho do arquivo
+    max_em_voo = 2 * processos
+    pendentes = collections.deque()
+    linhas = 0
+    inicio = time.perf_counter()
+
+    def gravar(resultado):
+        nonlocal linhas
+        escritor.escrever(resultado)
+        linhas += len(resultado)
+        if progresso is not None:
+            decorrido = time.perf_counter() - inicio
+            print(f"{linhas:,} linhas | {linhas / decorrido:,.0f} linhas/s", file=progresso, flush=True)
+
+    def gravar_proximo():
+        gravar(pendentes.popleft().result())
+
+    try:
+        if processos == 1:
+            for bloco in leitor:
+                gravar(simular_bloco(bloco, cidade_padrao, grade_hsp, custos_wp, otimizar))
+        else:
+            with ProcessPoolExecutor(max_workers=processos) as pool:
+                for bloco in leitor:
+                    pendentes.append(pool.submit(simular_bloco, bloco, cidade_padrao, grade_hsp, custos_wp, otimizar))
+                    if len(pendentes) >= max_em_voo:
+                        gravar_proximo()
+                while pendentes:
+                    gravar_proximo()
+    finally:
+        escritor.fechar()
+    return linhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m solarsim.processar_lote",
+        description="Gera propostas SolarSim em massa a partir de um CSV de contas de luz."
+    )
+    parser.add_argument("entrada", help="CSV de contas (consumo_kwh, tarifa_*, tipo_conexao, orcamento)")
+    parser.add_argument("saida", help="arquivo de saída .parquet, .csv ou .zip (documentos das propostas)")
+    parser.add_argument("--bloco", type=int, default=100_000, help="linhas por bloco (padrão: 100000)")
+    parser.add_argument("--processos", type=int, default=None, help="processos no pool (padrão: nº de núcleos)")
+    parser.add_argument("--cidade", default=CIDADE_PADRAO, help="cidade para linhas sem a coluna cidade")
+    parser.add_argument("--grade-hsp", help="grade de irradiação CRESESB/Atlas (CSV) para linhas com lat/lon")
+    parser.add_argument("--custos-wp", help="tabela regional de custo do Wp (CSV com LAT, LON, CUSTO_WP)")
+    parser.add_argument("--otimizar", choices=OBJETIVOS,
+                        help="acrescenta o tamanho ótimo por VPL ou payback (colunas otimo_*)")
+    parser.add_argument("--formatos", type=lambda texto: tuple(filter(None, texto.split(","))),
+                        help="documentos da saída .zip, separados por vírgula (padrão: txt,html,csv)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    linhas = processar_arquivo(args.entrada, args.saida, args.bloco, args.processos, args.cidade,
+                               args.grade_hsp, args.custos_wp, otimizar=args.otimizar, formatos=args.formatos)
+    decorrido = time.perf_counter() - inicio
+    print(f"Concluído: {linhas:,} linhas em {decorrido:.1f}s -> {args.saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
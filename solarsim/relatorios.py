@@ -0,0 +1,172 @@
+"""Propostas em massa: TXT, HTML e CSV de uma campanha inteira num ZIP.
+
+Cada bloco de propostas (o DataFrame de processar_lote.simular_bloco) vira
+colunas de texto de uma vez (campos_resumo_lote): moeda, números e rótulos
+são formatados com operações de NumPy sobre a coluna inteira, sem
+locale.currency nem try/except por valor. Os documentos saem dos modelos
+pré-compilados de solarsim.modelos, os mesmos de gerar_resumo_txt.
+
+EscritorZip grava cada documento no ZIP assim que é renderizado, então a
+memória fica limitada ao bloco em curso (mais o índice do ZIP, algumas
+centenas de bytes por arquivo). O destino pode ser um caminho ou qualquer
+arquivo binário aberto para escrita, inclusive sem seek (ex.: a resposta de
+um servidor HTTP). Pela linha de comando, basta uma saída .zip:
+
+    python -m solarsim.processar_lote contas.csv campanha.zip --formatos txt,html,csv
+"""
+import csv
+import html
+import io
+import shutil
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+
+from solarsim.calculos import formatar_reais
+from solarsim.modelos import MODELO_PROPOSTA_HTML, MODELO_RESUMO_TXT
+
+FORMATOS = ("txt", "html", "csv")
+
+# Colunas do propostas.csv (campos de campos_resumo_lote, já formatados)
+CAMPOS_CSV = (
+    "numero", "cidade", "consumo", "tarifa", "minimo_kwh", "custo_final", "payback", "economia_mensal",
+    "potencia_kwp", "inversor_kw", "numero_paineis", "area_m2", "geracao_mensal", "rotulo_saldo",
+    "saldo_kwh", "rotulo_fatura", "nova_fatura", "co2_kg", "arvores",
+)
+
+
+def formatar_reais_lote(valores):
+    """formatar_reais para um array: R$ X.XXX,XX, o mesmo texto do fallback, sem locale."""
+    valores = np.asarray(valores, dtype=np.float64)
+    absolutos = np.abs(valores)
+    # Fora da faixa de int64 em centavos (ou nan/inf): formatação escalar
+    comuns = np.isfinite(valores) & (absolutos < 1e15)
+    escalados = np.where(comuns, absolutos, 0.0) * 100
+    centavos = np.rint(escalados)
+    # Como em lote._arredondar: perto de ,5 centavo o rint pode divergir do format
+    suspeitos = np.flatnonzero(np.abs(escalados % 1.0 - 0.5) < 1e-6)
+    for i in suspeitos:
+        centavos.flat[i] = int(f"{absolutos.flat[i]:.2f}".replace(".", ""))
+    reais, resto = np.divmod(centavos.astype(np.int64), 100)
+
+    # Milhares: o grupo mais alto sem zeros à esquerda, os demais com três dígitos
+    grupos = np.maximum(1, (np.char.str_len(reais.astype(str)) + 2) // 3)
+    inteiro = (reais // 1000 ** (grupos - 1)).astype(str).astype("U32")
+    for k in range(int(grupos.max(initial=1)) - 1, 0, -1):
+        mais = grupos > k
+        grupo = np.char.zfill(((reais[mais] // 1000 ** (k - 1)) % 1000).astype(str), 3)
+        inteiro[mais] = np.char.add(np.char.add(inteiro[mais], "."), grupo)
+
+    sinal = np.where(np.signbit(valores), "R$ -", "R$ ")
+    texto = np.char.add(np.char.add(np.char.add(sinal, inteiro), ","), np.char.zfill(resto.astype(str), 2))
+    if not comuns.all():
+        texto = texto.astype(object)
+        for i in np.flatnonzero(~comuns):
+            texto.flat[i] = formatar_reais(float(valores.flat[i]))
+    return texto
+
+
+def _texto_numero(valores):
+    """str() de cada valor, com inteiros sem ".0" (o consumo do CSV chega como float)."""
+    valores = np.asarray(valores)
+    if valores.dtype.kind in "iu":
+        return valores.astype(str)
+    texto = valores.astype(str)
+    inteiros = np.isfinite(valores) & (valores == np.trunc(valores)) & (np.abs(valores) < 1e15)
+    texto[inteiros] = valores[inteiros].astype(np.int64).astype(str)
+    return texto
+
+
+def campos_resumo_lote(propostas):
+    """Versão em lote de calculos.campos_resumo: campo -> lista de textos.
+
+    `propostas` é o DataFrame (ou dict de colunas) de simular_bloco.
+    """
+    saldo = np.asarray(propostas["saldo_kwh"], dtype=np.float64)
+    credito = saldo >= 0
+    co2 = np.asarray(propostas["co2_evitado_kg"], dtype=np.float64)
+    colunas = {
+        "cidade": np.asarray(propostas["cidade"], dtype=object).astype(str),
+        "consumo": _texto_numero(propostas["consumo_kwh"]),
+        "tarifa": formatar_reais_lote(propostas["tarifa"]),
+        "minimo_kwh": _texto_numero(propostas["minimo_kwh"]),
+        "custo_final": formatar_reais_lote(propostas["custo_final"]),
+        "payback": np.asarray(propostas["payback"]),
+        "economia_mensal": formatar_reais_lote(propostas["economia_mensal_reais"]),
+        "potencia_kwp": np.asarray(propostas["potencia_kwp"]).astype(str),
+        "inversor_kw": np.asarray(propostas["inversor_kw_recomendado"]).astype(str),
+        "numero_paineis": _texto_numero(propostas["numero_paineis"]),
+        "area_m2": np.asarray(propostas["area_m2"]).astype(str),
+        "geracao_mensal": np.char.mod("%.0f", np.asarray(propostas["geracao_mensal"], dtype=np.float64)),
+        "rotulo_saldo": np.where(credito, "Créditos Gerados", "Consumo restante da Rede"),
+        "saldo_kwh": np.char.mod("%.0f", np.where(credito, saldo, np.abs(saldo))),
+        "rotulo_fatura": np.where(credito, "Nova Fatura (Taxa Mínima)", "Nova Fatura Estimada"),
+        "nova_fatura": formatar_reais_lote(propostas["nova_fatura"]),
+        "co2_kg": np.char.mod("%.0f", co2),
+        "arvores": np.char.mod("%.0f", co2 / 150),
+    }
+    # Listas de str: o operador % dos modelos é bem mais rápido com str do que com np.str_
+    return {campo: valores.tolist() for campo, valores in colunas.items()}
+
+
+class EscritorZip:
+    """Grava blocos de propostas num ZIP: txt/ e html/ com um arquivo por proposta e propostas.csv.
+
+    Mesma interface dos escritores de processar_lote (escrever/fechar). As
+    propostas são numeradas na ordem de chegada, a partir de 1. O CSV da
+    campanha (separador ";", valores no formato brasileiro) vai para um
+    arquivo temporário e entra no ZIP no fechar, porque o ZIP só aceita um
+    membro aberto por vez.
+    """
+
+    def __init__(self, destino, formatos=FORMATOS, compressao=zipfile.ZIP_DEFLATED):
+        desconhecidos = set(formatos) - set(FORMATOS)
+        if desconhecidos:
+            raise ValueError(f"Formatos desconhecidos: {', '.join(sorted(desconhecidos))} "
+                             f"(use {', '.join(FORMATOS)}).")
+        self.formatos = tuple(formatos)
+        self._zip = zipfile.ZipFile(destino, "w", compression=compressao)
+        self._compressao = compressao
+        self._data = time.localtime()[:6]
+        self.propostas = 0
+        self._csv = None
+        if "csv" in self.formatos:
+            self._csv = io.TextIOWrapper(tempfile.SpooledTemporaryFile(max_size=8 << 20),
+                                         encoding="utf-8", newline="")
+            self._escritor_csv = csv.writer(self._csv, delimiter=";")
+            self._escritor_csv.writerow(CAMPOS_CSV)
+
+    def _gravar(self, nome, texto):
+        info = zipfile.ZipInfo(nome, date_time=self._data)
+        info.compress_type = self._compressao
+        self._zip.writestr(info, texto.encode("utf-8"))
+
+    def escrever(self, propostas):
+        campos = campos_resumo_lote(propostas)
+        campos["numero"] = [str(n) for n in range(self.propostas + 1, self.propostas + len(propostas) + 1)]
+        if "txt" in self.formatos:
+            for numero, texto in zip(campos["numero"], MODELO_RESUMO_TXT.renderizar_lote(campos)):
+                self._gravar(f"txt/proposta_{numero:0>7}.txt", texto)
+        if "html" in self.formatos:
+            escapados = {**campos, "cidade": [html.escape(c) for c in campos["cidade"]]}
+            for numero, texto in zip(campos["numero"], MODELO_PROPOSTA_HTML.renderizar_lote(escapados)):
+                self._gravar(f"html/proposta_{numero:0>7}.html", texto)
+        if self._csv is not None:
+            self._escritor_csv.writerows(zip(*(campos[c] for c in CAMPOS_CSV)))
+        self.propostas += len(propostas)
+
+    def fechar(self):
+        try:
+            if self._csv is not None:
+                self._csv.flush()
+                bruto = self._csv.buffer
+                bruto.seek(0)
+                info = zipfile.ZipInfo("propostas.csv", date_time=self._data)
+                info.compress_type = self._compressao
+                with self._zip.open(info, "w") as membro:
+                    shutil.copyfileobj(bruto, membro, 1 << 20)
+                self._csv.close()
+        finally:
+            self._zip.close()
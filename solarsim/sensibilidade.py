@@ -0,0 +1,134 @@
+"""Análise de sensibilidade: "e se a tarifa subir / o consumo crescer?".
+
+Avalia dimensionamento, economia e payback numa grade 2-D de dois
+parâmetros (tarifa × consumo, HSP × custo do Wp) com broadcasting: o eixo x
+entra como linha (1, nx), o eixo y como coluna (ny, 1) e as calculadoras em
+lote de solarsim.lote devolvem a grade inteira numa única chamada.
+
+GradeSensibilidade guarda a última grade calculada. Quando só um eixo muda
+(o usuário mexeu num slider), só as colunas (ou linhas) com valores novos
+são calculadas; as demais são reaproveitadas. Para isso os eixos usam
+valores numa malha fixa (ver valores_eixo), e não um linspace que muda
+inteiro a cada ajuste.
+"""
+import numpy as np
+
+from solarsim.lote import calcular_sistema_por_orcamento_lote, calcular_sistema_solar_lote
+
+EIXOS = {
+    "tarifa": "Tarifa (R$/kWh)",
+    "consumo": "Consumo (kWh/mês)",
+    "hsp": "HSP (kWh/m²·dia)",
+    "custo_wp": "Custo do Wp (R$)",
+}
+PARES = {
+    "tarifa_consumo": ("tarifa", "consumo"),
+    "hsp_custo_wp": ("hsp", "custo_wp"),
+}
+METRICAS = {
+    "payback_anos": "Payback (anos)",
+    "economia_mensal_reais": "Economia Mensal (R$)",
+    "numero_paineis": "Nº de Painéis",
+    "custo_final": "Investimento (R$)",
+}
+
+
+def valores_eixo(minimo, maximo, passo):
+    """Valores de um eixo na malha fixa de `passo` (extremos inclusive)."""
+    inicio = round(minimo / passo)
+    fim = round(maximo / passo)
+    return np.round(np.arange(inicio, fim + 1) * passo, 10)
+
+
+def avaliar_grade(base, eixo_x, valores_x, eixo_y, valores_y, orcamento=None):
+    """Métricas de METRICAS numa grade (ny, nx), numa única chamada vetorizada.
+
+    `base` tem consumo, tarifa, hsp e custo_wp do cenário atual; os dois
+    eixos substituem os respectivos valores. Com `orcamento`, o sistema é o
+    do orçamento; sem ele, é dimensionado pelo consumo de cada célula.
+    """
+    parametros = {chave: np.float64(base[chave]) for chave in EIXOS}
+    parametros[eixo_x] = np.asarray(valores_x, dtype=np.float64)[None, :]
+    parametros[eixo_y] = np.asarray(valores_y, dtype=np.float64)[:, None]
+    if orcamento is None:
+        dados = calcular_sistema_solar_lote(
+            parametros["consumo"], parametros["tarifa"], parametros["hsp"], parametros["custo_wp"]
+        )
+    else:
+        dados = calcular_sistema_por_orcamento_lote(
+            orcamento, parametros["custo_wp"], parametros["consumo"], parametros["tarifa"], parametros["hsp"]
+        )
+    economia = dados["economia_mensal_reais"]
+    custo = dados["custo_total_estimado_site"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payback = np.where(economia > 0, custo / (economia * 12), np.nan)
+    formato = (len(valores_y), len(valores_x))
+    return {
+        "payback_anos": np.broadcast_to(payback, formato),
+        "economia_mensal_reais": np.broadcast_to(economia, formato),
+        "numero_paineis": np.broadcast_to(dados["numero_paineis"], formato),
+        "custo_final": np.broadcast_to(custo, formato),
+    }
+
+
+class GradeSensibilidade:
+    """Grade de sensibilidade de um cenário, recalculada por eixo."""
+
+    def __init__(self, base, eixo_x, eixo_y, orcamento=None):
+        self.base = dict(base)
+        self.eixo_x = eixo_x
+        self.eixo_y = eixo_y
+        self.orcamento = orcamento
+        self.valores_x = np.empty(0)
+        self.valores_y = np.empty(0)
+        self.metricas = None
+        self.celulas_calculadas = 0  # total de células avaliadas desde a criação
+
+    def _avaliar(self, valores_x, valores_y):
+        self.celulas_calculadas += len(valores_x) * len(valores_y)
+        return avaliar_grade(self.base, self.eixo_x, valores_x, self.eixo_y, valores_y, self.orcamento)
+
+    def atualizar(self, valores_x, valores_y):
+        """Métricas (ny, nx) para os eixos dados, reaproveitando o que já foi calculado."""
+        valores_x = np.asarray(valores_x, dtype=np.float64)
+        valores_y = np.asarray(valores_y, dtype=np.float64)
+        mesmo_x = np.array_equal(valores_x, self.valores_x)
+        mesmo_y = np.array_equal(valores_y, self.valores_y)
+        if self.metricas is None or not (mesmo_x or mesmo_y):
+            metricas = self._avaliar(valores_x, valores_y)
+        elif mesmo_x and mesmo_y:
+            return self.metricas
+        elif mesmo_y:
+            metricas = self._combinar(self.valores_x, valores_x, eixo=1,
+                                      calcular=lambda novos: self._avaliar(novos, valores_y))
+        else:
+            metricas = self._combinar(self.valores_y, valores_y, eixo=0,
+                                      calcular=lambda novos: self._avaliar(valores_x, novos))
+        self.valores_x, self.valores_y, self.metricas = valores_x, valores_y, metricas
+        return metricas
+
+    def _combinar(self, antigos, valores, eixo, calcular):
+        """Junta as fatias já calculadas com as dos valores novos ao longo do eixo."""
+        posicao = np.searchsorted(antigos, valores)
+        posicao_valida = np.minimum(posicao, max(len(antigos) - 1, 0))
+        existentes = (posicao < len(antigos)) & np.isclose(antigos[posicao_valida], valores) \
+            if len(antigos) else np.zeros(len(valores), dtype=bool)
+        novos = np.flatnonzero(~existentes)
+        calculadas = calcular(valores[novos]) if novos.size else None
+
+        metricas = {}
+        for chave, anterior in self.metricas.items():
+            formato = list(anterior.shape)
+            formato[eixo] = len(valores)
+            grade = np.empty(formato, dtype=anterior.dtype)
+            destino_antigo = [slice(None)] * 2
+            destino_antigo[eixo] = np.flatnonzero(existentes)
+            origem = [slice(None)] * 2
+            origem[eixo] = posicao_valida[existentes]
+            grade[tuple(destino_antigo)] = anterior[tuple(origem)]
+            if calculadas is not None:
+                destino_novo = [slice(None)] * 2
+                destino_novo[eixo] = novos
+                grade[tuple(destino_novo)] = calculadas[chave]
+            metricas[chave] = grade
+        return metricas
@@ -0,0 +1,205 @@
+"""Tarifas de energia com postos horários, bandeiras e tributos.
+
+Uma tarifa é definida pelas componentes TE (energia) e TUSD (uso da rede),
+em R$/kWh sem tributos. Na modalidade convencional cada componente é um
+valor único; na Tarifa Branca é uma tupla (fora_ponta, intermediario,
+ponta). A bandeira tarifária de cada mês soma à TE, e ICMS/PIS/COFINS são
+cobrados "por dentro": preço = (TE + TUSD + bandeira) / (1 - tributos).
+
+`compilar_tarifa` transforma a definição em uma TabelaTarifaria: o preço
+final de cada uma das 8760 h do ano e uma matriz (8760, 12) com o preço de
+cada hora na coluna do seu mês. A fatura mensal de milhares de clientes é
+então um único produto matricial consumo_horario @ matriz; clientes em
+tarifas diferentes (fatura_mensal_lote) recebem cada um o vetor de preços da
+sua tabela, sem um produto por tabela. As tabelas
+compiladas ficam em cache: clientes da mesma distribuidora compartilham a
+mesma tabela.
+"""
+import functools
+
+import numpy as np
+
+from solarsim.horario import ANO_REFERENCIA, HORAS_ANO, calendario
+
+POSTOS = ("fora_ponta", "intermediario", "ponta")
+FORA_PONTA, INTERMEDIARIO, PONTA = range(3)
+
+# Ponta: 3 h consecutivas definidas pela distribuidora; intermediário: 1 h antes e 1 h depois
+INICIO_PONTA_PADRAO = 18
+HORAS_PONTA = 3
+
+# Feriados nacionais de data fixa (mês, dia): todas as horas são fora de ponta
+FERIADOS_NACIONAIS = ((1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (11, 20), (12, 25))
+
+# Adicional das bandeiras tarifárias (R$/kWh, sem tributos)
+BANDEIRAS = {"verde": 0.0, "amarela": 0.01885, "vermelha_1": 0.04463, "vermelha_2": 0.07877}
+
+ICMS_PADRAO = 0.18
+PIS_PADRAO = 0.0107
+COFINS_PADRAO = 0.0494
+
+# Valores de referência (R$/kWh, sem tributos); atualize pela resolução homologatória da ANEEL
+TARIFAS_DISTRIBUIDORAS = {
+    "Enel RJ": {
+        "convencional": {"te": 0.3311, "tusd": 0.5244},
+        "branca": {"te": (0.3085, 0.3085, 0.5067), "tusd": (0.3592, 0.8190, 1.2815)},
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def postos_horarios(ano=ANO_REFERENCIA, inicio_ponta=INICIO_PONTA_PADRAO, horas_ponta=HORAS_PONTA):
+    """Posto de cada hora do ano (0 fora de ponta, 1 intermediário, 2 ponta).
+
+    Fins de semana e feriados nacionais são inteiramente fora de ponta.
+    """
+    cal = calendario(ano)
+    hora = cal["hora"]
+    posto = np.full(HORAS_ANO, FORA_PONTA, dtype=np.int8)
+    posto[(hora == inicio_ponta - 1) | (hora == inicio_ponta + horas_ponta)] = INTERMEDIARIO
+    posto[(hora >= inicio_ponta) & (hora < inicio_ponta + horas_ponta)] = PONTA
+
+    dias = np.datetime64(f"{ano}-01-01") + np.arange(cal["dia_do_ano"][-1] + 1)
+    feriados = np.array([f"{ano}-{mes:02d}-{dia:02d}" for mes, dia in FERIADOS_NACIONAIS], dtype="datetime64[D]")
+    dia_util = (np.is_busday(dias, holidays=feriados))[cal["dia_do_ano"]]
+    posto[~dia_util] = FORA_PONTA
+    posto.setflags(write=False)
+    return posto
+
+
+class TabelaTarifaria:
+    """Tarifa compilada: preço final (R$/kWh, com tributos) de cada hora do ano."""
+
+    def __init__(self, preco_horario, posto, ano=ANO_REFERENCIA):
+        self.preco = np.asarray(preco_horario, dtype=np.float64)
+        self.posto = posto
+        self.ano = ano
+        mes = calendario(ano)["mes"]
+        # Preço de cada hora na coluna do seu mês: fatura mensal = consumo @ matriz
+        self.matriz_mensal = np.zeros((HORAS_ANO, 12))
+        self.matriz_mensal[np.arange(HORAS_ANO), mes] = self.preco
+        self._matriz_mensal32 = self.matriz_mensal.astype(np.float32)
+        for valores in (self.preco, self.matriz_mensal, self._matriz_mensal32):
+            valores.setflags(write=False)
+
+    def preco_medio(self, posto):
+        """Preço médio (R$/kWh) das horas do posto ("fora_ponta", "intermediario" ou "ponta")."""
+        return float(self.preco[self.posto == POSTOS.index(posto)].mean())
+
+    def fatura_mensal(self, consumo_horario):
+        """Valor (R$) de cada mês para séries horárias (..., 8760) em kWh: (..., 12)."""
+        consumo_horario = np.asarray(consumo_horario)
+        matriz = self._matriz_mensal32 if consumo_horario.dtype == np.float32 else self.matriz_mensal
+        return np.asarray(consumo_horario @ matriz, dtype=np.float64)
+
+    def fatura_anual(self, consumo_horario):
+        """Valor (R$) do ano inteiro: produto escalar com o vetor de preços."""
+        consumo_horario = np.asarray(consumo_horario)
+        return np.asarray(consumo_horario @ self.preco.astype(consumo_horario.dtype, copy=False), dtype=np.float64)
+
+    def economia_mensal(self, consumo_horario, geracao_horaria):
+        """Economia (R$) de cada mês com geração própria, (..., 12).
+
+        O autoconsumo deixa de ser comprado pelo preço da hora; a energia
+        injetada vale o preço da hora em que foi injetada e abate a conta do
+        mesmo mês, sem passar do valor comprado da rede. Taxa mínima, Fio B e
+        créditos de meses seguintes ficam com solarsim.creditos/fluxo_caixa.
+        """
+        consumo_horario = np.asarray(consumo_horario, dtype=np.float32)
+        geracao_horaria = np.asarray(geracao_horaria, dtype=np.float32)
+        autoconsumo = np.minimum(consumo_horario, geracao_horaria)
+        conta_sem = self.fatura_mensal(consumo_horario)
+        conta_rede = self.fatura_mensal(consumo_horario - autoconsumo)
+        valor_injetado = self.fatura_mensal(geracao_horaria - autoconsumo)
+        return conta_sem - np.maximum(conta_rede - valor_injetado, 0.0)
+
+
+def _como_postos(componente):
+    """Valor único (convencional) ou (fora_ponta, intermediario, ponta) → tupla de 3."""
+    if np.ndim(componente) == 0:
+        return (float(componente),) * 3
+    valores = tuple(float(v) for v in componente)
+    if len(valores) != 3:
+        raise ValueError("Informe um valor único ou (fora_ponta, intermediario, ponta).")
+    return valores
+
+
+def _como_bandeiras(bandeiras):
+    """Nome de uma bandeira (ano todo) ou uma por mês → tupla de 12 nomes."""
+    if isinstance(bandeiras, str):
+        bandeiras = (bandeiras,) * 12
+    bandeiras = tuple(bandeiras)
+    if len(bandeiras) != 12:
+        raise ValueError("Informe uma bandeira para o ano ou uma para cada mês.")
+    desconhecidas = set(bandeiras) - set(BANDEIRAS)
+    if desconhecidas:
+        raise ValueError(f"Bandeira desconhecida: {sorted(desconhecidas)}")
+    return bandeiras
+
+
+def compilar_tarifa(te, tusd, bandeiras="verde", icms=ICMS_PADRAO, pis=PIS_PADRAO, cofins=COFINS_PADRAO,
+                    ano=ANO_REFERENCIA, inicio_ponta=INICIO_PONTA_PADRAO, horas_ponta=HORAS_PONTA):
+    """Compila uma tarifa em uma TabelaTarifaria (em cache por definição).
+
+    `te` e `tusd`: R$/kWh sem tributos, valor único ou (fora_ponta,
+    intermediario, ponta). `bandeiras`: nome de BANDEIRAS para o ano todo ou
+    uma sequência de 12, uma por mês.
+    """
+    return _compilar_tarifa(_como_postos(te), _como_postos(tusd), _como_bandeiras(bandeiras),
+                            float(icms), float(pis), float(cofins), ano, inicio_ponta, horas_ponta)
+
+
+@functools.lru_cache(maxsize=256)
+def _compilar_tarifa(te, tusd, bandeiras, icms, pis, cofins, ano, inicio_ponta, horas_ponta):
+    posto = postos_horarios(ano, inicio_ponta, horas_ponta)
+    adicional = np.array([BANDEIRAS[b] for b in bandeiras])[calendario(ano)["mes"]]
+    sem_tributos = np.asarray(te)[posto] + np.asarray(tusd)[posto] + adicional
+    return TabelaTarifaria(sem_tributos / (1 - icms - pis - cofins), posto, ano)
+
+
+def tarifa_distribuidora(distribuidora, modalidade="convencional", bandeiras="verde", **parametros):
+    """TabelaTarifaria de uma distribuidora de TARIFAS_DISTRIBUIDORAS."""
+    try:
+        componentes = TARIFAS_DISTRIBUIDORAS[distribuidora][modalidade]
+    except KeyError:
+        raise ValueError(f"Tarifa não cadastrada: {distribuidora!r} ({modalidade}).") from None
+    return compilar_tarifa(componentes["te"], componentes["tusd"], bandeiras, **parametros)
+
+
+def tarifa_plana(valor, ano=ANO_REFERENCIA):
+    """TabelaTarifaria de preço único já com tributos (a tarifa digitada na página)."""
+    return compilar_tarifa(valor, 0.0, "verde", icms=0.0, pis=0.0, cofins=0.0, ano=ano)
+
+
+def fatura_mensal_lote(consumo_horario, tabelas, indice, linhas_por_bloco=2048):
+    """Faturas mensais (n, 12) de clientes em tarifas diferentes.
+
+    `tabelas` é uma sequência de TabelaTarifaria e `indice` (n,) diz a tabela
+    de cada cliente. Cada cliente recebe o vetor de preços da sua tabela (um
+    único acesso indexado às tabelas usadas) e o produto hora a hora é somado
+    por mês com reduceat: o custo não cresce com o número de tabelas. Os
+    clientes vão em blocos de `linhas_por_bloco` para limitar a memória; com
+    uma tabela só vale o produto matricial de TabelaTarifaria.fatura_mensal.
+    """
+    consumo_horario = np.asarray(consumo_horario)
+    indice = np.broadcast_to(np.asarray(indice), consumo_horario.shape[:-1])
+    dtype = np.float32 if consumo_horario.dtype == np.float32 else np.float64
+    usadas, inverso = np.unique(indice, return_inverse=True)
+    if len(usadas) == 1:
+        return tabelas[usadas[0]].fatura_mensal(consumo_horario)
+    precos = np.stack([tabelas[i].preco for i in usadas]).astype(dtype)
+    anos = np.array([tabelas[i].ano for i in usadas])
+
+    consumo = consumo_horario.reshape(-1, HORAS_ANO)
+    inverso = inverso.reshape(-1)
+    faturas = np.empty((len(consumo), 12))
+    # O mês de cada hora depende do ano da tabela: um reduceat por ano presente
+    for ano in np.unique(anos):
+        mes = calendario(int(ano))["mes"]
+        inicios_mes = np.flatnonzero(np.diff(mes, prepend=-1))
+        linhas = np.flatnonzero(anos[inverso] == ano)
+        for inicio in range(0, len(linhas), linhas_por_bloco):
+            bloco = linhas[inicio:inicio + linhas_por_bloco]
+            valor = consumo[bloco] * precos[inverso[bloco]]
+            faturas[bloco] = np.add.reduceat(valor, inicios_mes, axis=1)
+    return faturas.reshape(consumo_horario.shape[:-1] + (12,))
@@ -0,0 +1,291 @@
+"""Quantos módulos cabem de fato no telhado: empacotamento em grade por água.
+
+area_m2 (numero_paineis × AREA_PAINEL_M2) não diz se os painéis cabem. Aqui
+cada água do telhado é um polígono no plano da própria água, em metros,
+com x ao longo do beiral e y subindo o caimento; as fileiras de módulos
+ficam paralelas ao beiral. O cálculo é numa grade de `resolucao` m:
+
+1. o polígono vira a máscara das células inteiramente dentro dele, por
+   linha de varredura (regra par-ímpar, cruzamentos acumulados com
+   bincount/cumsum, sem laço por célula);
+2. o recuo das bordas é uma erosão de Chebyshev (quadrado de 2k+1
+   células, separável em duas somas de janela) e as obstruções (caixa
+   d'água, claraboia, chaminé) entram dilatadas pela folga;
+3. para cada faixa de linhas da altura de um módulo (retrato e paisagem),
+   uma soma acumulada na vertical diz quais colunas estão livres na
+   faixa inteira, e os trechos contíguos saem de um diff, todas as
+   faixas de uma vez;
+4. dentro de um trecho o módulo desliza em x sem se prender à grade, e
+   o guloso da esquerda (ótimo para peças de mesma largura) dá
+   piso((comprimento + espaçamento) / passo) módulos;
+5. uma programação dinâmica sobre as linhas escolhe onde começa cada
+   fileira e, com orientacao="ambas", se ela é de retrato ou paisagem.
+
+O resultado é o máximo entre os arranjos em fileiras alinhadas, que é como
+os instaladores montam. A grade é conservadora: o recuo e as alturas
+são arredondados para cima, então um módulo nunca invade o recuo, e o
+preço é até uma célula a mais de recuo em cada borda e entre fileiras.
+Uma água de 10 × 6 m leva cerca de 1 ms, e capacidade_lote faz centenas
+de telhados por segundo num só processo.
+"""
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Módulo de 550 Wp (144 meias-células): 1,134 × 2,279 m ≈ AREA_PAINEL_M2
+LARGURA_MODULO_M = 1.134
+COMPRIMENTO_MODULO_M = 2.279
+ESPACAMENTO_M = 0.02  # entre módulos vizinhos (grampos)
+RECUO_M = 0.30  # das bordas da água
+FOLGA_OBSTRUCAO_M = 0.30
+RESOLUCAO_M = 0.05
+ORIENTACOES = ("retrato", "paisagem", "ambas")
+MAX_CELULAS = 20_000_000
+
+
+def retangulo(largura, comprimento, x=0.0, y=0.0):
+    """Vértices de uma água (ou obstrução) retangular."""
+    return [(x, y), (x + largura, y), (x + largura, y + comprimento), (x, y + comprimento)]
+
+
+def _rasterizar(vertices, x0, y0, nx, ny, resolucao, fracao_x=0.5, fracao_y=0.5):
+    """Máscara (ny, nx) das células cujo ponto (fracao_x, fracao_y) está dentro do polígono (par-ímpar)."""
+    inicio = np.asarray(vertices, dtype=np.float64)
+    fim = np.roll(inicio, -1, axis=0)
+    amostras_y = y0 + (np.arange(ny) + fracao_y) * resolucao
+    acima_inicio = inicio[:, 1][None, :] <= amostras_y[:, None]
+    acima_fim = fim[:, 1][None, :] <= amostras_y[:, None]
+    linhas, arestas = np.nonzero(acima_inicio != acima_fim)
+    t = (amostras_y[linhas] - inicio[arestas, 1]) / (fim[arestas, 1] - inicio[arestas, 1])
+    x = inicio[arestas, 0] + t * (fim[arestas, 0] - inicio[arestas, 0])
+    # Cada cruzamento inverte dentro/fora das células cuja amostra fica à direita dele.
+    # A soma acumulada corre no eixo 0 (colunas), bem mais rápido que ao longo de cada linha
+    coluna = np.clip(np.ceil((x - x0) / resolucao - fracao_x), 0, nx).astype(np.intp)
+    viradas = np.bincount(coluna * ny + linhas, minlength=(nx + 1) * ny).reshape(nx + 1, ny)
+    return (np.cumsum(viradas[:nx], axis=0) & 1).astype(bool).T
+
+
+def _celulas_dos_vertices(vertices, x0, y0, nx, ny, resolucao, margem=1e-6):
+    """Máscara das células com vértice do polígono entre as suas linhas de amostra.
+
+    Um vértice sobre uma linha horizontal da grade já aparece nas linhas de
+    amostra vizinhas; sobre uma linha vertical, marca as células dos dois lados.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    x = (vertices[:, 0] - x0) / resolucao
+    y = (vertices[:, 1] - y0) / resolucao
+    entre_amostras = np.abs(y - np.round(y)) > margem
+    sobre_vertical = np.abs(x - np.round(x)) <= margem
+    coluna = np.where(sobre_vertical, np.round(x), np.floor(x)).astype(np.intp)
+    linha = np.floor(y).astype(np.intp)
+    linha = np.concatenate([linha[entre_amostras], linha[entre_amostras & sobre_vertical]])
+    coluna = np.concatenate([coluna[entre_amostras], coluna[entre_amostras & sobre_vertical] - 1])
+    dentro = (coluna >= 0) & (coluna < nx) & (linha >= 0) & (linha < ny)
+    mascara = np.zeros((ny, nx), dtype=bool)
+    mascara[linha[dentro], coluna[dentro]] = True
+    return mascara
+
+
+def _por_inteiro_dentro(vertices, x0, y0, nx, ny, resolucao, margem=1e-6):
+    """Células inteiras dentro do polígono, para o recuo não depender de meia célula.
+
+    Em duas linhas de amostra por célula (rente à base e ao topo), os
+    cruzamentos ordenados formam pares entrada/saída; a célula fica quando
+    os dois trechos a cobrem de ponta a ponta e nenhum vértice cai nela.
+    A `margem` (em células) deixa uma borda sobre uma linha da grade
+    contar a célula vizinha como dentro.
+    """
+    inicio = np.asarray(vertices, dtype=np.float64)
+    fim = np.roll(inicio, -1, axis=0)
+    mascara = ~_celulas_dos_vertices(inicio, x0, y0, nx, ny, resolucao)
+    for fracao_y in (margem, 1 - margem):
+        amostras_y = y0 + (np.arange(ny) + fracao_y) * resolucao
+        acima_inicio = inicio[:, 1][None, :] <= amostras_y[:, None]
+        acima_fim = fim[:, 1][None, :] <= amostras_y[:, None]
+        linhas, arestas = np.nonzero(acima_inicio != acima_fim)
+        t = (amostras_y[linhas] - inicio[arestas, 1]) / (fim[arestas, 1] - inicio[arestas, 1])
+        x = (inicio[arestas, 0] + t * (fim[arestas, 0] - inicio[arestas, 0]) - x0) / resolucao
+        ordem = np.lexsort((x, linhas))
+        linhas, x = linhas[ordem][::2], x[ordem]
+        entrada = np.clip(np.ceil(x[::2] - margem), 0, nx).astype(np.intp)
+        saida = np.clip(np.floor(x[1::2] + margem), 0, nx).astype(np.intp)
+        cobre = entrada < saida
+        viradas = np.zeros((nx + 1) * ny, dtype=np.int8)
+        np.add.at(viradas, entrada[cobre] * ny + linhas[cobre], 1)
+        np.add.at(viradas, saida[cobre] * ny + linhas[cobre], -1)
+        mascara &= np.cumsum(viradas.reshape(nx + 1, ny)[:nx], axis=0, dtype=np.int8).astype(bool).T
+    return mascara
+
+
+def _soma_janela(mascara, k, eixo):
+    """Soma em janelas de 2k+1 células centradas ao longo do eixo (fora da grade conta 0)."""
+    borda = [(0, 0), (0, 0)]
+    borda[eixo] = (k + 1, k)
+    acumulada = np.cumsum(np.pad(mascara, borda), axis=eixo, dtype=np.int32)
+    n = mascara.shape[eixo]
+    if eixo == 0:
+        return acumulada[2 * k + 1:] - acumulada[:n]
+    return acumulada[:, 2 * k + 1:] - acumulada[:, :n]
+
+
+def _erodir(mascara, k):
+    """Erosão de Chebyshev: fica a célula cujo quadrado de raio k está todo na máscara."""
+    for eixo in (0, 1):
+        mascara = _soma_janela(mascara, k, eixo) == 2 * k + 1
+    return mascara
+
+
+def _dilatar(mascara, k):
+    for eixo in (0, 1):
+        mascara = _soma_janela(mascara, k, eixo) > 0
+    return mascara
+
+
+def _celulas(metros, resolucao):
+    """Metros em células, arredondando para cima (tolerante a erro de ponto flutuante)."""
+    return max(1, math.ceil(metros / resolucao - 1e-9))
+
+
+def _trechos_livres(livre, altura):
+    """Trechos de colunas livres em cada faixa de `altura` linhas: (linha, início, fim), em células."""
+    ny, nx = livre.shape
+    if altura > ny:
+        return (np.empty(0, dtype=np.intp),) * 3
+    acumulada = np.zeros((ny + 1, nx), dtype=np.int32)
+    np.cumsum(livre, axis=0, dtype=np.int32, out=acumulada[1:])
+    faixa = (acumulada[altura:] - acumulada[:-altura]) == altura
+    # +1 onde um trecho começa e -1 logo depois de onde termina; em cada linha eles se alternam
+    bordas = np.diff(np.pad(faixa, ((0, 0), (1, 1))).view(np.int8), axis=1)
+    linhas, inicios = np.nonzero(bordas == 1)
+    _, fins = np.nonzero(bordas == -1)
+    return linhas, inicios, fins
+
+
+def empacotar_agua(vertices, obstrucoes=(), recuo=RECUO_M, folga_obstrucao=FOLGA_OBSTRUCAO_M,
+                   modulo=(LARGURA_MODULO_M, COMPRIMENTO_MODULO_M), espacamento=ESPACAMENTO_M,
+                   orientacao="ambas", resolucao=RESOLUCAO_M, com_layout=True):
+    """Máximo de módulos numa água e o arranjo.
+
+    `vertices` e cada obstrução são listas de (x, y) em metros; `modulo` é
+    (lado curto, lado longo). Em retrato, o lado longo sobe o caimento.
+    Devolve paineis, retrato, paisagem, area_util_m2 (depois do recuo e das
+    obstruções) e, com `com_layout`, modulos: array (n, 4) com x, y,
+    largura e altura de cada módulo.
+    """
+    if orientacao not in ORIENTACOES:
+        raise ValueError(f"orientacao deve ser uma de {', '.join(ORIENTACOES)}.")
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if vertices.ndim != 2 or vertices.shape[0] < 3 or vertices.shape[1] != 2:
+        raise ValueError("Uma água precisa de ao menos 3 vértices (x, y).")
+    if min(modulo) <= 0 or resolucao <= 0 or espacamento < 0 or recuo < 0 or folga_obstrucao < 0:
+        raise ValueError("Módulo e resolução devem ser positivos; recuo, folga e espaçamento, >= 0.")
+
+    x0, y0 = vertices.min(axis=0)
+    nx, ny = (math.ceil((d - 1e-9) / resolucao) for d in vertices.max(axis=0) - (x0, y0))
+    if nx * ny > MAX_CELULAS:
+        raise ValueError(f"Água grande demais para a resolução de {resolucao} m; aumente a resolução.")
+
+    livre = _erodir(_por_inteiro_dentro(vertices, x0, y0, nx, ny, resolucao),
+                   math.ceil(recuo / resolucao - 1e-9))
+    if len(obstrucoes):
+        bloqueio = np.zeros_like(livre)
+        for obstrucao in obstrucoes:
+            # Obstruções menores que uma célula não têm centro dentro: marca os vértices
+            bloqueio |= _rasterizar(obstrucao, x0, y0, nx, ny, resolucao)
+            bloqueio |= _celulas_dos_vertices(obstrucao, x0, y0, nx, ny, resolucao)
+        # Meia célula a mais: a máscara da obstrução é pelo centro da célula
+        livre &= ~_dilatar(bloqueio, math.ceil(folga_obstrucao / resolucao + 0.5))
+
+    curto, longo = sorted(modulo)
+    formatos = {"retrato": (curto, longo), "paisagem": (longo, curto)}
+    opcoes = []
+    for nome in (formatos if orientacao == "ambas" else (orientacao,)):
+        largura, altura = formatos[nome]
+        linhas, inicios, fins = _trechos_livres(livre, _celulas(altura, resolucao))
+        # Dentro de um trecho livre a posição é contínua: sem perda de arredondamento em x
+        por_trecho = np.floor(((fins - inicios) * resolucao + espacamento) / (largura + espacamento) + 1e-9)
+        contagem = np.bincount(linhas, weights=por_trecho, minlength=max(0, ny - _celulas(altura, resolucao) + 1))
+        opcoes.append((nome, largura, altura, contagem.astype(np.int64), (linhas, inicios, por_trecho),
+                       _celulas(altura + espacamento, resolucao)))
+
+    # melhor[i]: máximo de módulos com fileiras começando na linha i ou acima dela
+    # (listas Python: no laço, indexar array numpy custaria mais que a conta)
+    contagens = [(opcao[3].tolist() + [0] * ny)[:ny] for opcao in opcoes]
+    passos = [opcao[5] for opcao in opcoes]
+    melhor = [0] * (ny + 1 + max(passos))
+    escolha = [-1] * ny
+    for i in range(ny - 1, -1, -1):
+        valor = melhor[i + 1]
+        for indice, contagem in enumerate(contagens):
+            candidato = contagem[i] + melhor[i + passos[indice]]
+            # No empate, a fileira começa já aqui (junto ao beiral) e em retrato
+            if contagem[i] and (candidato > valor or candidato == valor and escolha[i] < 0):
+                valor = candidato
+                escolha[i] = indice
+        melhor[i] = valor
+
+    por_orientacao = dict.fromkeys(formatos, 0)
+    fileiras = []
+    i = 0
+    while i < ny:
+        if escolha[i] < 0:
+            i += 1
+            continue
+        fileiras.append((i, escolha[i]))
+        nome, _, _, contagem, _, passo_linhas = opcoes[escolha[i]]
+        por_orientacao[nome] += int(contagem[i])
+        i += passo_linhas
+
+    resultado = {
+        "paineis": melhor[0],
+        **por_orientacao,
+        "area_util_m2": round(float(livre.sum()) * resolucao ** 2, 2),
+    }
+    if com_layout:
+        modulos = []
+        for i, indice in fileiras:
+            _, largura, altura, _, (linhas, inicios, por_trecho), _ = opcoes[indice]
+            na_linha = linhas == i
+            repeticoes = por_trecho[na_linha].astype(np.intp)
+            ordem = np.arange(repeticoes.sum()) - np.repeat(np.cumsum(repeticoes) - repeticoes, repeticoes)
+            x = x0 + np.repeat(inicios[na_linha], repeticoes) * resolucao + ordem * (largura + espacamento)
+            modulos.append(np.column_stack([x, np.full(len(x), y0 + i * resolucao),
+                                            np.full(len(x), largura), np.full(len(x), altura)]))
+        resultado["modulos"] = np.concatenate(modulos) if modulos else np.empty((0, 4))
+    return resultado
+
+
+def empacotar_telhado(aguas, **opcoes):
+    """Soma das águas: cada uma é {"vertices": [...], "obstrucoes": [[...], ...]}."""
+    resultados = [empacotar_agua(agua["vertices"], agua.get("obstrucoes", ()), **opcoes) for agua in aguas]
+    return {"paineis": sum(r["paineis"] for r in resultados), "aguas": resultados}
+
+
+def ler_telhado(texto):
+    """Telhado em JSON (lista de águas, ou uma água só) -> lista de águas."""
+    telhado = json.loads(texto) if isinstance(texto, str) else texto
+    if isinstance(telhado, dict):
+        telhado = [telhado]
+    if not isinstance(telhado, list) or not all(isinstance(a, dict) and "vertices" in a for a in telhado):
+        raise ValueError('Telhado deve ser uma água {"vertices": [[x, y], ...]} ou uma lista delas.')
+    return telhado
+
+
+def _capacidade(telhado, opcoes):
+    return empacotar_telhado(telhado, com_layout=False, **opcoes)["paineis"]
+
+
+def capacidade_lote(telhados, processos=1, **opcoes):
+    """Máximo de módulos de cada telhado (array int64), para o dimensionamento em massa.
+
+    Com `processos` > 1, os telhados são divididos entre processos.
+    """
+    if processos > 1 and len(telhados) > processos:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            capacidades = list(pool.map(_capacidade, telhados, [opcoes] * len(telhados),
+                                        chunksize=max(1, len(telhados) // (4 * processos))))
+    else:
+        capacidades = [_capacidade(telhado, opcoes) for telhado in telhados]
+    return np.asarray(capacidades, dtype=np.int64)
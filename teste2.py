@@ -1,590 +1,713 @@
-import streamlit as st
-import pandas as pd
-import altair as alt
-import locale
-import math
-
-# --- CONSTANTES DE SIMULAÇÃO GLOBAIS ---
-TAXA_DESEMPENHO = 0.80
-POTENCIA_PAINEL_WP = 550
-AREA_PAINEL_M2 = 2.6
-FATOR_EMISSAO_CO2_KWH = 0.075
-
-# --- URLs DAS IMAGENS DE AJUDA (CORRIGIDAS) ---
-# Eu corrigi a ordem das suas URLs. A 520... era da TARIFA. A 005... era do CONSUMO.
-URL_AJUDA_CONSUMO = "https://raw.githubusercontent.com/felipaofelipao/solar-sim-app/refs/heads/main/Imagem%20do%20WhatsApp%20de%202025-11-09%20%C3%A0(s)%2017.36.05_52053dd3.JPG"
-URL_AJUDA_TARIFA = "https://raw.githubusercontent.com/felipaofelipao/solar-sim-app/refs/heads/main/Imagem%20do%20WhatsApp%20de%202025-11-09%20%C3%A0(s)%2017.36.05_00537b91.JPG"
-
-# --- CONFIGURAÇÃO DA PÁGINA ---
-st.set_page_config(page_title="SolarSim | Simulador Solar", page_icon="☀️", layout="wide")
-
-# --- INICIALIZAÇÃO DO SESSION STATE ---
-if "tarifas_list" not in st.session_state:
-    st.session_state.tarifas_list = [0.85]
-if "tarifa_estimada" not in st.session_state:
-    st.session_state.tarifa_estimada = 0.95
-
-# --- CSS GLOBAL PARA FONTES GRANDES (COM CORREÇÃO PARA METRICS) ---
-CSS_APP_STYLE = """
-<style>
-    /* Base: Aumenta a fonte de todo o texto padrão */
-    html, body, [class*="st-"], [data-testid="stAppViewContainer"] { 
-        font-size: 1.15rem; 
-    }
-
-    /* Correção Agressiva para Métricas (Label) */
-    label[data-testid="stMetricLabel"] div { 
-        font-size: 1.15rem !important; 
-        line-height: 1.3 !important; 
-    }
-
-    /* Correção Agressiva para Métricas (Valor) */
-    div[data-testid="stMetricValue"] div { 
-        font-size: 2.25rem !important; 
-    }
-
-    /* Outros Elementos (ajustados para consistência) */
-    [data-testid="stTooltipContent"] p { font-size: 1.1rem; }
-    [data-testid="stExpander"] summary { font-size: 1.25rem; }
-    [data-testid="stInfo"], [data-testid="stSuccess"] { font-size: 1.1rem; }
-</style>
-"""
-st.markdown(CSS_APP_STYLE, unsafe_allow_html=True)
-
-# --- LOCALE (com fallback) ---
-try:
-    locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-except:
-    pass
-
-
-def formatar_reais(valor: float) -> str:
-    """Formata um float para o padrão R$ X.XXX,XX com fallback."""
-    try:
-        return locale.currency(valor, grouping=True)
-    except:
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-
-# --- BASES DE DADOS (Foco em Rio das Ostras) ---
-HSP_CAPITAIS = {"Rio das Ostras (RJ)": 4.98}
-CUSTO_WP_CAPITAIS = {"Rio das Ostras (RJ)": 2.49}
-
-
-# --- FUNÇÕES DE CÁLCULO (COM ESTRATIFICAÇÃO E INVERSOR) ---
-
-def calcular_sistema_solar(consumo_kwh, tarifa, hsp, custo_wp_regional):
-    """Calculadora por Consumo (kWh -> R$)"""
-    consumo_diario_kwh = consumo_kwh / 30
-    potencia_necessaria_kwp = consumo_diario_kwh / (hsp * TAXA_DESEMPENHO)
-    potencia_necessaria_wp = potencia_necessaria_kwp * 1000
-
-    numero_paineis = max(1, math.ceil(potencia_necessaria_wp / POTENCIA_PAINEL_WP))
-    potencia_final_sistema_wp = numero_paineis * POTENCIA_PAINEL_WP
-    potencia_kwp_final = potencia_final_sistema_wp / 1000
-    area_total_m2 = numero_paineis * AREA_PAINEL_M2
-    inversor_kw_rec = potencia_kwp_final / 1.25
-
-    geracao_diaria_kwh = potencia_kwp_final * hsp * TAXA_DESEMPENHO
-    geracao_mensal_kwh = geracao_diaria_kwh * 30
-    custo_total_estimado = potencia_final_sistema_wp * custo_wp_regional
-    economia_mensal_reais = min(geracao_mensal_kwh, consumo_kwh) * tarifa
-    geracao_anual_kwh = geracao_mensal_kwh * 12
-    co2_evitado_anual_kg = geracao_anual_kwh * FATOR_EMISSAO_CO2_KWH
-
-    custos_detalhados = {
-        "Painéis Fotovoltaicos": custo_total_estimado * 0.40,
-        "Inversor(es)": custo_total_estimado * 0.20,
-        "Estruturas, Cabos e Proteções": custo_total_estimado * 0.15,
-        "Mão de Obra e Projeto": custo_total_estimado * 0.25
-    }
-
-    return {
-        "potencia_kwp": round(potencia_kwp_final, 2),
-        "inversor_kw_recomendado": round(inversor_kw_rec, 2),
-        "numero_paineis": numero_paineis,
-        "area_m2": round(area_total_m2, 2),
-        "custo_total_estimado_site": custo_total_estimado,
-        "economia_mensal_reais": economia_mensal_reais,
-        "co2_evitado_kg": round(co2_evitado_anual_kg, 2),
-        "geracao_mensal": round(geracao_mensal_kwh, 2),
-        "custos_detalhados": custos_detalhados
-    }
-
-
-def calcular_sistema_por_orcamento(orcamento, custo_wp_regional, consumo_kwh, tarifa, hsp):
-    """Calculadora por Orçamento (R$ -> kWh)"""
-
-    potencia_final_sistema_wp = orcamento / custo_wp_regional
-    potencia_kwp_final = potencia_final_sistema_wp / 1000
-    inversor_kw_rec = potencia_kwp_final / 1.25
-    numero_paineis = max(1, math.ceil(potencia_final_sistema_wp / POTENCIA_PAINEL_WP))
-    area_total_m2 = numero_paineis * AREA_PAINEL_M2
-
-    geracao_diaria_kwh = potencia_kwp_final * hsp * TAXA_DESEMPENHO
-    geracao_mensal_kwh = geracao_diaria_kwh * 30
-    economia_mensal_reais = min(geracao_mensal_kwh, consumo_kwh) * tarifa
-    geracao_anual_kwh = geracao_mensal_kwh * 12
-    co2_evitado_anual_kg = geracao_anual_kwh * FATOR_EMISSAO_CO2_KWH
-
-    custos_detalhados = {
-        "Painéis Fotovoltaicos": orcamento * 0.40,
-        "Inversor(es)": orcamento * 0.20,
-        "Estruturas, Cabos e Proteções": orcamento * 0.15,
-        "Mão de Obra e Projeto": orcamento * 0.25
-    }
-
-    return {
-        "potencia_kwp": round(potencia_kwp_final, 2),
-        "inversor_kw_recomendado": round(inversor_kw_rec, 2),
-        "numero_paineis": numero_paineis,
-        "area_m2": round(area_total_m2, 2),
-        "custo_total_estimado_site": orcamento,
-        "economia_mensal_reais": economia_mensal_reais,
-        "co2_evitado_kg": round(co2_evitado_anual_kg, 2),
-        "geracao_mensal": round(geracao_mensal_kwh, 2),
-        "custos_detalhados": custos_detalhados
-    }
-
-
-def estimar_consumo_casa_nova(pessoas, chuveiros, ar_cond, freezer, home_office):
-    """Estima o consumo para uma casa nova (simulação)."""
-    consumo_base_pessoas = pessoas * 60
-    consumo_chuveiros = chuveiros * 70
-    consumo_ar = ar_cond * 100
-    consumo_freezer = freezer * 40
-    consumo_home_office = home_office * 60
-
-    return consumo_base_pessoas + consumo_chuveiros + consumo_ar + consumo_freezer + consumo_home_office
-
-
-def formatar_payback(custo, economia_mensal):
-    """Calcula e formata o payback em anos e meses."""
-    if economia_mensal > 0:
-        payback_anos = custo / (economia_mensal * 12)
-    else:
-        return "Não aplicável"
-    anos = int(payback_anos)
-    meses = round((payback_anos - anos) * 12)
-    if meses == 12:
-        anos += 1
-        meses = 0
-    return f"~ {anos} anos e {meses} meses" if anos else f"~ {meses} meses"
-
-
-def adicionar_campo_tarifa():
-    """Callback para adicionar um novo campo de tarifa."""
-    st.session_state.tarifas_list.append(0.0)
-
-
-def gerar_resumo_txt(R, dados):
-    """Gera um arquivo de texto simples com o resumo da simulação."""
-
-    resumo = f"--- RESUMO DA SIMULAÇÃO SOLAR (SolarSim) ---\n\n"
-    resumo += f"Localização: {R['cidade']}\n"
-    resumo += f"Consumo Mensal Base: {R['consumo']} kWh\n"
-    resumo += f"Tarifa Considerada: {formatar_reais(R['tarifa'])} / kWh\n"
-    resumo += f"Taxa Mínima (Conexão): {R['minimo_kwh']} kWh\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"INVESTIMENTO\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"Investimento Total: {formatar_reais(R['custo_final'])}\n"
-    resumo += f"Retorno (Payback): {R['payback']}\n"
-    resumo += f"Economia Mensal Bruta: {formatar_reais(dados['economia_mensal_reais'])}\n"
-    resumo += f"\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"DETALHES DO SISTEMA\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"Potência do Sistema: {dados['potencia_kwp']} kWp\n"
-    resumo += f"Inversor Recomendado: ~{dados['inversor_kw_recomendado']} kW\n"
-    resumo += f"Quantidade de Painéis: {dados['numero_paineis']}\n"
-    resumo += f"Área Mínima: {dados['area_m2']} m²\n"
-    resumo += f"\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"NOVA REALIDADE (PÓS-INSTALAÇÃO)\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"Geração Mensal Estimada: {dados['geracao_mensal']:.0f} kWh\n"
-
-    if R['saldo_kwh'] < 0:
-        nova_fatura = max(abs(R['saldo_kwh']), R['minimo_kwh']) * R['tarifa']
-        resumo += f"Consumo restante da Rede: {abs(R['saldo_kwh']):.0f} kWh\n"
-        resumo += f"Nova Fatura Estimada: {formatar_reais(nova_fatura)}\n"
-    else:
-        nova_fatura = R['minimo_kwh'] * R['tarifa']
-        resumo += f"Créditos Gerados: {R['saldo_kwh']:.0f} kWh\n"
-        resumo += f"Nova Fatura (Taxa Mínima): {formatar_reais(nova_fatura)}\n"
-
-    resumo += f"\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"IMPACTO AMBIENTAL\n"
-    resumo += f"---------------------------------------------\n"
-    resumo += f"CO₂ evitado por ano: {dados['co2_evitado_kg']:.0f} kg\n"
-    resumo += f"Equivalente a: {dados['co2_evitado_kg'] / 150:.0f} árvores plantadas\n"
-
-    return resumo
-
-
-# ========= INTERFACE =========
-
-st.title("☀️ SolarSim: Simulador Solar Residencial")
-
-# (Removido o st.info("👀 Dificuldade para ler..."))
-
-st.markdown(
-    "Simule o custo, economia e benefícios ambientais da energia solar. Preencha os campos abaixo para começar!")
-st.divider()
-
-# --- MODO DE SIMULAÇÃO ---
-st.subheader("1️⃣ Modo de Simulação")
-modo_simulacao = st.radio(
-    "Como deseja simular?",
-    ("Com base na minha conta de luz (Já moro no local)",
-     "Com base em uma estimativa (Estou construindo)"),
-    horizontal=True,
-    key="modo_simulacao"
-)
-
-# 1) Inputs (Consumo e Localização)
-col1, col2 = st.columns(2)
-with col1:
-    st.subheader("2️⃣ Seus Dados")
-
-    if modo_simulacao == "Com base na minha conta de luz (Já moro no local)":
-
-        consumo = st.number_input(
-            "Consumo médio mensal (kWh):",
-            min_value=50, max_value=10000, value=300, step=10, key="consumo",
-            help=f"""
-            Abra sua conta de luz (Ex: Enel) e procure pelo campo 'Consumo Faturado em kWh' ou 'Total Consumo Mês'.
-
-            **Veja onde encontrar:**
-
-            ![Exemplo Conta de Luz]({URL_AJUDA_CONSUMO})
-            """
-        )
-
-        # --- LÓGICA DE TARIFA ITERATIVA ---
-        help_texto_tarifa = "Some todos os valores de 'Tarifa de Energia (TE)' e 'Tarifa de Uso (TUSD)' da sua conta. Use o botão '+' para adicionar quantos campos precisar."
-
-        st.markdown("**Tarifa de Energia (R$/kWh):**")
-
-        for i in range(len(st.session_state.tarifas_list)):
-            help_tarifa_final = None
-            if i == 0:
-                help_tarifa_final = f"""
-                {help_texto_tarifa}
-
-                **Exemplo de onde encontrar (se tiver conta):**
-
-                ![Exemplo Conta de Luz]({URL_AJUDA_TARIFA})
-                """
-
-            st.session_state.tarifas_list[i] = st.number_input(
-                f"Valor {i + 1} (TE ou TUSD)",
-                min_value=0.00,
-                max_value=3.00,
-                value=st.session_state.tarifas_list[i],
-                step=0.01,
-                format="%.2f",
-                key=f"tarifa_input_{i}",
-                help=help_tarifa_final
-            )
-
-        st.button(
-            "Adicionar outro valor (+)",
-            key="add_tarifa",
-            on_click=adicionar_campo_tarifa
-        )
-
-        tarifa_calculada = sum(st.session_state.tarifas_list)
-        st.info(f"Sua Tarifa Total: **{formatar_reais(tarifa_calculada)} / kWh**")
-
-    else:  # --- MODO "ESTOU CONSTRUINDO" ---
-        st.markdown("Preencha os dados da sua futura casa:")
-        c_pessoas = st.number_input("Quantas pessoas vão morar?", min_value=1, value=3, step=1, key="c_pessoas")
-        c_chuveiros = st.number_input("Quantos chuveiros elétricos?", min_value=0, value=1, step=1, key="c_chuveiros")
-        c_ar = st.number_input("Quantos aparelhos de ar condicionado?", min_value=0, value=1, step=1, key="c_ar")
-        c_freezer = st.number_input("Quantos freezers (além da geladeira)?", min_value=0, value=0, step=1,
-                                    key="c_freezer")
-        c_home_office = st.number_input("Pessoas em home office (uso intenso de PC)?", min_value=0, value=0, step=1,
-                                        key="c_home_office")
-
-        consumo = estimar_consumo_casa_nova(c_pessoas, c_chuveiros, c_ar, c_freezer, c_home_office)
-        st.info(f"Seu consumo estimado é de **{consumo} kWh/mês**.")
-
-        # --- LÓGICA DE TARIFA ÚNICA ---
-        tarifa_calculada = st.number_input(
-            "Tarifa de energia (R$/kWh):",
-            min_value=0.30,
-            max_value=3.00,
-            value=st.session_state.tarifa_estimada,
-            step=0.01,
-            format="%.2f",
-            key="tarifa_estimada",
-            help="Valor médio da tarifa (TE + TUSD). Usamos R$ 0,95 como padrão para Rio das Ostras."
-        )
-
-with col2:
-    st.subheader("3️⃣ Sua Localização")
-    cidades_ordenadas = sorted(HSP_CAPITAIS.keys())
-
-    cidade_selecionada = st.selectbox(
-        "Localização da Simulação:",
-        cidades_ordenadas,
-        index=0,
-        key="cidade",
-        disabled=True
-    )
-
-    st.markdown("---")
-    st.subheader("Tipo de Conexão (Enel)")
-    tipo_conexao = st.selectbox(
-        "Qual sua conexão com a rede?",
-        ("Monofásica (Taxa Mínima 30 kWh)",
-         "Bifásica (Taxa Mínima 50 kWh)",
-         "Trifásica (Taxa Mínima 100 kWh)"),
-        index=1,  # Padrão para Bifásica
-        key="tipo_conexao",
-        help="Isso define a taxa mínima (custo de disponibilidade) que você sempre pagará, mesmo gerando 100% da sua energia."
-    )
-
-# Cálculo temporário
-hsp = HSP_CAPITAIS[cidade_selecionada]
-custo_wp = CUSTO_WP_CAPITAIS[cidade_selecionada]
-# Garantia de que 'consumo' e 'tarifa_calculada' sempre tenham um valor
-if 'consumo' not in locals(): consumo = 300
-if 'tarifa_calculada' not in locals(): tarifa_calculada = 0.85
-resultados_tmp = calcular_sistema_solar(consumo, tarifa_calculada, hsp, custo_wp)
-
-# 2) Orçamento
-st.divider()
-st.subheader("4️⃣ Orçamento e Investimento")
-col_orc, col_val = st.columns(2)
-with col_orc:
-    escolha_orcamento = st.radio("Como deseja inserir o valor do investimento?",
-                                 ('Usar Orçamento Médio do SolarSim', 'Inserir meu Orçamento Personalizado'),
-                                 index=0, key="escolha_orc")
-with col_val:
-    if escolha_orcamento == 'Inserir meu Orçamento Personalizado':
-        custo_final = st.number_input("Valor Total do Orçamento (R$):",
-                                      min_value=1000.00,
-                                      value=float(round(resultados_tmp["custo_total_estimado_site"], -2)),
-                                      step=100.00, format="%.2f", key="custo_pers")
-    else:
-        st.markdown("*Estimativa SolarSim (baseada no seu consumo):*")
-        st.info(formatar_reais(resultados_tmp["custo_total_estimado_site"]))
-        custo_final = resultados_tmp["custo_total_estimado_site"]
-
-# 3) Botão Calcular
-if st.button("⚡ Simular meu sistema solar", type="primary", use_container_width=True):
-
-    if st.session_state.modo_simulacao == "Com base na minha conta de luz (Já moro no local)":
-        consumo_atual = st.session_state.consumo
-        tarifa_atual = sum(st.session_state.tarifas_list)
-    else:
-        consumo_atual = estimar_consumo_casa_nova(
-            st.session_state.c_pessoas,
-            st.session_state.c_chuveiros,
-            st.session_state.c_ar,
-            st.session_state.c_freezer,
-            st.session_state.c_home_office
-        )
-        tarifa_atual = st.session_state.tarifa_estimada
-
-    cidade_atual = st.session_state.cidade
-    hsp_atual = HSP_CAPITAIS[cidade_atual]
-    custo_wp_atual = CUSTO_WP_CAPITAIS[cidade_atual]
-    escolha_atual = st.session_state.escolha_orc
-
-    conexao_atual = st.session_state.tipo_conexao
-    if "Monofásica" in conexao_atual:
-        minimo_kwh_atual = 30
-    elif "Trifásica" in conexao_atual:
-        minimo_kwh_atual = 100
-    else:
-        minimo_kwh_atual = 50
-
-    if escolha_atual == 'Inserir meu Orçamento Personalizado':
-        custo_final_atual = st.session_state.custo_pers
-        dados_finais = calcular_sistema_por_orcamento(
-            custo_final_atual, custo_wp_atual, consumo_atual, tarifa_atual, hsp_atual
-        )
-    else:
-        dados_finais = calcular_sistema_solar(
-            consumo_atual, tarifa_atual, hsp_atual, custo_wp_atual
-        )
-        custo_final_atual = dados_finais["custo_total_estimado_site"]
-
-    payback_final_str = formatar_payback(custo_final_atual, dados_finais["economia_mensal_reais"])
-    saldo_kwh_final = dados_finais["geracao_mensal"] - consumo_atual
-
-    st.session_state.res = {
-        "cidade": cidade_atual,
-        "hsp": hsp_atual,
-        "consumo": consumo_atual,
-        "tarifa": tarifa_atual,
-        "custo_final": custo_final_atual,
-        "dados": dados_finais,
-        "payback": payback_final_str,
-        "minimo_kwh": minimo_kwh_atual,
-        "saldo_kwh": saldo_kwh_final
-    }
-
-# 4) Mostrar resultados
-if "res" in st.session_state:
-    R = st.session_state.res
-    dados = R["dados"]
-
-    st.divider()
-    st.subheader(f"✅ Resultados da Simulação — {R['cidade']}")
-
-    col_dl_1, col_dl_2 = st.columns([3, 1])
-    with col_dl_2:
-        st.download_button(
-            label="📩 Baixar Resumo (.txt)",
-            data=gerar_resumo_txt(R, dados),
-            file_name="Resumo_SolarSim.txt",
-            mime="text/plain",
-            use_container_width=True
-        )
-
-    c1, c2, c3 = st.columns(3)
-    with c1:
-        st.metric("Investimento Total Considerado", formatar_reais(R["custo_final"]))
-        st.markdown("**Estimativa de Custos:**")
-        for item, valor in dados["custos_detalhados"].items():
-            st.markdown(f"**- {item}:** {formatar_reais(valor)}")
-
-    with c2:
-        st.metric("Potência do Sistema (Painéis)", f"{dados['potencia_kwp']} kWp")
-        st.metric(
-            "Inversor Recomendado (Tamanho CA)",
-            f"~ {dados['inversor_kw_recomendado']} kW",
-            #help="Este é o tamanho nominal (em CA) do inversor, considerando um 'oversizing' padrão de 125% da potência dos painéis (em CC)."
-        )
-        st.metric("Quantidade de Painéis", f"{dados['numero_paineis']}")
-        st.metric("Área Mínima Necessária", f"{dados['area_m2']} m²")
-
-    with c3:
-        st.metric(
-            "Economia Mensal Bruta",
-            formatar_reais(dados["economia_mensal_reais"]),
-            help="Este é o valor máximo que você pode economizar na tarifa, com base na sua geração e consumo. Sua 'Nova Fatura' considera a taxa mínima obrigatória."
-        )
-
-        saldo_kwh = R["saldo_kwh"]
-        minimo_kwh = R["minimo_kwh"]
-        tarifa = R["tarifa"]
-
-        if saldo_kwh < 0:
-            consumo_rede_kwh = abs(saldo_kwh)
-            kwh_a_pagar = max(consumo_rede_kwh, minimo_kwh)
-            nova_fatura = kwh_a_pagar * tarifa
-            st.metric("Nova Fatura Mensal Estimada", formatar_reais(nova_fatura))
-            st.metric("Consumo restante da Rede", f"{consumo_rede_kwh:.0f} kWh / mês")
-        else:
-            creditos_kwh = saldo_kwh
-            nova_fatura = minimo_kwh * tarifa
-            st.metric(
-                "Nova Fatura (Taxa Mínima)",
-                formatar_reais(nova_fatura),
-                help="Você pagará apenas a Taxa Mínima (Custo de Disponibilidade) da Enel, pois sua geração é maior que o consumo."
-            )
-            st.metric("Créditos Gerados", f"{creditos_kwh:.0f} kWh / mês")
-
-        st.metric("Retorno do Investimento (Payback)", R["payback"])
-
-    st.info(
-        """
-        #### 💡 Qual Tipo de Inversor Escolher?
-        O tamanho acima é uma estimativa da *potência*. Sua maior decisão será o **tipo** de inversor:
-        * **1. Inversor de String (ou Central):**
-            * **O que é:** Uma única "caixa" que gerencia todos os seus painéis juntos.
-            * **Ideal para:** Telhados grandes, sem nenhuma sombra, onde o custo é o principal fator.
-        * **2. Microinversor:**
-            * **O que é:** Vários aparelhos pequenos instalados no telhado, um para cada painel (ou para cada 2 a 4 painéis).
-            * **Ideal para:** Telhados com sombras parciais (de árvores, chaminés, etc.) ou telhados com várias "águas" (diferentes orientações).
-        """
-    )
-
-    st.success(
-        f"🌳 *Benefício Ambiental:* Este sistema evita cerca de **{dados['co2_evitado_kg']:.0f} kg de CO₂/ano** — o equivalente a **{dados['co2_evitado_kg'] / 150:.0f} árvores!**")
-
-    st.subheader("📈 Comparativo Mensal: Consumo x Geração")
-
-    meses = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
-    fator_sazonal_correto = [1.118, 1.223, 1.052, 1.014, 0.912, 0.890, 0.881, 1.014, 0.960, 0.984, 0.918, 1.042]
-
-    geracao_mensal = [dados["geracao_mensal"] * f for f in fator_sazonal_correto]
-
-    domain_ = ["Consumo (kWh)", "Geração Solar (kWh)"]
-    range_ = ["#FF4B4B", "#0068C9"]
-
-    df = pd.DataFrame({
-        "Mês": meses,
-        "Consumo (kWh)": [R["consumo"]] * 12,
-        "Geração Solar (kWh)": geracao_mensal
-    }).melt("Mês", var_name="Categoria", value_name="Energia (kWh)")
-
-    grafico = alt.Chart(df).mark_line(point=True).encode(
-        x=alt.X("Mês", sort=meses),
-        y=alt.Y("Energia (kWh)", title="Energia Mensal (kWh)"),
-        color=alt.Color("Categoria", scale=alt.Scale(domain=domain_, range=range_)),
-        tooltip=["Mês", "Categoria", "Energia (kWh)"]
-    ).properties(height=350, title="📊 Comparativo Mensal: Consumo x Geração Solar")  # .interactive() removido
-
-    st.altair_chart(grafico, use_container_width=True)
-
-    st.info(
-        "💡 **Dica:** A sua geração de energia pode ser maior que o seu consumo! Isso gera créditos de energia que podem ser usados em até 60 meses.")
-
-    with st.expander("📘 Premissas e limitações da simulação"):
-        st.markdown(f"""
-        - *HSP (Horas de Sol Pleno):* média de *{R['hsp']}h/dia* para {R['cidade']}, baseada em dados do CRESESB/SWERA.    
-        - *Taxa de Desempenho (PR):* {int(TAXA_DESEMPENHO * 100)}%.    
-        - *Custo médio do Wp instalado na região:* **{formatar_reais(CUSTO_WP_CAPITAIS[R['cidade']])}/Wp**.    
-        - *Economia Mensal:* calculada sobre a tarifa cheia informada (não considera taxa mínima da distribuidora).    
-        - *Variação sazonal:* Irradiação média varia conforme a mudança climática.  
-        - *Emissão de CO₂ evitada:* fator médio do Sistema Interligado Nacional.
-        - **Cabos e Proteções:** O dimensionamento de cabos (bitola) e disjuntores **NÃO** está incluído. Isso deve ser feito por um engenheiro eletricista qualificado durante a visita técnica, pois depende da distância e das condições específicas da sua residência.
-        """)
-
-    st.subheader("📚 Quer saber mais?")
-    with st.expander("Clique aqui para expandir seus conhecimentos sobre Energia Solar"):
-        st.markdown("#### Como Funciona a Energia Solar (Explicação Simples)")
-        col_vazio_esq, col_video, col_vazio_dir = st.columns([1, 3, 1])
-        with col_video:
-            st.video("https://www.youtube.com/watch?v=nKdq6BHBR0M")
-
-        st.caption("Fonte: Canal Engenharia 360 (YouTube)")
-
-        st.markdown("---")
-
-        st.markdown("#### Como funcionam as Tarifas (Ex: Enel)?")
-        st.markdown(
-            """
-            Sua conta de luz não é um valor único. Ela é composta por duas tarifas principais:
-
-            * **TE (Tarifa de Energia):** O custo da energia elétrica que você de fato consumiu.
-            * **TUSD (Tarifa de Uso do Sistema de Distribuição):** O custo para "transportar" essa energia até sua casa (uso dos postes, fios, etc.).
-
-            Para o cálculo da **economia** com energia solar, consideramos a soma dessas duas, pois o sistema fotovoltaico gera créditos que abatem ambas as faturas.
-
-            **Cuidado:** Você sempre pagará a **Taxa Mínima** (ou "custo de disponibilidade"), que é uma taxa para estar conectado à rede, mesmo que sua geração seja maior que o consumo. Nosso simulador agora calcula sua nova fatura com base nisso.
-            """
-        )
-
-        st.markdown("---")
-
-        st.markdown("*Regulamentação (Lei 14.300 / Geração Distribuída):*")
-        st.markdown("- [**ANEEL** — regras para Micro e Minigeração Distribuída](https://www.gov.br/aneel/pt-br)")
-
-        st.markdown("*Benefícios e Guia do Consumidor:*")
-        st.markdown("- [**CRESESB/CEPEL** — Guia do Consumidor](https://cresesb.cepel.br/)")
-        st.markdown("- [**Portal Solar** — notícias e fornecedores](https://www.portalsolar.com.br/)")
-
-        st.markdown("*Sustentabilidade:*")
-        st.markdown("- [**ABSOLAR** — dados e impacto do setor](https://www.absolar.org.br/)")
-
-
-
+import streamlit as st
+import datetime
+import locale
+import os
+import time
+
+from solarsim.ativos import url_ativo
+from solarsim.cache import CacheResultados, chave_simulacao
+from solarsim.carga import autoconsumo_da_simulacao
+from solarsim.calculos import (
+    CUSTO_WP_CAPITAIS,
+    HSP_CAPITAIS,
+    POTENCIA_PAINEL_WP,
+    TAXA_DESEMPENHO,
+    calcular_nova_fatura,
+    calcular_sistema_solar,
+    estimar_consumo_casa_nova,
+    formatar_prazo_meses,
+    formatar_reais,
+    gerar_resumo_txt,
+    simular,
+)
+from solarsim.fluxo_caixa import TAXA_DESCONTO_ANUAL, resumo_fluxo_caixa
+from solarsim.grafico import montar_grafico_comparativo, montar_grafico_telhado, montar_heatmap_sensibilidade
+from solarsim.inversor import inversor_da_simulacao
+from solarsim.metricas import REGISTRO, Perfil, cronometro, gravar_periodicamente, servir_metricas
+from solarsim.monte_carlo import monte_carlo_da_simulacao
+from solarsim.otimizacao import otimizar_simulacao
+from solarsim.sensibilidade import EIXOS, METRICAS, PARES, GradeSensibilidade, valores_eixo
+from solarsim.telhado import empacotar_agua, retangulo
+
+# --- URLs DAS IMAGENS DE AJUDA (CORRIGIDAS) ---
+# Eu corrigi a ordem das suas URLs. A 520... era da TARIFA. A 005... era do CONSUMO.
+# Servidas de static/ (python -m solarsim.ativos); o GitHub só fica de reserva
+# enquanto os ativos não foram construídos.
+URL_AJUDA_CONSUMO = url_ativo("ajuda_consumo", "https://raw.githubusercontent.com/felipaofelipao/solar-sim-app/refs/heads/main/Imagem%20do%20WhatsApp%20de%202025-11-09%20%C3%A0(s)%2017.36.05_52053dd3.JPG")
+URL_AJUDA_TARIFA = url_ativo("ajuda_tarifa", "https://raw.githubusercontent.com/felipaofelipao/solar-sim-app/refs/heads/main/Imagem%20do%20WhatsApp%20de%202025-11-09%20%C3%A0(s)%2017.36.05_00537b91.JPG")
+
+# --- CONFIGURAÇÃO DA PÁGINA ---
+st.set_page_config(page_title="SolarSim | Simulador Solar", page_icon="☀️", layout="wide")
+inicio_execucao = time.perf_counter()
+
+# --- CACHE DE RESULTADOS (compartilhado entre sessões) ---
+@st.cache_resource
+def obter_cache():
+    """Cria uma única vez o cache de resultados do processo."""
+    return CacheResultados(
+        max_itens=int(os.environ.get("SOLARSIM_CACHE_ITENS", 2048)),
+        ttl_segundos=float(os.environ.get("SOLARSIM_CACHE_TTL", 6 * 3600)),
+        caminho_sqlite=os.environ.get("SOLARSIM_CACHE_SQLITE"),
+        max_linhas_sqlite=int(os.environ.get("SOLARSIM_CACHE_LINHAS", 100_000))
+    )
+
+
+cache = obter_cache()
+if "cache" in st.query_params:
+    st.sidebar.json(cache.estatisticas())
+
+
+# --- MÉTRICAS (endpoint e log opcionais, por variável de ambiente) ---
+@st.cache_resource
+def obter_metricas():
+    """Liga uma única vez as saídas das métricas do processo."""
+    REGISTRO.registrar_medidor("cache", cache.estatisticas)
+    if os.environ.get("SOLARSIM_METRICAS_PORTA"):
+        servir_metricas(int(os.environ["SOLARSIM_METRICAS_PORTA"]))
+    if os.environ.get("SOLARSIM_METRICAS_LOG"):
+        gravar_periodicamente(os.environ["SOLARSIM_METRICAS_LOG"],
+                              float(os.environ.get("SOLARSIM_METRICAS_INTERVALO", 60)))
+    return REGISTRO
+
+
+metricas = obter_metricas()
+metricas.contar("execucoes_completas")
+
+# --- INICIALIZAÇÃO DO SESSION STATE ---
+if "tarifas_list" not in st.session_state:
+    st.session_state.tarifas_list = [0.85]
+if "tarifa_estimada" not in st.session_state:
+    st.session_state.tarifa_estimada = 0.95
+
+# --- CSS GLOBAL PARA FONTES GRANDES (COM CORREÇÃO PARA METRICS) ---
+CSS_APP_STYLE = """
+<style>
+    /* Base: Aumenta a fonte de todo o texto padrão */
+    html, body, [class*="st-"], [data-testid="stAppViewContainer"] { 
+        font-size: 1.15rem; 
+    }
+
+    /* Correção Agressiva para Métricas (Label) */
+    label[data-testid="stMetricLabel"] div { 
+        font-size: 1.15rem !important; 
+        line-height: 1.3 !important; 
+    }
+
+    /* Correção Agressiva para Métricas (Valor) */
+    div[data-testid="stMetricValue"] div { 
+        font-size: 2.25rem !important; 
+    }
+
+    /* Outros Elementos (ajustados para consistência) */
+    [data-testid="stTooltipContent"] p { font-size: 1.1rem; }
+    [data-testid="stExpander"] summary { font-size: 1.25rem; }
+    [data-testid="stInfo"], [data-testid="stSuccess"] { font-size: 1.1rem; }
+</style>
+"""
+st.markdown(CSS_APP_STYLE, unsafe_allow_html=True)
+
+# --- LOCALE (com fallback) ---
+with cronometro("locale"):
+    try:
+        locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
+    except:
+        pass
+
+
+def adicionar_campo_tarifa():
+    """Callback para adicionar um novo campo de tarifa."""
+    st.session_state.tarifas_list.append(0.0)
+
+
+# ========= INTERFACE =========
+# A página é dividida em fragmentos (st.fragment) que rerodam sozinhos: um
+# widget dentro de um fragmento reroda só ele, com as dependências passadas
+# como argumentos. Só o botão Simular (fora dos fragmentos) reroda tudo.
+#   secao_entradas       -> secao_orcamento (aninhado: consumo, tarifa, cidade)
+#   secao_resultados     -> secao_sensibilidade (aninhado)   (res, chave_res)
+#   secao_grafico        (res, chave_res)
+#   secao_conhecimento   (res)
+
+st.title("☀️ SolarSim: Simulador Solar Residencial")
+
+# (Removido o st.info("👀 Dificuldade para ler..."))
+
+st.markdown(
+    "Simule o custo, economia e benefícios ambientais da energia solar. Preencha os campos abaixo para começar!")
+st.divider()
+
+
+@st.fragment
+@cronometro("entradas")
+def secao_entradas():
+    """Modo de simulação, consumo, tarifa, localização e conexão.
+
+    Mexer num destes campos reroda só este fragmento e a prévia do orçamento
+    (aninhada); os resultados e o gráfico ficam como estão até o próximo clique
+    em Simular.
+    """
+    # --- MODO DE SIMULAÇÃO ---
+    st.subheader("1️⃣ Modo de Simulação")
+    modo_simulacao = st.radio(
+        "Como deseja simular?",
+        ("Com base na minha conta de luz (Já moro no local)",
+         "Com base em uma estimativa (Estou construindo)"),
+        horizontal=True,
+        key="modo_simulacao"
+    )
+
+    # 1) Inputs (Consumo e Localização)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("2️⃣ Seus Dados")
+
+        if modo_simulacao == "Com base na minha conta de luz (Já moro no local)":
+
+            consumo = st.number_input(
+                "Consumo médio mensal (kWh):",
+                min_value=50, max_value=10000, value=300, step=10, key="consumo",
+                help=f"""
+                Abra sua conta de luz (Ex: Enel) e procure pelo campo 'Consumo Faturado em kWh' ou 'Total Consumo Mês'.
+
+                **Veja onde encontrar:**
+
+                ![Exemplo Conta de Luz]({URL_AJUDA_CONSUMO})
+                """
+            )
+
+            # --- LÓGICA DE TARIFA ITERATIVA ---
+            help_texto_tarifa = "Some todos os valores de 'Tarifa de Energia (TE)' e 'Tarifa de Uso (TUSD)' da sua conta. Use o botão '+' para adicionar quantos campos precisar."
+
+            st.markdown("**Tarifa de Energia (R$/kWh):**")
+
+            for i in range(len(st.session_state.tarifas_list)):
+                help_tarifa_final = None
+                if i == 0:
+                    help_tarifa_final = f"""
+                    {help_texto_tarifa}
+
+                    **Exemplo de onde encontrar (se tiver conta):**
+
+                    ![Exemplo Conta de Luz]({URL_AJUDA_TARIFA})
+                    """
+
+                st.session_state.tarifas_list[i] = st.number_input(
+                    f"Valor {i + 1} (TE ou TUSD)",
+                    min_value=0.00,
+                    max_value=3.00,
+                    value=st.session_state.tarifas_list[i],
+                    step=0.01,
+                    format="%.2f",
+                    key=f"tarifa_input_{i}",
+                    help=help_tarifa_final
+                )
+
+            st.button(
+                "Adicionar outro valor (+)",
+                key="add_tarifa",
+                on_click=adicionar_campo_tarifa
+            )
+
+            tarifa_calculada = sum(st.session_state.tarifas_list)
+            st.info(f"Sua Tarifa Total: **{formatar_reais(tarifa_calculada)} / kWh**")
+
+        else:  # --- MODO "ESTOU CONSTRUINDO" ---
+            st.markdown("Preencha os dados da sua futura casa:")
+            c_pessoas = st.number_input("Quantas pessoas vão morar?", min_value=1, value=3, step=1, key="c_pessoas")
+            c_chuveiros = st.number_input("Quantos chuveiros elétricos?", min_value=0, value=1, step=1, key="c_chuveiros")
+            c_ar = st.number_input("Quantos aparelhos de ar condicionado?", min_value=0, value=1, step=1, key="c_ar")
+            c_freezer = st.number_input("Quantos freezers (além da geladeira)?", min_value=0, value=0, step=1,
+                                        key="c_freezer")
+            c_home_office = st.number_input("Pessoas em home office (uso intenso de PC)?", min_value=0, value=0, step=1,
+                                            key="c_home_office")
+
+            consumo = estimar_consumo_casa_nova(c_pessoas, c_chuveiros, c_ar, c_freezer, c_home_office)
+            st.info(f"Seu consumo estimado é de **{consumo} kWh/mês**.")
+
+            # --- LÓGICA DE TARIFA ÚNICA ---
+            tarifa_calculada = st.number_input(
+                "Tarifa de energia (R$/kWh):",
+                min_value=0.30,
+                max_value=3.00,
+                value=st.session_state.tarifa_estimada,
+                step=0.01,
+                format="%.2f",
+                key="tarifa_estimada",
+                help="Valor médio da tarifa (TE + TUSD). Usamos R$ 0,95 como padrão para Rio das Ostras."
+            )
+
+    with col2:
+        st.subheader("3️⃣ Sua Localização")
+        cidades_ordenadas = sorted(HSP_CAPITAIS.keys())
+
+        cidade_selecionada = st.selectbox(
+            "Localização da Simulação:",
+            cidades_ordenadas,
+            index=0,
+            key="cidade",
+            disabled=True
+        )
+
+        st.markdown("---")
+        st.subheader("Tipo de Conexão (Enel)")
+        tipo_conexao = st.selectbox(
+            "Qual sua conexão com a rede?",
+            ("Monofásica (Taxa Mínima 30 kWh)",
+             "Bifásica (Taxa Mínima 50 kWh)",
+             "Trifásica (Taxa Mínima 100 kWh)"),
+            index=1,  # Padrão para Bifásica
+            key="tipo_conexao",
+            help="Isso define a taxa mínima (custo de disponibilidade) que você sempre pagará, mesmo gerando 100% da sua energia."
+        )
+
+    secao_orcamento(consumo, tarifa_calculada, cidade_selecionada)
+
+
+@st.fragment
+@cronometro("orcamento")
+def secao_orcamento(consumo, tarifa_calculada, cidade_selecionada):
+    """Prévia do orçamento: depende só de consumo, tarifa e cidade (os argumentos)."""
+    # Cálculo temporário
+    hsp = HSP_CAPITAIS[cidade_selecionada]
+    custo_wp = CUSTO_WP_CAPITAIS[cidade_selecionada]
+
+    def dimensionar():
+        with cronometro("calcular_sistema_solar"):
+            return calcular_sistema_solar(consumo, tarifa_calculada, hsp, custo_wp)
+
+    resultados_tmp = cache.obter_ou_calcular(
+        chave_simulacao("dimensionamento", consumo, tarifa_calculada, cidade_selecionada), dimensionar
+    )
+
+    # 2) Orçamento
+    st.divider()
+    st.subheader("4️⃣ Orçamento e Investimento")
+    col_orc, col_val = st.columns(2)
+    with col_orc:
+        escolha_orcamento = st.radio("Como deseja inserir o valor do investimento?",
+                                     ('Usar Orçamento Médio do SolarSim', 'Inserir meu Orçamento Personalizado'),
+                                     index=0, key="escolha_orc")
+    with col_val:
+        if escolha_orcamento == 'Inserir meu Orçamento Personalizado':
+            custo_final = st.number_input("Valor Total do Orçamento (R$):",
+                                          min_value=1000.00,
+                                          value=float(round(resultados_tmp["custo_total_estimado_site"], -2)),
+                                          step=100.00, format="%.2f", key="custo_pers")
+        else:
+            st.markdown("*Estimativa SolarSim (baseada no seu consumo):*")
+            st.info(formatar_reais(resultados_tmp["custo_total_estimado_site"]))
+            custo_final = resultados_tmp["custo_total_estimado_site"]
+
+
+@st.fragment
+@cronometro("resultados")
+def secao_resultados(R, chave_res):
+    """Métricas, fluxo de caixa, faixas de incerteza, tamanho ótimo e sensibilidade."""
+    dados = R["dados"]
+
+    st.divider()
+    st.subheader(f"✅ Resultados da Simulação — {R['cidade']}")
+
+    with cronometro("gerar_resumo_txt"):
+        resumo_txt = gerar_resumo_txt(R, dados)
+
+    col_dl_1, col_dl_2 = st.columns([3, 1])
+    with col_dl_2:
+        st.download_button(
+            label="📩 Baixar Resumo (.txt)",
+            data=resumo_txt,
+            file_name="Resumo_SolarSim.txt",
+            mime="text/plain",
+            on_click="ignore",
+            width="stretch"
+        )
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.metric("Investimento Total Considerado", formatar_reais(R["custo_final"]))
+        st.markdown("**Estimativa de Custos:**")
+        for item, valor in dados["custos_detalhados"].items():
+            st.markdown(f"**- {item}:** {formatar_reais(valor)}")
+
+    with c2:
+        st.metric("Potência do Sistema (Painéis)", f"{dados['potencia_kwp']} kWp")
+        st.metric(
+            "Inversor Recomendado (Tamanho CA)",
+            f"~ {dados['inversor_kw_recomendado']} kW",
+            #help="Este é o tamanho nominal (em CA) do inversor, considerando um 'oversizing' padrão de 125% da potência dos painéis (em CC)."
+        )
+        with st.expander("Inversor pelo modelo horário", key="expander_inversor",
+                         on_change="rerun") as expander_inversor:
+            if expander_inversor.open:
+                inversor = cache.obter_ou_calcular(chave_res + "|inversor", lambda: inversor_da_simulacao(R))
+                st.caption(
+                    f"**{inversor['inversor_kw']:.2f} kW** (razão CC/CA de {inversor['razao_cc_ca']:.2f}, "
+                    f"com {inversor['corte_percentual']:.1f}% da energia cortada nos picos) é o tamanho "
+                    "que mais gera por real investido."
+                )
+        st.metric("Quantidade de Painéis", f"{dados['numero_paineis']}")
+        st.metric("Área Mínima Necessária", f"{dados['area_m2']} m²")
+
+    with c3:
+        st.metric(
+            "Economia Mensal Bruta",
+            formatar_reais(dados["economia_mensal_reais"]),
+            help="Este é o valor máximo que você pode economizar na tarifa, com base na sua geração e consumo. Sua 'Nova Fatura' considera a taxa mínima obrigatória."
+        )
+
+        saldo_kwh = R["saldo_kwh"]
+        minimo_kwh = R["minimo_kwh"]
+        tarifa = R["tarifa"]
+
+        if saldo_kwh < 0:
+            consumo_rede_kwh = abs(saldo_kwh)
+            nova_fatura = calcular_nova_fatura(saldo_kwh, minimo_kwh, tarifa)
+            st.metric("Nova Fatura Mensal Estimada", formatar_reais(nova_fatura))
+            st.metric("Consumo restante da Rede", f"{consumo_rede_kwh:.0f} kWh / mês")
+        else:
+            creditos_kwh = saldo_kwh
+            nova_fatura = calcular_nova_fatura(saldo_kwh, minimo_kwh, tarifa)
+            st.metric(
+                "Nova Fatura (Taxa Mínima)",
+                formatar_reais(nova_fatura),
+                help="Você pagará apenas a Taxa Mínima (Custo de Disponibilidade) da Enel, pois sua geração é maior que o consumo."
+            )
+            st.metric("Créditos Gerados", f"{creditos_kwh:.0f} kWh / mês")
+
+        st.metric("Retorno do Investimento (Payback)", R["payback"])
+
+    st.subheader("💰 Fluxo de Caixa em 25 Anos")
+    # O Fio B depende do ano de início: o ano entra na chave, senão o cache em
+    # SQLite serviria o fluxo do ano anterior depois de 1º de janeiro
+    ano_inicio = datetime.date.today().year
+    parametros_fluxo = {"ano_inicio": ano_inicio}
+    if R.get("casa") is not None:
+        # Casa nova: autoconsumo pelo perfil horário de carga, não pela fração fixa
+        parametros_fluxo["autoconsumo_simultaneo"] = cache.obter_ou_calcular(
+            chave_res + "|autoconsumo", lambda: autoconsumo_da_simulacao(R)
+        )
+    fluxo = cache.obter_ou_calcular(f"{chave_res}|fluxo|{ano_inicio}",
+                                    lambda: resumo_fluxo_caixa(R, **parametros_fluxo))
+    f1, f2, f3 = st.columns(3)
+    with f1:
+        st.metric(
+            "Payback Real",
+            formatar_prazo_meses(fluxo["payback_meses"]),
+            help="Considera reajuste da tarifa, degradação dos painéis, a regra do Fio B (Lei 14.300), a taxa mínima e a validade de 60 meses dos créditos."
+        )
+    with f2:
+        st.metric(
+            "Valor Presente Líquido (VPL)",
+            formatar_reais(fluxo["vpl"]),
+            help=f"Economias de 25 anos trazidas a valor presente com taxa de {TAXA_DESCONTO_ANUAL:.0%} ao ano, menos o investimento."
+        )
+    with f3:
+        tir = fluxo["tir_anual"]
+        st.metric("Taxa Interna de Retorno (TIR)", f"{tir:.1%} ao ano" if tir == tir else "Não aplicável")
+
+    # on_change="rerun": os extras abaixo só são calculados com o expander aberto
+    with st.expander("🎲 Faixa de Incerteza (Monte Carlo)", key="expander_monte_carlo",
+                     on_change="rerun") as expander_monte_carlo:
+        if expander_monte_carlo.open:
+            secao_monte_carlo(R, chave_res)
+
+    with st.expander("🎯 Tamanho Ótimo (Maior VPL)", key="expander_otimo",
+                     on_change="rerun") as expander_otimo:
+        if expander_otimo.open:
+            secao_otimo(R, chave_res, fluxo, parametros_fluxo)
+
+    secao_sensibilidade(R, chave_res)
+    secao_telhado(R, chave_res)
+
+    st.info(
+        """
+        #### 💡 Qual Tipo de Inversor Escolher?
+        O tamanho acima é uma estimativa da *potência*. Sua maior decisão será o **tipo** de inversor:
+        * **1. Inversor de String (ou Central):**
+            * **O que é:** Uma única "caixa" que gerencia todos os seus painéis juntos.
+            * **Ideal para:** Telhados grandes, sem nenhuma sombra, onde o custo é o principal fator.
+        * **2. Microinversor:**
+            * **O que é:** Vários aparelhos pequenos instalados no telhado, um para cada painel (ou para cada 2 a 4 painéis).
+            * **Ideal para:** Telhados com sombras parciais (de árvores, chaminés, etc.) ou telhados com várias "águas" (diferentes orientações).
+        """
+    )
+
+    st.success(
+        f"🌳 *Benefício Ambiental:* Este sistema evita cerca de **{dados['co2_evitado_kg']:.0f} kg de CO₂/ano** — o equivalente a **{dados['co2_evitado_kg'] / 150:.0f} árvores!**")
+
+
+def secao_monte_carlo(R, chave_res):
+    """Conteúdo do expander do Monte Carlo (calculado só com ele aberto)."""
+    faixa = cache.obter_ou_calcular(chave_res + "|monte_carlo", lambda: monte_carlo_da_simulacao(R))
+    n_cenarios = f"{faixa['n_amostras']:,}".replace(",", ".")
+    st.markdown(
+        f"Simulamos **{n_cenarios}** cenários variando HSP, desempenho, tarifa e custo do Wp. "
+        "Em 80% deles o resultado fica entre os valores *pessimista* e *otimista*."
+    )
+    p1, p2, p3 = st.columns(3)
+    for coluna, rotulo, geracao, economia, payback in (
+        (p1, "Pessimista", "p10", "p10", "p90"),
+        (p2, "Provável", "p50", "p50", "p50"),
+        (p3, "Otimista", "p90", "p90", "p10"),
+    ):
+        with coluna:
+            st.markdown(f"**{rotulo}**")
+            st.markdown(f"- Geração: {faixa['geracao_mensal'][geracao]:.0f} kWh/mês")
+            st.markdown(f"- Economia: {formatar_reais(faixa['economia_mensal_reais'][economia])}/mês")
+            st.markdown(f"- Payback simples: {formatar_prazo_meses(faixa['payback_anos'][payback] * 12)}")
+    st.caption(
+        "Payback simples = investimento ÷ economia anual. Ele não considera reajuste da tarifa, "
+        "degradação dos painéis nem o Fio B, e por isso é diferente do Payback Real acima."
+    )
+
+
+def secao_otimo(R, chave_res, fluxo, parametros_fluxo):
+    """Conteúdo do expander do tamanho ótimo (calculado só com ele aberto)."""
+    otimo = cache.obter_ou_calcular(f"{chave_res}|otimo|{parametros_fluxo['ano_inicio']}",
+                                    lambda: otimizar_simulacao(R, **parametros_fluxo))
+    orcamento = R.get("orcamento")
+    if otimo["numero_paineis"] == 0:
+        if orcamento is not None and orcamento < POTENCIA_PAINEL_WP * CUSTO_WP_CAPITAIS[R["cidade"]]:
+            st.markdown("Seu orçamento não paga nem um painel: não há sistema viável dentro dele.")
+        else:
+            st.markdown("Com esta tarifa e este consumo, nenhum tamanho de sistema tem VPL positivo.")
+        return
+    limite = " dentro do seu orçamento" if orcamento is not None and otimo["orcamento"] <= orcamento else ""
+    st.markdown(
+        f"O maior VPL{limite} vem de **{otimo['numero_paineis']:.0f} painéis** "
+        f"({otimo['potencia_kwp']:.2f} kWp, investimento de {formatar_reais(otimo['orcamento'])}). "
+        "Acima disso, a geração passa do consumo acima da taxa mínima e sobra em créditos."
+    )
+    o1, o2, o3 = st.columns(3)
+    o1.metric("VPL no Tamanho Ótimo", formatar_reais(otimo["vpl"]),
+              delta=formatar_reais(otimo["vpl"] - fluxo["vpl"]))
+    o2.metric("Payback Real", formatar_prazo_meses(otimo["payback_meses"]))
+    tir_otima = otimo["tir_anual"]
+    o3.metric("TIR", f"{tir_otima:.1%} ao ano" if tir_otima == tir_otima else "Não aplicável")
+
+
+@st.fragment
+@cronometro("sensibilidade")
+def secao_sensibilidade(R, chave_res):
+    """Heatmap de sensibilidade: os sliders rerodam só este fragmento."""
+    with st.expander("🔥 Sensibilidade: e se a tarifa ou o consumo mudarem?"):
+        rotulos_pares = {"Tarifa × Consumo": "tarifa_consumo", "HSP × Custo do Wp": "hsp_custo_wp"}
+        par = rotulos_pares[st.radio("Comparar", list(rotulos_pares), horizontal=True, key="sens_par")]
+        metrica = st.selectbox("Métrica", list(METRICAS), format_func=METRICAS.get, key="sens_metrica")
+        base = {"consumo": R["consumo"], "tarifa": R["tarifa"], "hsp": R["hsp"],
+                "custo_wp": CUSTO_WP_CAPITAIS[R["cidade"]]}
+
+        def arredondar_passo(valor, passo):
+            return round(round(valor / passo) * passo, 2)
+
+        # (mínimo, máximo, passo da malha, faixa inicial) de cada eixo
+        faixas = {
+            "tarifa": (0.30, 2.50, 0.05, (base["tarifa"] * 0.7, base["tarifa"] * 1.5)),
+            "consumo": (50, 3000, 25, (base["consumo"] * 0.5, base["consumo"] * 2)),
+            "hsp": (3.0, 7.0, 0.1, (base["hsp"] - 1, base["hsp"] + 1)),
+            "custo_wp": (1.5, 5.0, 0.1, (base["custo_wp"] * 0.7, base["custo_wp"] * 1.3)),
+        }
+        eixos = {}
+        for eixo in PARES[par]:
+            minimo, maximo, passo, (inicial_min, inicial_max) = faixas[eixo]
+            inicial = (max(minimo, arredondar_passo(inicial_min, passo)),
+                       min(maximo, arredondar_passo(inicial_max, passo)))
+            eixos[eixo] = st.slider(EIXOS[eixo], minimo, maximo, inicial, step=passo, key=f"sens_{eixo}")
+        eixo_x, eixo_y = PARES[par]
+
+        # Uma grade por par, guardada na sessão: mexer num slider recalcula só o eixo dele
+        grades = st.session_state.setdefault("grades_sensibilidade", {})
+        if grades.get("chave_res") != chave_res:
+            grades.clear()
+            grades["chave_res"] = chave_res
+        if par not in grades:
+            grades[par] = GradeSensibilidade(base, eixo_x, eixo_y, R.get("orcamento"))
+
+        def montar_heatmap():
+            valores_x = valores_eixo(*eixos[eixo_x], faixas[eixo_x][2])
+            valores_y = valores_eixo(*eixos[eixo_y], faixas[eixo_y][2])
+            grade = grades[par].atualizar(valores_x, valores_y)
+            return montar_heatmap_sensibilidade(
+                valores_x, valores_y, grade[metrica], EIXOS[eixo_x], EIXOS[eixo_y], METRICAS[metrica],
+                ponto_atual=(base[eixo_x], base[eixo_y]), menor_melhor=metrica in ("payback_anos", "custo_final")
+            ).to_dict()
+
+        chave_heatmap = f"{chave_res}|sensibilidade|{par}|{metrica}|{eixos[eixo_x]}|{eixos[eixo_y]}"
+        st.vega_lite_chart(cache.obter_ou_calcular(chave_heatmap, montar_heatmap), width="stretch")
+
+
+@st.fragment
+@cronometro("telhado")
+def secao_telhado(R, chave_res):
+    """Quantos painéis cabem numa água retangular, com recuo das bordas."""
+    with st.expander("📐 Cabe no meu telhado?"):
+        st.markdown("Informe as medidas de uma água do telhado (a parte que recebe sol) e o recuo exigido nas bordas.")
+        t1, t2, t3, t4 = st.columns(4)
+        largura = t1.number_input("Largura no beiral (m)", 1.0, 60.0, 8.0, step=0.5, key="telhado_largura")
+        comprimento = t2.number_input("Comprimento no caimento (m)", 1.0, 30.0, 5.0, step=0.5, key="telhado_comprimento")
+        aguas = t3.number_input("Águas iguais", 1, 4, 1, key="telhado_aguas")
+        recuo = t4.number_input("Recuo das bordas (m)", 0.0, 2.0, 0.3, step=0.1, key="telhado_recuo")
+
+        # O empacotamento leva ~1 ms; só o spec do gráfico (JSON) vai para o cache
+        vertices = retangulo(largura, comprimento)
+        resultado = empacotar_agua(vertices, recuo=recuo)
+        necessarios = int(R["dados"]["numero_paineis"])
+        cabem = resultado["paineis"] * aguas
+
+        c1, c2 = st.columns(2)
+        c1.metric("Painéis que Cabem", f"{cabem}",
+                  help=f"{resultado['retrato']} em retrato e {resultado['paisagem']} em paisagem por água, "
+                       "em fileiras paralelas ao beiral.")
+        c2.metric("Painéis do Sistema", f"{necessarios}", delta=f"{cabem - necessarios:+d} de folga")
+        if cabem < necessarios:
+            st.warning("O sistema não cabe nessas águas. Considere módulos de maior potência ou outras águas do telhado.")
+        if resultado["paineis"]:
+            chave_grafico = f"{chave_res}|telhado|{largura}|{comprimento}|{recuo}"
+            st.vega_lite_chart(cache.obter_ou_calcular(chave_grafico, lambda: montar_grafico_telhado(
+                vertices, resultado["modulos"], f"📐 {resultado['paineis']} painéis por água"
+            ).to_dict()), width="stretch")
+
+
+@st.fragment
+@cronometro("grafico")
+def secao_grafico(R, chave_res):
+    """Comparativo mensal de consumo e geração."""
+    st.subheader("📈 Comparativo Mensal: Consumo x Geração")
+
+    # O spec (JSON) do gráfico vai para o cache: num acerto, nem pandas nem altair são usados
+    def montar_espec():
+        grafico = montar_grafico_comparativo(R["consumo"], R["dados"]["geracao_mensal"])
+        with cronometro("grafico_spec"):
+            return grafico.to_dict()
+
+    espec_grafico = cache.obter_ou_calcular(chave_res + "|grafico", montar_espec)
+    st.vega_lite_chart(espec_grafico, width="stretch")
+
+    st.info(
+        "💡 **Dica:** A sua geração de energia pode ser maior que o seu consumo! Isso gera créditos de energia que podem ser usados em até 60 meses.")
+
+
+@st.fragment
+@cronometro("conhecimento")
+def secao_conhecimento(R):
+    """Premissas da simulação e material para saber mais."""
+    with st.expander("📘 Premissas e limitações da simulação"):
+        st.markdown(f"""
+        - *HSP (Horas de Sol Pleno):* média de *{R['hsp']}h/dia* para {R['cidade']}, baseada em dados do CRESESB/SWERA.    
+        - *Taxa de Desempenho (PR):* {int(TAXA_DESEMPENHO * 100)}%.    
+        - *Custo médio do Wp instalado na região:* **{formatar_reais(CUSTO_WP_CAPITAIS[R['cidade']])}/Wp**.    
+        - *Economia Mensal:* calculada sobre a tarifa cheia informada (não considera taxa mínima da distribuidora).    
+        - *Variação sazonal:* Irradiação média varia conforme a mudança climática.  
+        - *Emissão de CO₂ evitada:* fator médio do Sistema Interligado Nacional.
+        - **Cabos e Proteções:** O dimensionamento de cabos (bitola) e disjuntores **NÃO** está incluído. Isso deve ser feito por um engenheiro eletricista qualificado durante a visita técnica, pois depende da distância e das condições específicas da sua residência.
+        """)
+
+    st.subheader("📚 Quer saber mais?")
+    # on_change="rerun": o conteúdo só roda com o expander aberto, e o iframe do
+    # YouTube (e seus scripts) só é carregado quando alguém abre
+    with st.expander("Clique aqui para expandir seus conhecimentos sobre Energia Solar",
+                     key="expander_conhecimento", on_change="rerun") as expander_conhecimento:
+        if not expander_conhecimento.open:
+            return
+        st.markdown("#### Como Funciona a Energia Solar (Explicação Simples)")
+        col_vazio_esq, col_video, col_vazio_dir = st.columns([1, 3, 1])
+        with col_video:
+            st.video("https://www.youtube.com/watch?v=nKdq6BHBR0M")
+
+        st.caption("Fonte: Canal Engenharia 360 (YouTube)")
+
+        st.markdown("---")
+
+        st.markdown("#### Como funcionam as Tarifas (Ex: Enel)?")
+        st.markdown(
+            """
+            Sua conta de luz não é um valor único. Ela é composta por duas tarifas principais:
+
+            * **TE (Tarifa de Energia):** O custo da energia elétrica que você de fato consumiu.
+            * **TUSD (Tarifa de Uso do Sistema de Distribuição):** O custo para "transportar" essa energia até sua casa (uso dos postes, fios, etc.).
+
+            Para o cálculo da **economia** com energia solar, consideramos a soma dessas duas, pois o sistema fotovoltaico gera créditos que abatem ambas as faturas.
+
+            **Cuidado:** Você sempre pagará a **Taxa Mínima** (ou "custo de disponibilidade"), que é uma taxa para estar conectado à rede, mesmo que sua geração seja maior que o consumo. Nosso simulador agora calcula sua nova fatura com base nisso.
+            """
+        )
+
+        st.markdown("---")
+
+        st.markdown("*Regulamentação (Lei 14.300 / Geração Distribuída):*")
+        st.markdown("- [**ANEEL** — regras para Micro e Minigeração Distribuída](https://www.gov.br/aneel/pt-br)")
+
+        st.markdown("*Benefícios e Guia do Consumidor:*")
+        st.markdown("- [**CRESESB/CEPEL** — Guia do Consumidor](https://cresesb.cepel.br/)")
+        st.markdown("- [**Portal Solar** — notícias e fornecedores](https://www.portalsolar.com.br/)")
+
+        st.markdown("*Sustentabilidade:*")
+        st.markdown("- [**ABSOLAR** — dados e impacto do setor](https://www.absolar.org.br/)")
+
+
+# ========= EXECUÇÃO =========
+# O corpo da página roda dentro de try/finally: uma exceção (inclusive as de
+# st.rerun/st.stop) não deixa o perfil ligado nem a execução sem métrica.
+# --- PERFIL DE UMA EXECUÇÃO (?perfil na URL, só nesta sessão) ---
+perfil = None
+if "perfil" in st.query_params:
+    try:
+        perfil = Perfil().iniciar()
+    except ValueError:
+        st.sidebar.warning("Outro perfil está em andamento; tente de novo em instantes.")
+
+relatorio = None
+try:
+    secao_entradas()
+
+    # 3) Botão Calcular
+    if st.button("⚡ Simular meu sistema solar", type="primary", width="stretch", key="simular"):
+
+        if st.session_state.modo_simulacao == "Com base na minha conta de luz (Já moro no local)":
+            consumo_atual = st.session_state.consumo
+            tarifa_atual = sum(st.session_state.tarifas_list)
+            casa_atual = None
+        else:
+            casa_atual = (
+                st.session_state.c_pessoas,
+                st.session_state.c_chuveiros,
+                st.session_state.c_ar,
+                st.session_state.c_freezer,
+                st.session_state.c_home_office
+            )
+            consumo_atual = estimar_consumo_casa_nova(*casa_atual)
+            tarifa_atual = st.session_state.tarifa_estimada
+
+        cidade_atual = st.session_state.cidade
+        conexao_atual = st.session_state.tipo_conexao
+        if st.session_state.escolha_orc == 'Inserir meu Orçamento Personalizado':
+            orcamento_atual = st.session_state.custo_pers
+        else:
+            orcamento_atual = None
+
+        chave_res = chave_simulacao("simulacao", consumo_atual, tarifa_atual, cidade_atual, conexao_atual,
+                                    orcamento_atual, casa_atual)
+        st.session_state.res = cache.obter_ou_calcular(
+            chave_res,
+            lambda: {**simular(consumo_atual, tarifa_atual, cidade_atual, conexao_atual, orcamento_atual),
+                     "casa": casa_atual}
+        )
+        st.session_state.chave_res = chave_res
+
+    # 4) Mostrar resultados
+    if "res" in st.session_state:
+        secao_resultados(st.session_state.res, st.session_state.chave_res)
+        secao_grafico(st.session_state.res, st.session_state.chave_res)
+        secao_conhecimento(st.session_state.res)
+finally:
+    # Tempo da execução completa (os fragmentos, quando rerodam sozinhos, têm as próprias etapas)
+    metricas.observar("pagina", (time.perf_counter() - inicio_execucao) * 1000)
+    if perfil is not None:
+        relatorio = perfil.parar()
+
+if "metricas" in st.query_params:
+    st.sidebar.json(metricas.instantaneo(), expanded=False)
+if relatorio is not None:
+    with st.sidebar.expander(f"⏱️ Perfil desta execução ({perfil.ferramenta})"):
+        st.download_button("Baixar relatório", relatorio, file_name="perfil_solarsim.txt", on_click="ignore")
+        st.code(relatorio, language=None)
@@ -0,0 +1,123 @@
+"""API local: mesmas regras de entrada em /simular e /simular/lote, e cabeçalhos HTTP."""
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from solarsim.api import (
+    CIDADE_PADRAO,
+    MAXIMO_CONSUMO,
+    MAXIMO_ORCAMENTO,
+    MAXIMO_TARIFA,
+    ErroRequisicao,
+    ServicoSimulacao,
+    _coluna_conexao,
+    simular_json,
+    simular_lote_json,
+)
+
+
+def _lote(propostas):
+    return json.loads(simular_lote_json(json.dumps({"propostas": propostas})))["propostas"]
+
+
+@pytest.mark.parametrize("conexao, minimo", [
+    (3, 100), ("3", 100), (3.0, 100), ("trifasica", 100), ("Trifásica", 100),
+    (1, 30), ("Monofásica", 30), (2, 50), ("Bifásica", 50), (None, 50),
+])
+def test_simular_e_lote_usam_a_mesma_conexao(conexao, minimo):
+    item = {"consumo": 300, "tarifa": 1, "conexao": conexao}
+    avulsa = simular_json(item)
+    linha, = _lote([item])
+    assert avulsa["minimo_kwh"] == linha["minimo_kwh"] == minimo
+    assert avulsa["nova_fatura"] == pytest.approx(linha["nova_fatura"])
+
+
+def test_lote_misto_com_conexao_ausente():
+    propostas = [
+        {"consumo": 300, "tarifa": 1, "conexao": 3},
+        {"consumo": 300, "tarifa": 1},
+        {"consumo": 300, "tarifa": 1, "conexao": 1},
+    ]
+    assert pd.DataFrame.from_records(propostas)["conexao"].dtype == "float64"
+    assert [linha["minimo_kwh"] for linha in _lote(propostas)] == [100, 50, 30]
+    assert [simular_json(p)["minimo_kwh"] for p in propostas] == [100, 50, 30]
+
+
+def test_coluna_conexao_devolve_inteiros_como_texto():
+    tabela = pd.DataFrame({"conexao": [3.0, None, 1.0, 2.5]})
+    assert _coluna_conexao(tabela).tolist() == ["3", "Bifásica", "1", "2.5"]
+    tabela = pd.DataFrame({"conexao": ["Trifásica", 3, None, True]})
+    assert _coluna_conexao(tabela).tolist() == ["Trifásica", "3", "Bifásica", "True"]
+
+
+def test_entradas_invalidas():
+    with pytest.raises(ErroRequisicao):
+        simular_json({"consumo": 0, "tarifa": 1})
+    with pytest.raises(ErroRequisicao):
+        simular_json({"consumo": 300, "tarifa": 1, "cidade": "Atlântida"})
+    with pytest.raises(ErroRequisicao, match="Proposta 1"):
+        _lote([{"consumo": 300, "tarifa": 1}, {"consumo": "muito", "tarifa": 1}])
+    assert simular_lote_json(json.dumps({"propostas": []})) == b'{"propostas":[]}'
+
+
+@pytest.mark.parametrize("item", [
+    {"consumo": 1e308, "tarifa": 1},
+    {"consumo": MAXIMO_CONSUMO + 1, "tarifa": 1},
+    {"consumo": 300, "tarifa": MAXIMO_TARIFA * 2},
+    {"consumo": 300, "tarifa": 1, "orcamento": 1e300},
+    {"consumo": 300, "tarifa": 1, "cidade": ["a"]},
+    {"consumo": 300, "tarifa": 1, "cidade": 3},
+])
+def test_simular_e_lote_recusam_a_mesma_entrada(item):
+    with pytest.raises(ErroRequisicao) as avulsa:
+        simular_json(item)
+    with pytest.raises(ErroRequisicao, match="Proposta 1") as lote:
+        _lote([{"consumo": 300, "tarifa": 1}, item])
+    assert avulsa.value.status == lote.value.status == 400
+
+
+def test_limites_sao_aceitos():
+    item = {"consumo": MAXIMO_CONSUMO, "tarifa": MAXIMO_TARIFA, "orcamento": MAXIMO_ORCAMENTO}
+    avulsa = simular_json(item)
+    linha, = _lote([item])
+    assert avulsa["dados"]["numero_paineis"] == linha["numero_paineis"] > 0
+
+
+def test_cidade_nula_e_a_padrao_nos_dois():
+    item = {"consumo": 300, "tarifa": 1, "cidade": None}
+    assert simular_json(item)["cidade"] == CIDADE_PADRAO
+    assert [linha["cidade"] for linha in _lote([item, {"consumo": 300, "tarifa": 1}])] == [CIDADE_PADRAO] * 2
+
+
+async def _requisicao(cabecalhos, corpo=""):
+    servico = ServicoSimulacao(processos=1)
+    servidor = await servico.iniciar("127.0.0.1", 0)
+    try:
+        porta = servidor.sockets[0].getsockname()[1]
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+        escritor.write(f"POST /simular HTTP/1.1\r\nHost: x\r\n{cabecalhos}\r\n{corpo}".encode("latin-1"))
+        await escritor.drain()
+        resposta = await asyncio.wait_for(leitor.read(), 5)
+        escritor.close()
+        return resposta
+    finally:
+        servidor.close()
+        await servidor.wait_closed()
+        servico.fechar()
+
+
+@pytest.mark.parametrize("tamanho", ["abc", "-1", "1.5", "²"])
+def test_content_length_invalido_responde_400(tamanho):
+    resposta = asyncio.run(_requisicao(f"Content-Length: {tamanho}\r\n"))
+    cabecalho, _, corpo = resposta.partition(b"\r\n\r\n")
+    assert cabecalho.startswith(b"HTTP/1.1 400 ")
+    assert b"Connection: close" in cabecalho
+    assert "Content-Length" in json.loads(corpo)["erro"]
+
+
+def test_content_length_valido():
+    corpo = json.dumps({"consumo": 300, "tarifa": 1})
+    resposta = asyncio.run(_requisicao(f"Content-Length: {len(corpo)}\r\nConnection: close\r\n", corpo))
+    assert resposta.startswith(b"HTTP/1.1 200 ")
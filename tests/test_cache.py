@@ -0,0 +1,86 @@
+"""Cache de resultados: chave canônica, LRU, TTL e o nível em SQLite."""
+import sqlite3
+
+import pytest
+
+from solarsim import cache as modulo_cache
+from solarsim.cache import CacheResultados, chave_simulacao
+
+
+class Relogio:
+    def __init__(self, agora=1_000_000.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(modulo_cache.time, "time", relogio)
+    return relogio
+
+
+def _linhas(caminho):
+    with sqlite3.connect(caminho) as banco:
+        return [linha[0] for linha in banco.execute("SELECT chave FROM resultados ORDER BY criado")]
+
+
+def test_chave_canonica():
+    assert chave_simulacao("s", 300, 0.4 + 0.45, "X", "Bifásica") == chave_simulacao("s", 300.0, 0.85, "X", "Bifásica")
+    assert chave_simulacao("s", 300, 0.85, "X", "Bifásica") != chave_simulacao("s", 300, 0.85, "X", "Trifásica")
+    assert chave_simulacao("s", 300, 0.85, "X") != chave_simulacao("s", 300, 0.85, "X", orcamento=10_000)
+    assert chave_simulacao("s", 300, 0.85, "X") != chave_simulacao("s", 300, 0.85, "X", casa=(3, 1, 1, 0, 0))
+    assert chave_simulacao("s", 300, 0.85, "X", casa=(3, 1, 1, 0, 0)) == chave_simulacao(
+        "s", 300, 0.85, "X", casa=[3, 1, 1, 0, 0])
+
+
+def test_lru_despeja_o_menos_usado(relogio):
+    cache = CacheResultados(max_itens=2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obter("a") == 1
+    cache.guardar("c", 3)
+    assert cache.obter("b") is None
+    assert (cache.obter("a"), cache.obter("c")) == (1, 3)
+    assert cache.estatisticas()["despejos"] == 1
+
+
+def test_ttl_na_memoria(relogio):
+    cache = CacheResultados(ttl_segundos=10)
+    cache.guardar("a", 1)
+    relogio.agora += 11
+    assert cache.obter("a", "ausente") == "ausente"
+    assert cache.obter_ou_calcular("a", lambda: 2) == 2
+
+
+def test_sqlite_sobrevive_a_nova_instancia(tmp_path, relogio):
+    caminho = str(tmp_path / "cache.sqlite")
+    CacheResultados(caminho_sqlite=caminho).guardar("a", {"x": [1, 2]})
+    novo = CacheResultados(caminho_sqlite=caminho)
+    assert novo.obter("a") == {"x": [1, 2]}
+    assert novo.estatisticas()["acertos_disco"] == 1
+
+
+def test_sqlite_apaga_vencidas_ao_gravar(tmp_path, relogio):
+    caminho = str(tmp_path / "cache.sqlite")
+    cache = CacheResultados(ttl_segundos=10, caminho_sqlite=caminho)
+    cache.guardar("velha", 1)
+    relogio.agora += 11
+    cache.guardar("nova", 2)
+    assert _linhas(caminho) == ["nova"]
+
+
+def test_sqlite_limita_linhas(tmp_path, relogio, monkeypatch):
+    monkeypatch.setattr(modulo_cache, "PODA_A_CADA", 4)
+    caminho = str(tmp_path / "cache.sqlite")
+    cache = CacheResultados(ttl_segundos=None, caminho_sqlite=caminho, max_linhas_sqlite=3)
+    for i in range(8):
+        relogio.agora += 1
+        cache.guardar(f"k{i}", i)
+    assert _linhas(caminho) == ["k5", "k6", "k7"]
+    assert cache.estatisticas()["despejos_disco"] == 5
+    # Ao abrir, o banco já é podado ao limite da nova instância
+    CacheResultados(ttl_segundos=None, caminho_sqlite=caminho, max_linhas_sqlite=1)
+    assert _linhas(caminho) == ["k7"]
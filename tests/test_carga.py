@@ -0,0 +1,52 @@
+"""Perfis horários de carga de casa nova e a fração de autoconsumo simultâneo."""
+import numpy as np
+import pytest
+
+from solarsim.calculos import estimar_consumo_casa_nova, simular
+from solarsim.carga import (
+    arquetipos_carga,
+    autoconsumo_da_simulacao,
+    autoconsumo_simultaneo_lote,
+    perfil_carga,
+    perfis_carga_lote,
+)
+from solarsim.horario import HORAS_ANO, totais_mensais
+
+CASAS = [(3, 1, 1, 0, 0), (1, 0, 0, 0, 1), (5, 2, 3, 1, 2), (3, 1, 1, 0, 0)]
+
+
+@pytest.mark.parametrize("casa", CASAS[:3])
+def test_soma_anual_igual_a_12_vezes_o_mensal(casa):
+    perfil = perfil_carga(*casa)
+    assert perfil.shape == (HORAS_ANO,)
+    assert perfil.sum(dtype=np.float64) == pytest.approx(12 * estimar_consumo_casa_nova(*casa), rel=1e-5)
+    assert totais_mensais(perfil).mean() == pytest.approx(estimar_consumo_casa_nova(*casa), rel=1e-5)
+
+
+def test_arquetipos_deduplicam():
+    pessoas, chuveiros, ar_cond, freezer, home_office = (np.array(coluna) for coluna in zip(*CASAS))
+    perfis, indice = arquetipos_carga(pessoas, chuveiros, ar_cond, freezer, home_office)
+    assert len(perfis) == 3
+    assert indice[0] == indice[3]
+    assert len(set(indice.tolist())) == 3
+    lote = perfis_carga_lote(pessoas, chuveiros, ar_cond, freezer, home_office)
+    for casa, linha in zip(CASAS, lote):
+        np.testing.assert_array_equal(linha, perfil_carga(*casa))
+
+
+def test_autoconsumo_simultaneo():
+    fracao = autoconsumo_simultaneo_lote(3, 1, 1, 0, [0, 2, 0], [2.2, 2.2, 8.0], 4.8, -22.5)
+    assert fracao.shape == (3,)
+    assert ((fracao > 0) & (fracao < 1)).all()
+    # Home office consome de dia; sistema maior sobra mais para a rede
+    assert fracao[1] > fracao[0] > fracao[2]
+    assert autoconsumo_simultaneo_lote(3, 1, 1, 0, 0, 0.0, 4.8, -22.5) == 0
+
+
+def test_autoconsumo_da_simulacao():
+    casa = (3, 1, 1, 0, 2)
+    R = {**simular(estimar_consumo_casa_nova(*casa), 0.95, "Rio das Ostras (RJ)", "Bifásica"), "casa": list(casa)}
+    fracao = autoconsumo_da_simulacao(R)
+    assert isinstance(fracao, float)
+    assert fracao == pytest.approx(float(autoconsumo_simultaneo_lote(
+        *casa, R["dados"]["potencia_kwp"], R["hsp"], -22.53)))
@@ -0,0 +1,80 @@
+"""Catálogo de equipamentos: tabela esparsa de mínimos e busca de combinações."""
+import math
+
+import numpy as np
+import pytest
+
+from solarsim.catalogo import (
+    RAZAO_CC_CA_MAX,
+    RAZAO_CC_CA_MIN,
+    Catalogo,
+    TabelaInversores,
+    TabelaModulos,
+)
+
+
+def _catalogo(semente, n_modulos=25, n_inversores=40):
+    rng = np.random.default_rng(semente)
+    voc = rng.uniform(38, 52, n_modulos)
+    modulos = TabelaModulos(
+        [f"M{i}" for i in range(n_modulos)], ["F"] * n_modulos,
+        rng.uniform(300, 600, n_modulos).round(), voc, voc * rng.uniform(0.80, 0.86, n_modulos),
+        rng.uniform(10, 14, n_modulos), rng.uniform(-0.35, -0.25, n_modulos),
+        rng.uniform(1.7, 2.8, n_modulos), rng.uniform(500, 1200, n_modulos).round(2),
+    )
+    potencia_ca = rng.uniform(2, 12, n_inversores).round(1)
+    inversores = TabelaInversores(
+        [f"I{j}" for j in range(n_inversores)], ["G"] * n_inversores,
+        potencia_ca, potencia_ca * rng.uniform(1.2, 1.6, n_inversores),
+        rng.choice([600.0, 1000.0], n_inversores), rng.uniform(80, 200, n_inversores),
+        rng.uniform(500, 800, n_inversores), rng.uniform(12, 26, n_inversores),
+        rng.integers(1, 4, n_inversores), rng.uniform(2000, 8000, n_inversores).round(2),
+    )
+    return Catalogo(modulos, inversores)
+
+
+def _busca_exaustiva(catalogo, potencia_kwp, area_m2, limite):
+    """Todos os pares módulo × inversor, testados um a um."""
+    mod, inv = catalogo.modulos, catalogo.inversores
+    voc_frio, vmp_frio, vmp_calor = mod.tensoes()
+    pares = []
+    for i in range(len(mod)):
+        n = max(math.ceil(potencia_kwp * 1000 / mod.potencia_wp[i] - 1e-9), 1)
+        kwp = n * mod.potencia_wp[i] / 1000
+        if n * mod.area_m2[i] > area_m2:
+            continue
+        for j in range(len(inv)):
+            if not RAZAO_CC_CA_MIN <= kwp / inv.potencia_ca_kw[j] <= RAZAO_CC_CA_MAX:
+                continue
+            maximo_string = math.floor(min(inv.tensao_cc_max[j] / voc_frio[i], inv.mppt_max[j] / vmp_frio[i]))
+            minimo_string = math.ceil(inv.mppt_min[j] / vmp_calor[i])
+            if maximo_string < 1 or maximo_string < minimo_string:
+                continue
+            n_strings = math.ceil(n / maximo_string)
+            if (n_strings * minimo_string <= n
+                    and n_strings <= inv.n_mppt[j] * math.floor(inv.corrente_max_mppt[j] / mod.isc[i])
+                    and kwp <= inv.potencia_cc_max_kw[j]):
+                pares.append((n * mod.preco[i] + inv.preco[j], mod.modelo[i], inv.modelo[j], n_strings))
+    return sorted(pares)[:limite]
+
+
+def test_tabela_esparsa_igual_ao_minimo_da_fatia():
+    inversores = _catalogo(0).inversores
+    tamanho = len(inversores)
+    inicio, fim = np.triu_indices(tamanho + 1)
+    esperado = [inversores.preco[a:b].min() if b > a else np.inf for a, b in zip(inicio, fim)]
+    np.testing.assert_array_equal(inversores.preco_minimo_faixa(inicio, fim), esperado)
+    assert (np.diff(inversores.potencia_ca_kw) >= 0).all()
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_busca_igual_a_exaustiva(semente):
+    catalogo = _catalogo(semente)
+    for potencia_kwp, area_m2, limite in ((3.0, math.inf, 5), (6.5, 40.0, 3), (9.0, math.inf, 8),
+                                       (12.0, 60.0, 5), (12.0, 30.0, 5)):
+        encontradas = catalogo.buscar_combinacoes(potencia_kwp, area_m2=area_m2, limite=limite)
+        esperadas = _busca_exaustiva(catalogo, potencia_kwp, area_m2, limite)
+        assert [(c["modulo"], c["inversor"], c["strings"]) for c in encontradas] == [
+            (modulo, inversor, strings) for _, modulo, inversor, strings in esperadas]
+        np.testing.assert_allclose([c["custo_equipamentos"] for c in encontradas],
+                                   [custo for custo, *_ in esperadas], atol=0.01)
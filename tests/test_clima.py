@@ -0,0 +1,59 @@
+"""Arquivos climáticos (EPW e TMY do PVGIS) e o cache binário em .npy/.json."""
+import numpy as np
+import pytest
+
+from solarsim.clima import COLUNAS_CLIMA, carregar_clima, converter_para_binario, ler_arquivo_clima
+from solarsim.horario import HORAS_ANO
+
+
+def _colunas_sinteticas():
+    hora = np.arange(HORAS_ANO) % 24
+    return {
+        "ghi": np.maximum(0, 800 * np.sin(np.pi * (hora - 6) / 12)).round(),
+        "dni": np.maximum(0, 600 * np.sin(np.pi * (hora - 6) / 12)).round(),
+        "dhi": np.maximum(0, 150 * np.sin(np.pi * (hora - 6) / 12)).round(),
+        "temperatura": (25 + 5 * np.sin(2 * np.pi * hora / 24)).round(1),
+        "vento": np.full(HORAS_ANO, 2.5),
+    }
+
+
+def _gravar_epw(caminho, colunas):
+    linhas = ["LOCATION,Rio de Janeiro,RJ,BRA,SWERA,837460,-22.90,-43.17,-3.0,5.0"]
+    linhas += [f"CABECALHO{i}" for i in range(7)]
+    for h in range(HORAS_ANO):
+        campos = ["0"] * 22
+        for nome, i in {"temperatura": 6, "ghi": 13, "dni": 14, "dhi": 15, "vento": 21}.items():
+            campos[i] = str(colunas[nome][h])
+        linhas.append(",".join(campos))
+    caminho.write_text("\n".join(linhas) + "\n", encoding="latin-1")
+
+
+def _gravar_pvgis(caminho, colunas):
+    linhas = ["Latitude (decimal degrees): -22.900", "Longitude (decimal degrees): -43.170", "Elevation (m): 5",
+              "time(UTC),T2m,RH,G(h),Gb(n),Gd(h),WS10m"]
+    for h in range(HORAS_ANO):
+        linhas.append(f"20050101:{h % 24:02d}00,{colunas['temperatura'][h]},70,{colunas['ghi'][h]},"
+                      f"{colunas['dni'][h]},{colunas['dhi'][h]},{colunas['vento'][h]}")
+    caminho.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("nome, gravar", [("rio.epw", _gravar_epw), ("rio.csv", _gravar_pvgis)])
+def test_ida_e_volta_pelo_cache_binario(tmp_path, nome, gravar):
+    colunas = _colunas_sinteticas()
+    origem = tmp_path / nome
+    gravar(origem, colunas)
+    destino = tmp_path / "cache"
+
+    metadados, lidas = ler_arquivo_clima(str(origem))
+    assert metadados["latitude"] == pytest.approx(-22.9)
+    assert metadados["longitude"] == pytest.approx(-43.17)
+    caminho_npy = converter_para_binario(str(origem), str(destino))
+    assert np.load(caminho_npy).shape == (len(COLUNAS_CLIMA), HORAS_ANO)
+
+    clima = carregar_clima(str(origem), str(destino))
+    assert clima["latitude"] == pytest.approx(-22.9)
+    for coluna in COLUNAS_CLIMA:
+        assert clima[coluna].dtype == np.float32
+        np.testing.assert_array_equal(clima[coluna], lidas[coluna])
+        np.testing.assert_allclose(clima[coluna], colunas[coluna], rtol=1e-6)
+    assert isinstance(clima["ghi"].base, np.memmap) or isinstance(clima["ghi"], np.memmap)
@@ -0,0 +1,85 @@
+"""Livro de créditos: fila FIFO com validade de 60 meses e taxa mínima."""
+import numpy as np
+import pytest
+
+from solarsim.creditos import (
+    VALIDADE_CREDITOS_MESES,
+    separar_energia_horaria,
+    simular_creditos,
+    simular_creditos_horario,
+)
+from solarsim.horario import HORAS_ANO, perfil_geracao_horaria, totais_mensais
+
+
+def _fifo_a_mao(injetada, demanda, minimo):
+    """Uma linha do livro com a fila como lista [mês gerado, kWh]."""
+    fila, saida = [], {chave: [] for chave in ("compensado", "creditos_usados", "creditos_expirados",
+                                               "saldo_creditos", "kwh_faturado")}
+    for mes, (inj, dem) in enumerate(zip(injetada, demanda)):
+        compensavel = max(dem - minimo, 0.0)
+        do_mes = min(inj, compensavel)
+        falta = compensavel - do_mes
+        usados = 0.0
+        for credito in fila:
+            usado = min(credito[1], falta - usados)
+            credito[1] -= usado
+            usados += usado
+        expirados = sum(c[1] for c in fila if c[0] <= mes - VALIDADE_CREDITOS_MESES)
+        fila = [c for c in fila if c[0] > mes - VALIDADE_CREDITOS_MESES and c[1] > 0]
+        fila.append([mes, inj - do_mes])
+        saida["compensado"].append(do_mes + usados)
+        saida["creditos_usados"].append(usados)
+        saida["creditos_expirados"].append(expirados)
+        saida["saldo_creditos"].append(sum(c[1] for c in fila))
+        saida["kwh_faturado"].append(max(dem - do_mes - usados, minimo))
+    return {chave: np.array(valores) for chave, valores in saida.items()}
+
+
+def test_igual_a_fila_a_mao():
+    rng = np.random.default_rng(0)
+    meses = 150
+    injetada = rng.uniform(0, 400, (6, meses)) * (rng.random((6, meses)) < 0.7)
+    demanda = rng.uniform(0, 500, (6, meses))
+    minimos = np.array([30, 50, 100, 30, 50, 100])
+    livro = simular_creditos(injetada, demanda, minimos)
+    for i in range(6):
+        esperado = _fifo_a_mao(injetada[i], demanda[i], minimos[i])
+        for chave, valores in esperado.items():
+            np.testing.assert_allclose(livro[chave][i], valores, atol=1e-8, err_msg=chave)
+
+
+@pytest.mark.parametrize("mes_uso, usado", [(VALIDADE_CREDITOS_MESES, 100.0), (VALIDADE_CREDITOS_MESES + 1, 0.0)])
+def test_credito_vale_ate_o_mes_60(mes_uso, usado):
+    meses = VALIDADE_CREDITOS_MESES + 3
+    injetada = np.zeros(meses)
+    injetada[0] = 100.0
+    demanda = np.full(meses, 50.0)  # só a taxa mínima: nada a compensar
+    demanda[mes_uso] = 150.0
+    livro = simular_creditos(injetada, demanda, 50)
+    assert livro["creditos_usados"][0, mes_uso] == pytest.approx(usado)
+    assert livro["creditos_expirados"][0].sum() == pytest.approx(100.0 - usado)
+    if usado == 0:
+        assert livro["creditos_expirados"][0, VALIDADE_CREDITOS_MESES] == pytest.approx(100.0)
+
+
+def test_taxa_minima_sempre_faturada():
+    livro = simular_creditos([[500.0, 500.0, 0.0]], [[80.0, 20.0, 300.0]], 50, tarifa=2.0)
+    # Só se compensa o que passa da taxa mínima; abaixo dela fatura-se a taxa
+    assert livro["compensado"][0].tolist() == pytest.approx([30.0, 0.0, 250.0])
+    assert livro["kwh_faturado"][0].tolist() == pytest.approx([50.0, 50.0, 50.0])
+    assert livro["fatura"][0].tolist() == pytest.approx([100.0, 100.0, 100.0])
+
+
+def test_separacao_horaria_soma_os_totais_mensais():
+    rng = np.random.default_rng(1)
+    geracao = perfil_geracao_horaria(5.0, -22.5) * 3.0
+    consumo = rng.uniform(0.1, 1.2, HORAS_ANO).astype(np.float32)
+    energia = separar_energia_horaria(geracao, consumo)
+    np.testing.assert_allclose(energia["autoconsumo"] + energia["injetada"], totais_mensais(geracao), rtol=1e-5)
+    np.testing.assert_allclose(energia["autoconsumo"] + energia["demanda_rede"], totais_mensais(consumo), rtol=1e-5)
+
+    livro = simular_creditos_horario(geracao, consumo, 50, anos=2)
+    assert livro["compensado"].shape == (1, 24)
+    np.testing.assert_allclose(livro["autoconsumo"][0, :12], energia["autoconsumo"])
+    np.testing.assert_allclose(livro["creditos_gerados"][0, :12] + livro["compensado"][0, :12]
+                               - livro["creditos_usados"][0, :12], energia["injetada"], rtol=1e-9)
@@ -0,0 +1,109 @@
+"""Fluxo de caixa de 25 anos: payback, VPL e TIR contra um laço escrito à mão."""
+import datetime
+
+import numpy as np
+import pytest
+
+from solarsim.calculos import FATOR_SAZONAL
+from solarsim.fluxo_caixa import (
+    AUTOCONSUMO_SIMULTANEO,
+    DEGRADACAO_ANUAL,
+    PARCELA_FIO_B,
+    REAJUSTE_TARIFA_ANUAL,
+    TAXA_DESCONTO_ANUAL,
+    _tir_mensal,
+    calcular_fluxo_caixa,
+    fator_fio_b,
+)
+
+
+def _fluxo_a_mao(custo, geracao_mensal, consumo, tarifa, minimo, ano_inicio, anos=25):
+    """Fluxo mês a mês com a fila de créditos como lista (mês gerado, kWh)."""
+    fluxo, fila = [-custo], []
+    for mes in range(anos * 12):
+        ano = mes // 12
+        geracao = geracao_mensal * FATOR_SAZONAL[mes % 12] * (1 - DEGRADACAO_ANUAL) ** ano
+        preco = tarifa * (1 + REAJUSTE_TARIFA_ANUAL) ** ano
+        autoconsumo = min(geracao * AUTOCONSUMO_SIMULTANEO, consumo)
+        injetada, demanda = geracao - autoconsumo, consumo - autoconsumo
+        compensavel = max(demanda - minimo, 0.0)
+        do_mes = min(injetada, compensavel)
+        falta = compensavel - do_mes
+        for credito in fila:
+            usado = min(credito[1], falta)
+            credito[1] -= usado
+            falta -= usado
+        usados = compensavel - do_mes - falta
+        fila = [c for c in fila if c[1] > 0 and c[0] > mes - 60]
+        fila.append([mes, injetada - do_mes])
+        compensado = do_mes + usados
+        conta_com = (max(demanda - compensado, minimo) * preco
+                     + compensado * preco * PARCELA_FIO_B * fator_fio_b(ano_inicio + ano))
+        fluxo.append(max(consumo, minimo) * preco - conta_com)
+    return np.array(fluxo)
+
+
+def _tir_bissecao(fluxo):
+    baixo, alto = -0.05, 1.0
+    for _ in range(200):
+        meio = (baixo + alto) / 2
+        if sum(f / (1 + meio) ** i for i, f in enumerate(fluxo)) > 0:
+            baixo = meio
+        else:
+            alto = meio
+    return (1 + baixo) ** 12 - 1
+
+
+@pytest.mark.parametrize("geracao, consumo", [(300.0, 500.0), (420.0, 350.0)])
+def test_igual_ao_laco_a_mao(geracao, consumo):
+    fluxo = _fluxo_a_mao(15000.0, geracao, consumo, 0.95, 50.0, 2025)
+    resultado = calcular_fluxo_caixa(15000.0, geracao, consumo, 0.95, 50.0, ano_inicio=2025)
+
+    np.testing.assert_allclose(resultado["economia_mensal"][0], fluxo[1:], rtol=1e-9, atol=1e-9)
+    assert resultado["payback_meses"][0] == np.argmax(np.cumsum(fluxo) >= 0)
+    taxa = (1 + TAXA_DESCONTO_ANUAL) ** (1 / 12) - 1
+    vpl = sum(f / (1 + taxa) ** i for i, f in enumerate(fluxo))
+    assert resultado["vpl"][0] == pytest.approx(vpl, rel=1e-9)
+    assert resultado["tir_anual"][0] == pytest.approx(_tir_bissecao(fluxo), abs=1e-8)
+    assert resultado["economia_primeiro_ano"][0] == pytest.approx(fluxo[1:13].sum())
+
+
+def test_ano_inicio_muda_o_fio_b_e_o_padrao_e_o_ano_corrente():
+    antes = calcular_fluxo_caixa(15000.0, 300.0, 500.0, 0.95, 50.0, ano_inicio=2022)
+    depois = calcular_fluxo_caixa(15000.0, 300.0, 500.0, 0.95, 50.0, ano_inicio=2030)
+    assert antes["vpl"][0] > depois["vpl"][0]
+    ano = datetime.date.today().year
+    padrao = calcular_fluxo_caixa(15000.0, 300.0, 500.0, 0.95, 50.0)
+    assert padrao["vpl"][0] == calcular_fluxo_caixa(15000.0, 300.0, 500.0, 0.95, 50.0, ano_inicio=ano)["vpl"][0]
+
+
+def test_broadcast_de_vetor_com_escalares():
+    custos = np.array([8000.0, 15000.0, 60000.0])
+    lote = calcular_fluxo_caixa(custos, 300.0, 500.0, 0.95, [30, 50, 100], ano_inicio=2025)
+    assert lote["vpl"].shape == (3,)
+    assert lote["economia_mensal"].shape == (3, 300)
+    for i, (custo, minimo) in enumerate(zip(custos, [30, 50, 100])):
+        sozinho = calcular_fluxo_caixa(custo, 300.0, 500.0, 0.95, minimo, ano_inicio=2025)
+        for chave in ("payback_meses", "vpl", "tir_anual", "economia_primeiro_ano"):
+            np.testing.assert_allclose(lote[chave][i], sozinho[chave][0])
+
+
+def test_sem_retorno_no_horizonte():
+    resultado = calcular_fluxo_caixa(200_000.0, 300.0, 500.0, 0.95, 50.0, ano_inicio=2025)
+    assert np.isnan(resultado["payback_meses"][0])
+    assert np.isnan(resultado["payback_descontado_meses"][0])
+    assert resultado["vpl"][0] < 0
+    # Sem retorno, a TIR ainda existe, só que negativa
+    assert -1 < resultado["tir_anual"][0] < 0
+
+
+def test_tir_sem_troca_de_sinal_e_nan():
+    fluxos = np.array([
+        [-100.0] + [10.0] * 24,  # convencional: tem TIR
+        [100.0] + [10.0] * 24,   # sempre positivo
+        [-100.0] + [-1.0] * 24,  # sempre negativo
+    ])
+    tir = _tir_mensal(fluxos)
+    assert np.isfinite(tir[0])
+    assert sum(f / (1 + tir[0]) ** i for i, f in enumerate(fluxos[0])) == pytest.approx(0, abs=1e-8)
+    assert np.isnan(tir[1:]).all()
@@ -0,0 +1,38 @@
+"""Modelo horário de geração: totais mensais e calendário."""
+import numpy as np
+import pytest
+
+from solarsim.calculos import FATOR_SAZONAL, TAXA_DESEMPENHO
+from solarsim.horario import (
+    HORAS_ANO,
+    aplicar_nebulosidade,
+    calendario,
+    perfil_geracao_horaria,
+    totais_mensais,
+)
+
+
+def test_totais_mensais_batem_com_o_modelo_mensal():
+    perfil = perfil_geracao_horaria(4.5, -22.5)
+    assert perfil.shape == (HORAS_ANO,)
+    esperado = 4.5 * TAXA_DESEMPENHO * 30 * np.asarray(FATOR_SAZONAL)
+    np.testing.assert_allclose(totais_mensais(perfil), esperado, rtol=1e-5)
+
+
+def test_perfis_em_lote_e_nebulosidade_preservam_os_totais():
+    hsp, latitude = np.array([4.0, 5.5, 5.0]), np.array([-3.7, -30.0, -3.7])
+    perfis = perfil_geracao_horaria(hsp, latitude)
+    assert perfis.shape == (3, HORAS_ANO)
+    esperado = (hsp * TAXA_DESEMPENHO)[:, None] * 30 * np.asarray(FATOR_SAZONAL)
+    np.testing.assert_allclose(totais_mensais(perfis), esperado, rtol=1e-5)
+    nublado = aplicar_nebulosidade(perfis, latitude)
+    np.testing.assert_allclose(totais_mensais(nublado), esperado, rtol=1e-4)
+    assert (nublado.max(axis=1) >= perfis.max(axis=1)).all()
+
+
+def test_calendario():
+    cal = calendario()
+    assert np.bincount(cal["mes"]).tolist() == [24 * d for d in (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)]
+    assert cal["inicio_mes"][0] == 0
+    with pytest.raises(ValueError):
+        calendario(2024)
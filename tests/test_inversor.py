@@ -0,0 +1,60 @@
+"""Inversor: clipping, eficiência de conversão e varredura da razão CC/CA."""
+import numpy as np
+import pytest
+
+from solarsim.horario import perfil_geracao_horaria
+from solarsim.inversor import (
+    CURVA_EFICIENCIA,
+    custo_inversor,
+    dimensionar_inversor,
+    perfil_cc,
+    simular_inversor,
+    varrer_razao_cc_ca,
+)
+
+EFICIENCIA_MAXIMA = max(eficiencia for _, eficiencia in CURVA_EFICIENCIA)
+
+
+def test_inversor_folgado_nao_corta():
+    potencia_cc = 5.0 * perfil_cc(perfil_geracao_horaria(5.0, -15.0))
+    pico = float(potencia_cc.max())
+    potencias_ca = np.array([pico, 2 * pico])
+    resultado = simular_inversor(np.stack([potencia_cc, potencia_cc]), potencias_ca)
+    np.testing.assert_array_equal(resultado["energia_cortada"], 0.0)
+    assert (resultado["ca_horaria"] <= potencias_ca[:, None] * (1 + 1e-6)).all()
+
+
+def test_energia_ca_nao_passa_da_eficiencia_maxima():
+    potencia_cc = 5.0 * perfil_cc(perfil_geracao_horaria(5.0, -15.0))
+    potencias_ca = np.array([1.0, 2.5, 4.0, 5.0, 8.0])
+    resultado = simular_inversor(np.broadcast_to(potencia_cc, (5, potencia_cc.size)), potencias_ca)
+    assert (resultado["energia_ca"] <= resultado["energia_cc"] * EFICIENCIA_MAXIMA * (1 + 1e-6)).all()
+    assert (resultado["perda_conversao"] >= -1e-3).all()
+    # Quanto menor o inversor, mais ele corta
+    assert resultado["energia_cortada"][0] > 0
+    assert (np.diff(resultado["energia_cortada"]) <= 1e-6).all()
+
+
+def test_varredura_recomenda_o_argmax():
+    potencia_kwp, custo_wp = np.array([3.0, 10.0]), np.array([4.5, 3.8])
+    perfil = perfil_cc(perfil_geracao_horaria(np.array([4.0, 5.5]), np.array([-3.7, -30.0])))
+    varredura = varrer_razao_cc_ca(potencia_kwp, perfil, custo_wp)
+    razoes = varredura["razoes"]
+    for i in range(2):
+        potencias_ca = potencia_kwp[i] / razoes
+        np.testing.assert_allclose(varredura["potencia_ca_kw"][i], potencias_ca)
+        series_cc = np.broadcast_to(potencia_kwp[i] * perfil[i], (len(razoes), perfil.shape[1]))
+        energia_ca = simular_inversor(series_cc, potencias_ca)["energia_ca"]
+        np.testing.assert_allclose(varredura["energia_ca_anual"][i], energia_ca, rtol=1e-5)
+        custo = potencia_kwp[i] * 1000 * custo_wp[i] * 0.80 + custo_inversor(potencias_ca)
+        melhor = int(np.argmax(energia_ca / custo))
+        assert varredura["indice_recomendado"][i] == melhor
+        assert varredura["razao_recomendada"][i] == razoes[melhor]
+        assert varredura["inversor_kw_recomendado"][i] == pytest.approx(potencias_ca[melhor])
+
+
+def test_dimensionar_inversor_serializavel():
+    inversor = dimensionar_inversor(5.0, 5.0, -15.0, 4.0)
+    assert all(type(valor) is float for valor in inversor.values())
+    assert inversor["razao_cc_ca"] * inversor["inversor_kw"] == pytest.approx(5.0)
+    assert inversor["corte_percentual"] >= 0
@@ -0,0 +1,33 @@
+"""Grade de irradiação: interpolação com passos diferentes em latitude e longitude."""
+import numpy as np
+import pytest
+
+from solarsim.localizacao import GradeIrradiancia, ler_tabela
+
+
+def _grade(passo_lat, passo_lon):
+    lats, lons = np.meshgrid(np.arange(-24, -20 + 1e-9, passo_lat), np.arange(-45, -40 + 1e-9, passo_lon), indexing="ij")
+    # Campo linear: a interpolação bilinear tem de reproduzi-lo exatamente
+    hsp = 5 + 0.1 * (lats + 24) - 0.05 * (lons + 45)
+    return GradeIrradiancia(lats.ravel(), lons.ravel(), hsp.ravel())
+
+
+@pytest.mark.parametrize("passo_lat,passo_lon", [(0.5, 0.5), (0.5, 0.25), (0.2, 1.0)])
+def test_interpolacao_com_passos_diferentes(passo_lat, passo_lon):
+    grade = _grade(passo_lat, passo_lon)
+    assert grade.passos == pytest.approx((passo_lat, passo_lon))
+    lat = np.array([-23.37, -21.05, -20.5])
+    lon = np.array([-44.81, -41.33, -40.1])
+    esperado = 5 + 0.1 * (lat + 24) - 0.05 * (lon + 45)
+    assert grade.hsp_interpolado(lat, lon) == pytest.approx(esperado)
+
+
+def test_fora_da_grade_usa_o_mais_proximo():
+    grade = _grade(0.5, 0.25)
+    assert grade.hsp_interpolado(-30.0, -44.0) == grade.hsp_mais_proximo(-30.0, -44.0)
+
+
+def test_ler_tabela_com_ponto_e_virgula(tmp_path):
+    caminho = tmp_path / "custos.csv"
+    caminho.write_text("lat;lon;custo_wp\n-22.5;-41.9;2.49\n-23.5;-46.6;2.9\n", encoding="utf-8")
+    assert ler_tabela(caminho) == {"LAT": ["-22.5", "-23.5"], "LON": ["-41.9", "-46.6"], "CUSTO_WP": ["2.49", "2.9"]}
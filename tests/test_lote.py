@@ -0,0 +1,53 @@
+"""Paridade das calculadoras em lote (solarsim.lote) com as escalares."""
+import numpy as np
+import pytest
+
+from solarsim.calculos import calcular_sistema_por_orcamento, calcular_sistema_solar
+from solarsim.lote import _arredondar, calcular_sistema_por_orcamento_lote, calcular_sistema_solar_lote
+
+HSP, CUSTO_WP = 4.98, 2.49
+CAMPOS = ("potencia_kwp", "inversor_kw_recomendado", "numero_paineis", "area_m2",
+          "custo_total_estimado_site", "economia_mensal_reais", "co2_evitado_kg", "geracao_mensal")
+
+
+@pytest.mark.parametrize("valor,casas", [(2.675, 2), (1.005, 2), (0.125, 2), (2.5, 0), (-1.5, 0), (3.14159, 3)])
+def test_arredondar_escalar_igual_ao_round(valor, casas):
+    assert _arredondar(valor, casas) == round(valor, casas)
+
+
+def test_arredondar_preserva_forma():
+    valores = np.array([[2.675, 1.005], [0.125, 7.0]])
+    resultado = _arredondar(valores, 2)
+    assert resultado.shape == valores.shape
+    assert resultado.tolist() == [[round(v, 2) for v in linha] for linha in valores.tolist()]
+
+
+def test_sistema_solar_lote_igual_ao_escalar():
+    rng = np.random.default_rng(0)
+    consumo = rng.integers(30, 3000, 500).astype(float)
+    tarifa = rng.uniform(0.5, 1.4, 500)
+    lote = calcular_sistema_solar_lote(consumo, tarifa, HSP, CUSTO_WP)
+    for i in range(len(consumo)):
+        escalar = calcular_sistema_solar(consumo[i], tarifa[i], HSP, CUSTO_WP)
+        for campo in CAMPOS:
+            assert lote[campo][i] == pytest.approx(escalar[campo], rel=1e-12, abs=1e-12), campo
+
+
+def test_sistema_por_orcamento_lote_igual_ao_escalar():
+    rng = np.random.default_rng(1)
+    orcamento = rng.uniform(1_000, 90_000, 500)
+    consumo = rng.integers(30, 3000, 500).astype(float)
+    tarifa = rng.uniform(0.5, 1.4, 500)
+    lote = calcular_sistema_por_orcamento_lote(orcamento, CUSTO_WP, consumo, tarifa, HSP)
+    for i in range(len(orcamento)):
+        escalar = calcular_sistema_por_orcamento(orcamento[i], CUSTO_WP, consumo[i], tarifa[i], HSP)
+        for campo in CAMPOS:
+            assert lote[campo][i] == pytest.approx(escalar[campo], rel=1e-12, abs=1e-12), campo
+
+
+def test_lote_com_entradas_escalares():
+    lote = calcular_sistema_solar_lote(487.0, 0.97, HSP, CUSTO_WP)
+    escalar = calcular_sistema_solar(487.0, 0.97, HSP, CUSTO_WP)
+    for campo in CAMPOS:
+        assert np.ndim(lote[campo]) == 0
+        assert lote[campo] == escalar[campo], campo
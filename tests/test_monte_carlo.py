@@ -0,0 +1,74 @@
+"""Monte Carlo: reprodutibilidade pela semente, ordem dos percentis e caso sem dispersão."""
+import numpy as np
+import pytest
+
+from solarsim.calculos import (
+    CUSTO_WP_CAPITAIS,
+    HSP_CAPITAIS,
+    POTENCIA_PAINEL_WP,
+    TAXA_DESEMPENHO,
+    calcular_sistema_solar,
+    simular,
+)
+from solarsim.monte_carlo import (
+    DISTRIBUICOES_PADRAO,
+    monte_carlo_da_simulacao,
+    simular_monte_carlo,
+    simular_monte_carlo_lote,
+)
+
+CIDADE = "Rio das Ostras (RJ)"
+SEM_DISPERSAO = {nome: ("fixo",) for nome in DISTRIBUICOES_PADRAO}
+
+
+def _proposta(**extra):
+    return {"consumo": 400, "tarifa": 0.95, "hsp": HSP_CAPITAIS[CIDADE], "custo_wp": CUSTO_WP_CAPITAIS[CIDADE],
+            **extra}
+
+
+def test_mesma_semente_mesmo_resultado():
+    a = simular_monte_carlo(**_proposta(), n_amostras=20_000, semente=7)
+    assert a == simular_monte_carlo(**_proposta(), n_amostras=20_000, semente=7)
+    assert a != simular_monte_carlo(**_proposta(), n_amostras=20_000, semente=8)
+
+
+def test_lote_nao_depende_do_numero_de_processos():
+    propostas = [_proposta(), _proposta(consumo=900), _proposta(orcamento=12_000)]
+    sequencial = simular_monte_carlo_lote(propostas, n_amostras=5_000, semente=3, processos=1)
+    assert sequencial == simular_monte_carlo_lote(propostas, n_amostras=5_000, semente=3, processos=1)
+    assert sequencial == simular_monte_carlo_lote(propostas, n_amostras=5_000, semente=3, processos=2)
+    # Cada proposta tem a própria semente derivada
+    assert sequencial[0] != simular_monte_carlo_lote(propostas[:1] * 2, n_amostras=5_000, semente=3,
+                                                     processos=1)[1]
+
+
+@pytest.mark.parametrize("extra", [{}, {"orcamento": 12_000}])
+def test_percentis_em_ordem(extra):
+    faixa = simular_monte_carlo(**_proposta(**extra), n_amostras=20_000)
+    for chave in ("geracao_mensal", "economia_mensal_reais", "payback_anos"):
+        assert faixa[chave]["p10"] <= faixa[chave]["p50"] <= faixa[chave]["p90"]
+    assert faixa["geracao_mensal"]["p10"] < faixa["geracao_mensal"]["p90"]
+
+
+def test_sem_dispersao_volta_ao_resultado_deterministico():
+    p = _proposta()
+    faixa = simular_monte_carlo(**p, n_amostras=1_000, distribuicoes=SEM_DISPERSAO)
+    nominal = calcular_sistema_solar(p["consumo"], p["tarifa"], p["hsp"], p["custo_wp"])
+    geracao = nominal["potencia_kwp"] * p["hsp"] * TAXA_DESEMPENHO * 30
+    for percentil in ("p10", "p50", "p90"):
+        assert faixa["geracao_mensal"][percentil] == pytest.approx(geracao, rel=1e-2)
+        assert faixa["economia_mensal_reais"][percentil] == pytest.approx(
+            min(geracao, p["consumo"]) * p["tarifa"], rel=1e-2)
+    assert faixa["payback_anos"]["p50"] == pytest.approx(
+        nominal["numero_paineis"] * POTENCIA_PAINEL_WP * p["custo_wp"] / (12 * min(geracao, p["consumo"]) * p["tarifa"]), rel=1e-2)
+
+
+def test_da_simulacao_usa_o_orcamento_e_a_cidade():
+    R = simular(400, 0.95, CIDADE, "Bifásica", 12_000)
+    assert monte_carlo_da_simulacao(R, n_amostras=2_000, semente=1) == simular_monte_carlo(
+        400, 0.95, R["hsp"], CUSTO_WP_CAPITAIS[CIDADE], 12_000, n_amostras=2_000, semente=1)
+
+
+def test_distribuicao_desconhecida():
+    with pytest.raises(ValueError):
+        simular_monte_carlo(**_proposta(), n_amostras=10, distribuicoes={"hsp": ("cauchy", 1)})
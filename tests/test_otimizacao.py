@@ -0,0 +1,45 @@
+"""Otimização do tamanho do sistema: orçamento, busca exaustiva e objetivos."""
+import numpy as np
+import pytest
+
+from solarsim.calculos import POTENCIA_PAINEL_WP, TAXA_DESEMPENHO
+from solarsim.fluxo_caixa import calcular_fluxo_caixa
+from solarsim.otimizacao import limite_paineis, otimizar_sistema
+
+CUSTO_WP = 2.49
+
+
+def test_orcamento_menor_que_um_painel_nao_tem_sistema():
+    assert 1000 < POTENCIA_PAINEL_WP * CUSTO_WP
+    for objetivo in ("vpl", "payback"):
+        otimo = otimizar_sistema(300, 1.0, 4.5, CUSTO_WP, 50, objetivo, orcamento_maximo=1000)
+        assert otimo["numero_paineis"][0] == 0
+        assert otimo["orcamento"][0] == 0
+        assert np.isnan(otimo["payback_meses"][0])
+
+
+@pytest.mark.parametrize("objetivo", ["vpl", "payback"])
+def test_orcamento_limita_o_investimento(objetivo):
+    orcamentos = np.array([1000, 3000, 8000, 1e6])
+    otimo = otimizar_sistema(np.full(4, 600), 1.0, 4.5, CUSTO_WP, 50, objetivo, orcamento_maximo=orcamentos)
+    assert (otimo["orcamento"] <= orcamentos).all()
+    livre = otimizar_sistema(600, 1.0, 4.5, CUSTO_WP, 50, objetivo)
+    assert otimo["numero_paineis"][-1] == livre["numero_paineis"][0]
+
+
+def test_vpl_igual_a_busca_exaustiva():
+    consumo, minimo, hsp = np.array([200, 500, 1500]), np.array([30, 50, 100]), 4.5
+    otimo = otimizar_sistema(consumo, 1.0, hsp, CUSTO_WP, minimo, ano_inicio=2026)
+    for i, limite in enumerate(limite_paineis(consumo, minimo, hsp)):
+        paineis = np.arange(limite + 1)
+        potencia_wp = paineis * POTENCIA_PAINEL_WP
+        vpls = calcular_fluxo_caixa(potencia_wp * CUSTO_WP, potencia_wp / 1000 * hsp * TAXA_DESEMPENHO * 30,
+                                    consumo[i], 1.0, minimo[i], ano_inicio=2026, calcular_tir=False)["vpl"]
+        assert vpls[0] == 0
+        assert otimo["vpl"][i] == pytest.approx(vpls.max())
+        assert otimo["numero_paineis"][i] == np.argmax(vpls)
+
+
+def test_objetivo_desconhecido():
+    with pytest.raises(ValueError):
+        otimizar_sistema(300, 1.0, 4.5, CUSTO_WP, 50, "tir")
@@ -0,0 +1,41 @@
+"""Processamento em massa: taxa mínima por conexão e colunas de saída."""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from solarsim.lote import minimo_kwh_por_conexao_lote
+from solarsim.processar_lote import simular_bloco
+
+
+@pytest.mark.parametrize("conexao,minimo", [
+    ("Monofásica", 30), ("Bifásica (Taxa Mínima 50 kWh)", 50), ("Trifásica", 100), ("trifasica", 100),
+    ("1", 30), ("2", 50), ("3", 100), ("3.0", 100), ("1.00", 30), ("", 50), ("nan", 50), ("13", 50),
+])
+def test_minimo_por_conexao_texto(conexao, minimo):
+    assert minimo_kwh_por_conexao_lote([conexao]).tolist() == [minimo]
+
+
+def test_minimo_por_conexao_numerica():
+    assert minimo_kwh_por_conexao_lote(np.array([1.0, 2.0, 3.0, np.nan])).tolist() == [30, 50, 100, 50]
+    assert minimo_kwh_por_conexao_lote(np.array([1, 3])).tolist() == [30, 100]
+    assert minimo_kwh_por_conexao_lote(np.array(["Trifásica", 3.0, 1, None], dtype=object)).tolist() == [100, 100, 30, 50]
+
+
+def test_csv_com_fases_numericas_e_celula_vazia():
+    # A célula vazia faz o pandas ler tipo_conexao como float (1.0, 3.0, NaN)
+    bloco = pd.read_csv(io.StringIO("consumo_kwh,tarifa_te,tipo_conexao\n300,0.9,1\n300,0.9,3\n300,0.9,\n"))
+    assert bloco["tipo_conexao"].dtype.kind == "f"
+    assert simular_bloco(bloco)["minimo_kwh"].tolist() == [30, 100, 50]
+
+
+def test_payback_em_meses_corridos():
+    bloco = pd.DataFrame({"consumo_kwh": [300, 0], "tarifa_te": [0.9, 0.9], "tipo_conexao": ["Bifásica"] * 2})
+    saida = simular_bloco(bloco, otimizar="vpl")
+    assert {"payback_simples_meses", "otimo_payback_meses"} <= set(saida.columns)
+    assert not {"payback_anos", "payback_meses"} & set(saida.columns)
+    meses = saida["payback_simples_meses"]
+    esperado = saida["custo_final"][0] / (saida["economia_mensal_reais"][0] * 12) * 12
+    assert meses[0] == round(esperado)
+    assert np.isnan(meses[1])
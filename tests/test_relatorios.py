@@ -0,0 +1,79 @@
+"""Propostas em massa: moeda em lote, TXT iguais ao resumo da página e HTML escapado."""
+import csv
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from solarsim.calculos import formatar_reais, gerar_resumo_txt, simular
+from solarsim.processar_lote import CIDADE_PADRAO, simular_bloco
+from solarsim.relatorios import CAMPOS_CSV, EscritorZip, formatar_reais_lote
+
+CONTAS = pd.DataFrame({
+    "consumo_kwh": [80, 300, 1500, 2000, 450],
+    "tarifa_te": [0.35, 0.40, 0.28, 0.45, 0.30],
+    "tarifa_tusd": [0.50, 0.45, 0.62, 0.70, 0.55],
+    "tipo_conexao": ["Monofásica", "Bifásica", "Trifásica", "Bifásica", "Monofásica"],
+    "orcamento": [np.nan, np.nan, 25_000.0, np.nan, 3_000.0],
+})
+CONEXOES = CONTAS["tipo_conexao"].tolist()
+
+
+def _zip(propostas, formatos):
+    destino = io.BytesIO()
+    escritor = EscritorZip(destino, formatos)
+    # Dois blocos: a numeração continua entre eles
+    escritor.escrever(propostas.iloc[:2].reset_index(drop=True))
+    escritor.escrever(propostas.iloc[2:].reset_index(drop=True))
+    escritor.fechar()
+    destino.seek(0)
+    return zipfile.ZipFile(destino)
+
+
+@pytest.mark.parametrize("valores", [
+    [0.0, -0.0, 0.004, 0.005, 0.015, 0.125, 0.85, -0.85, 1.0, -1.0],
+    [999.99, 999.995, 1000.0, -1000.0, 1234.5, -1234.5, 12_345.678, 999_999.99, 1_000_000.0, -2_500_000.25],
+    [1e14, -9.87654321e13, 1e15, -1e16, 1e20],
+])
+def test_moeda_em_lote_igual_a_escalar(valores):
+    assert formatar_reais_lote(valores).tolist() == [formatar_reais(v) for v in valores]
+
+
+def test_moeda_em_lote_aleatoria():
+    rng = np.random.default_rng(0)
+    valores = np.concatenate([rng.uniform(-1e7, 1e7, 2000), np.round(rng.uniform(-1e4, 1e4, 2000), 3)])
+    assert formatar_reais_lote(valores).tolist() == [formatar_reais(v) for v in valores.tolist()]
+
+
+def test_txt_do_zip_igual_a_gerar_resumo_txt():
+    propostas = simular_bloco(CONTAS)
+    with _zip(propostas, ("txt", "csv")) as arquivo:
+        nomes = sorted(n for n in arquivo.namelist() if n.startswith("txt/"))
+        assert nomes == [f"txt/proposta_{i:07d}.txt" for i in range(1, len(CONTAS) + 1)]
+        for i, nome in enumerate(nomes):
+            orcamento = CONTAS["orcamento"][i]
+            R = simular(int(CONTAS["consumo_kwh"][i]), float(CONTAS["tarifa_te"][i] + CONTAS["tarifa_tusd"][i]),
+                        CIDADE_PADRAO, CONEXOES[i], None if np.isnan(orcamento) else float(orcamento))
+            assert arquivo.read(nome).decode("utf-8") == gerar_resumo_txt(R, R["dados"])
+        linhas = list(csv.reader(io.StringIO(arquivo.read("propostas.csv").decode("utf-8")), delimiter=";"))
+    assert linhas[0] == list(CAMPOS_CSV)
+    assert [linha[0] for linha in linhas[1:]] == [str(i) for i in range(1, len(CONTAS) + 1)]
+
+
+def test_html_escapa_a_cidade():
+    propostas = simular_bloco(CONTAS)
+    propostas["cidade"] = 'Cidade <script>alert("x")</script> & Cia'
+    with _zip(propostas, ("txt", "html")) as arquivo:
+        pagina = arquivo.read("html/proposta_0000001.html").decode("utf-8")
+        texto = arquivo.read("txt/proposta_0000001.txt").decode("utf-8")
+    assert "<script>" not in pagina
+    assert "Cidade &lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp; Cia" in pagina
+    # O TXT não é HTML: a cidade vai como veio
+    assert 'Cidade <script>alert("x")</script> & Cia' in texto
+
+
+def test_formato_desconhecido():
+    with pytest.raises(ValueError):
+        EscritorZip(io.BytesIO(), ("txt", "pdf"))
@@ -0,0 +1,56 @@
+"""Grade de sensibilidade: recálculo incremental por eixo igual à grade completa."""
+import numpy as np
+import pytest
+
+from solarsim.sensibilidade import METRICAS, PARES, GradeSensibilidade, avaliar_grade, valores_eixo
+
+BASE = {"consumo": 450.0, "tarifa": 0.95, "hsp": 5.2, "custo_wp": 2.8}
+
+# (mínimo, máximo, passo) de cada eixo a cada movimento de slider, como na página
+MOVIMENTOS = {
+    "tarifa_consumo": [
+        {"tarifa": (0.65, 1.45, 0.05), "consumo": (225, 900, 25)},
+        {"tarifa": (0.80, 1.45, 0.05), "consumo": (225, 900, 25)},   # sobe o mínimo de x
+        {"tarifa": (0.80, 1.45, 0.05), "consumo": (100, 900, 25)},   # desce o mínimo de y
+        {"tarifa": (0.50, 2.00, 0.05), "consumo": (100, 900, 25)},   # alarga x dos dois lados
+        {"tarifa": (0.50, 2.00, 0.05), "consumo": (300, 1500, 25)},  # desloca y
+        {"tarifa": (1.00, 1.10, 0.05), "consumo": (300, 1500, 25)},  # estreita x
+        {"tarifa": (1.00, 1.10, 0.05), "consumo": (300, 1500, 25)},  # nada muda
+        {"tarifa": (1.50, 2.50, 0.05), "consumo": (300, 1500, 25)},  # x sem nenhum valor antigo
+        {"tarifa": (0.30, 0.60, 0.05), "consumo": (50, 200, 25)},    # os dois mudam
+    ],
+    "hsp_custo_wp": [
+        {"hsp": (4.2, 6.2, 0.1), "custo_wp": (2.0, 3.6, 0.1)},
+        {"hsp": (4.2, 6.2, 0.1), "custo_wp": (1.5, 3.6, 0.1)},
+        {"hsp": (3.0, 5.0, 0.1), "custo_wp": (1.5, 3.6, 0.1)},
+        {"hsp": (3.0, 5.0, 0.1), "custo_wp": (2.5, 2.5, 0.1)},
+        {"hsp": (6.9, 7.0, 0.1), "custo_wp": (2.5, 2.5, 0.1)},
+    ],
+}
+
+
+@pytest.mark.parametrize("orcamento", [None, 15_000.0])
+@pytest.mark.parametrize("par", list(PARES))
+def test_atualizar_igual_a_grade_completa(par, orcamento):
+    eixo_x, eixo_y = PARES[par]
+    grade = GradeSensibilidade(BASE, eixo_x, eixo_y, orcamento)
+    anteriores = (np.empty(0), np.empty(0))
+    for faixas in MOVIMENTOS[par]:
+        valores_x = valores_eixo(*faixas[eixo_x])
+        valores_y = valores_eixo(*faixas[eixo_y])
+        celulas = grade.celulas_calculadas
+        metricas = grade.atualizar(valores_x, valores_y)
+        esperado = avaliar_grade(BASE, eixo_x, valores_x, eixo_y, valores_y, orcamento)
+        assert set(metricas) == set(METRICAS)
+        for chave in METRICAS:
+            assert metricas[chave].shape == (len(valores_y), len(valores_x))
+            np.testing.assert_array_equal(metricas[chave], esperado[chave])
+
+        # Só as linhas ou colunas com valores novos são avaliadas
+        novos_x = np.setdiff1d(valores_x, anteriores[0]).size
+        novos_y = np.setdiff1d(valores_y, anteriores[1]).size
+        if novos_x and novos_y:
+            assert grade.celulas_calculadas - celulas == len(valores_x) * len(valores_y)
+        else:
+            assert grade.celulas_calculadas - celulas == novos_x * len(valores_y) + novos_y * len(valores_x)
+        anteriores = (valores_x, valores_y)
@@ -0,0 +1,39 @@
+"""Faturas mensais por tarifa horária, inclusive de clientes em tabelas diferentes."""
+import numpy as np
+import pytest
+
+from solarsim.tarifa import compilar_tarifa, fatura_mensal_lote, tarifa_plana
+
+
+def _tabelas():
+    return [
+        tarifa_plana(0.95),
+        compilar_tarifa(0.33, 0.52, "amarela"),
+        compilar_tarifa((0.31, 0.31, 0.51), (0.36, 0.82, 1.28), "vermelha_1"),
+        tarifa_plana(0.95, ano=2023),
+    ]
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_fatura_mensal_lote_igual_a_cada_tabela(dtype):
+    rng = np.random.default_rng(0)
+    tabelas = _tabelas()
+    consumo = rng.uniform(0, 2, (9, 8760)).astype(dtype)
+    indice = np.array([0, 1, 2, 3, 2, 1, 0, 3, 3])
+    faturas = fatura_mensal_lote(consumo, tabelas, indice, linhas_por_bloco=2)
+    esperado = np.stack([tabelas[i].fatura_mensal(c) for i, c in zip(indice, consumo)])
+    assert faturas.shape == (9, 12)
+    assert faturas.dtype == np.float64
+    np.testing.assert_allclose(faturas, esperado, rtol=1e-5)
+
+
+def test_fatura_mensal_lote_uma_tabela_e_dimensoes_extras():
+    rng = np.random.default_rng(1)
+    tabelas = _tabelas()
+    consumo = rng.uniform(0, 2, (2, 3, 8760))
+    np.testing.assert_allclose(fatura_mensal_lote(consumo, tabelas, np.full((2, 3), 1)),
+                               tabelas[1].fatura_mensal(consumo))
+    indice = np.array([[0, 1, 2], [2, 1, 0]])
+    faturas = fatura_mensal_lote(consumo, tabelas, indice)
+    assert faturas.shape == (2, 3, 12)
+    np.testing.assert_allclose(faturas[1, 0], tabelas[2].fatura_mensal(consumo[1, 0]))
@@ -0,0 +1,93 @@
+"""Empacotamento no telhado: módulos por água, folgas, obstruções e lote."""
+import json
+
+import numpy as np
+import pytest
+
+from solarsim.telhado import (
+    COMPRIMENTO_MODULO_M,
+    ESPACAMENTO_M,
+    FOLGA_OBSTRUCAO_M,
+    LARGURA_MODULO_M,
+    RECUO_M,
+    capacidade_lote,
+    empacotar_agua,
+    empacotar_telhado,
+    ler_telhado,
+    retangulo,
+)
+
+TOLERANCIA = 1e-6
+
+
+def _sobrepostos(modulos):
+    x, y, w, h = modulos.T
+    cruzam = ((x[:, None] < x + w - TOLERANCIA) & (x[:, None] + w[:, None] - TOLERANCIA > x)
+              & (y[:, None] < y + h - TOLERANCIA) & (y[:, None] + h[:, None] - TOLERANCIA > y))
+    np.fill_diagonal(cruzam, False)
+    return cruzam.any()
+
+
+def test_retangulo_10x6():
+    resultado = empacotar_agua(retangulo(10, 6))
+    modulos = resultado["modulos"]
+    assert resultado["paineis"] == 16 == len(modulos)
+    assert resultado["retrato"] + resultado["paisagem"] == 16
+    assert modulos[:, 0].min() >= RECUO_M - TOLERANCIA
+    assert modulos[:, 1].min() >= RECUO_M - TOLERANCIA
+    assert (modulos[:, 0] + modulos[:, 2]).max() <= 10 - RECUO_M + TOLERANCIA
+    assert (modulos[:, 1] + modulos[:, 3]).max() <= 6 - RECUO_M + TOLERANCIA
+    assert set(map(tuple, modulos[:, 2:].round(6))) <= {
+        (LARGURA_MODULO_M, COMPRIMENTO_MODULO_M), (COMPRIMENTO_MODULO_M, LARGURA_MODULO_M)}
+    assert not _sobrepostos(modulos)
+
+
+def test_obstrucao_respeita_a_folga():
+    obstrucao = retangulo(1.0, 1.0, 4.5, 2.5)
+    livre = empacotar_agua(retangulo(10, 6))["paineis"]
+    resultado = empacotar_agua(retangulo(10, 6), [obstrucao])
+    modulos = resultado["modulos"]
+    assert 0 < resultado["paineis"] < livre
+    assert not _sobrepostos(modulos)
+    # Distância de cada módulo ao quadrado da obstrução (0 se cruzam)
+    dx = np.maximum(0, np.maximum(4.5 - (modulos[:, 0] + modulos[:, 2]), modulos[:, 0] - 5.5))
+    dy = np.maximum(0, np.maximum(2.5 - (modulos[:, 1] + modulos[:, 3]), modulos[:, 1] - 3.5))
+    assert np.hypot(dx, dy).min() >= FOLGA_OBSTRUCAO_M - TOLERANCIA
+
+
+def test_espacamento_entre_modulos_da_fileira():
+    modulos = empacotar_agua(retangulo(12, 3), orientacao="paisagem")["modulos"]
+    fileira = modulos[np.isclose(modulos[:, 1], modulos[0, 1])]
+    fileira = fileira[np.argsort(fileira[:, 0])]
+    vaos = fileira[1:, 0] - (fileira[:-1, 0] + fileira[:-1, 2])
+    assert (vaos >= ESPACAMENTO_M - TOLERANCIA).all()
+
+
+def test_agua_pequena_nao_cabe_nada():
+    resultado = empacotar_agua(retangulo(1.0, 1.0))
+    assert resultado["paineis"] == 0
+    assert resultado["modulos"].shape == (0, 4)
+
+
+def test_telhado_soma_as_aguas_e_lote_confere():
+    aguas = [{"vertices": retangulo(10, 6)},
+             {"vertices": [(0, 0), (8, 0), (4, 4)], "obstrucoes": [retangulo(0.5, 0.5, 3.5, 1)]}]
+    telhado = empacotar_telhado(aguas)
+    assert telhado["paineis"] == sum(agua["paineis"] for agua in telhado["aguas"])
+    assert ler_telhado(json.dumps(aguas)) == json.loads(json.dumps(aguas))
+    assert ler_telhado({"vertices": retangulo(10, 6)}) == [{"vertices": retangulo(10, 6)}]
+    capacidades = capacidade_lote([aguas, aguas[:1], []])
+    assert capacidades.dtype == np.int64
+    assert capacidades.tolist() == [telhado["paineis"], 16, 0]
+
+
+@pytest.mark.parametrize("chamada", [
+    lambda: empacotar_agua([(0, 0), (1, 0)]),
+    lambda: empacotar_agua(retangulo(10, 6), orientacao="diagonal"),
+    lambda: empacotar_agua(retangulo(10, 6), recuo=-0.1),
+    lambda: empacotar_agua(retangulo(10, 6), resolucao=0),
+    lambda: ler_telhado("[1, 2]"),
+])
+def test_entradas_invalidas(chamada):
+    with pytest.raises(ValueError):
+        chamada()